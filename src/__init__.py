@@ -7,22 +7,28 @@ src_dir = os.path.dirname(os.path.abspath(__file__))
 if src_dir not in sys.path:
     sys.path.append(src_dir)
 
-from models.base import Message, ModelResponse
+from models.base import Message, ModelResponse, StreamChunk, Usage
 from models.openai import OpenAIProvider
 from models.anthropic import AnthropicProvider
 from models.gemini import GeminiProvider
+from models.cache import CachedProvider, MemoryCacheBackend, SQLiteCacheBackend
 from tools.base import BaseTool
 from tools.registry import ToolRegistry
 from agents.base import Agent, AgentState
 from agents.memory import MemoryAgent
+from agents.memory_strategies import MemoryStrategy, TokenWindowMemory, SummaryMemory
 from agents.team_agent import TeamAgent
 from .multimodal.vision import create_image_message
 from utils.parse_utils import extract_json_from_llm_output
+from utils.token_utils import estimate_tokens, estimate_message_tokens
 
 __all__ = [
-    'Message', 'ModelResponse',
+    'Message', 'ModelResponse', 'StreamChunk', 'Usage',
     'OpenAIProvider', 'AnthropicProvider', 'GeminiProvider',
+    'CachedProvider', 'MemoryCacheBackend', 'SQLiteCacheBackend',
     'BaseTool', 'ToolRegistry',
     'Agent', 'AgentState', 'MemoryAgent', 'TeamAgent',
-    'create_image_message', 'extract_json_from_llm_output'
+    'MemoryStrategy', 'TokenWindowMemory', 'SummaryMemory',
+    'create_image_message', 'extract_json_from_llm_output',
+    'estimate_tokens', 'estimate_message_tokens'
 ]
@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
+import asyncio
 import json
-from typing import Dict, List, Optional, Any, Tuple, Union
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple, Union
 
-from models.base import ModelProvider, Message, ModelResponse
+from models.base import ModelProvider, Message, ModelResponse, StreamChunk, Usage
 from tools.registry import ToolRegistry
+from agents.memory_strategies import MemoryStrategy
 
 class AgentState(Dict[str, Any]):
     """Agent state that can be accessed and modified by the agent"""
@@ -16,62 +18,132 @@ class Agent(ABC):
         self, 
         model_provider: ModelProvider,
         system_message: str,
-        tools: Optional[ToolRegistry] = None
+        tools: Optional[ToolRegistry] = None,
+        max_concurrent_tools: int = 4,
+        tool_timeout: Optional[float] = None,
+        memory: Optional[MemoryStrategy] = None
     ):
         self.model_provider = model_provider
         self.system_message = system_message
         self.tools = tools
+        self.max_concurrent_tools = max_concurrent_tools
+        self.tool_timeout = tool_timeout
+        self.memory = memory
         self.messages: List[Message] = [
             Message(role="system", content=system_message)
         ]
         self.state = AgentState()
+        self.usage = Usage() # Token usage summed over every model call
     
     @abstractmethod
     async def run(self, user_input: Union[str, Message]) -> str:
         """Run the agent with the given user input"""
         pass
     
+    def _tool_definitions(self) -> Optional[List[Any]]:
+        """Tool definitions in the provider's native form, cached by the registry"""
+        if not self.tools:
+            return None
+        return self.tools.get_provider_definitions(self.model_provider) or None
+    
+    async def _apply_memory(self) -> None:
+        """Bound the history with the memory strategy before it is sent"""
+        if self.memory:
+            self.messages = await self.memory.apply(self.messages, self.model_provider)
+    
     async def _generate_response(self) -> ModelResponse:
         """Generate a response from the model"""
-        tools_list = None
-        if self.tools:
-            tools_list = self.tools.get_all_definitions()
+        await self._apply_memory()
+        tools_list = self._tool_definitions()
         
-        return await self.model_provider.generate(
+        response = await self.model_provider.generate(
             messages=self.messages,
             tools=tools_list
         )
+        self.usage += response.usage
+        return response
+    
+    async def _stream_response(self) -> AsyncIterator[StreamChunk]:
+        """Stream a response from the model"""
+        await self._apply_memory()
+        tools_list = self._tool_definitions()
+        
+        async for chunk in self.model_provider.stream(
+            messages=self.messages,
+            tools=tools_list
+        ):
+            self.usage += chunk.usage
+            yield chunk
+    
+    async def _execute_tool_call(self, tool_call: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute a single tool call, capturing errors and timeouts in the result"""
+        tool_name = tool_call["name"]
+        tool_args = tool_call["arguments"]
+        
+        if isinstance(tool_args, str):
+            # Parse JSON string to dict if needed
+            try:
+                tool_args = json.loads(tool_args)
+            except json.JSONDecodeError:
+                tool_args = {"input": tool_args}
+        
+        try:
+            timeout = self.tools.get_tool(tool_name).timeout or self.tool_timeout
+            result = await asyncio.wait_for(
+                self.tools.execute_tool(tool_name, **tool_args),
+                timeout=timeout
+            )
+            return {
+                "id": tool_call["id"],
+                "name": tool_name,
+                "result": str(result)
+            }
+        except asyncio.TimeoutError:
+            return {
+                "id": tool_call["id"],
+                "name": tool_name,
+                "error": f"Tool {tool_name} timed out after {timeout}s"
+            }
+        except Exception as e:
+            return {
+                "id": tool_call["id"],
+                "name": tool_name,
+                "error": str(e)
+            }
+    
+    def _is_serial_only(self, tool_name: str) -> bool:
+        try:
+            return self.tools.get_tool(tool_name).serial_only
+        except ValueError:
+            return False
     
     async def _handle_tool_calls(self, tool_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Handle tool calls and return the results"""
+        """
+        Handle tool calls and return the results in the order they were requested.
+        
+        Independent calls run concurrently, at most max_concurrent_tools at a
+        time. A call to a serial_only tool is a barrier: the calls requested
+        before it finish first, it runs alone, and the calls after it start
+        once it is done.
+        """
         if not self.tools or not tool_calls:
             return []
         
-        results = []
-        for tool_call in tool_calls:
-            tool_name = tool_call["name"]
-            tool_args = tool_call["arguments"]
-            
-            if isinstance(tool_args, str):
-                # Parse JSON string to dict if needed
-                try:
-                    tool_args = json.loads(tool_args)
-                except json.JSONDecodeError:
-                    tool_args = {"input": tool_args}
-            
-            try:
-                result = await self.tools.execute_tool(tool_name, **tool_args)
-                results.append({
-                    "id": tool_call["id"],
-                    "name": tool_name,
-                    "result": str(result)
-                })
-            except Exception as e:
-                results.append({
-                    "id": tool_call["id"],
-                    "name": tool_name,
-                    "error": str(e)
-                })
+        results: List[Optional[Dict[str, Any]]] = [None] * len(tool_calls)
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrent_tools))
+        
+        async def run_limited(index: int, tool_call: Dict[str, Any]) -> None:
+            async with semaphore:
+                results[index] = await self._execute_tool_call(tool_call)
+        
+        concurrent = []
+        for index, tool_call in enumerate(tool_calls):
+            if self._is_serial_only(tool_call["name"]):
+                await asyncio.gather(*concurrent)
+                concurrent = []
+                results[index] = await self._execute_tool_call(tool_call)
+            else:
+                concurrent.append(run_limited(index, tool_call))
+        await asyncio.gather(*concurrent)
         
         return results
-
@@ -1,6 +1,6 @@
-from typing import List, Dict, Any, Optional, Union
+from typing import AsyncIterator, List, Dict, Any, Optional, Union
 import json
-from models.base import Message, ModelResponse, ModelProvider
+from models.base import Message, ModelResponse, ModelProvider, StreamChunk
 from agents.base import Agent
 
 class MemoryAgent(Agent):
@@ -33,7 +33,7 @@ class MemoryAgent(Agent):
             for result in tool_results:
                 self.messages.append(Message(
                     role="tool",
-                    content=result["result"],
+                    content=result.get("result", f"Error: {result.get('error')}"),
                     tool_call_id=result["id"]
                 ))
             
@@ -44,3 +44,54 @@ class MemoryAgent(Agent):
         self.messages.append(Message(role="assistant", content=response.text))
         
         return response.text
+    
+    async def run_stream(self, user_input: Union[str, Message]) -> AsyncIterator[StreamChunk]:
+        """
+        Process user input and stream the response as it is generated.
+        
+        Follows the same flow as run(): if the model asks for tools, they are
+        executed and a second response is streamed. History is updated once
+        each response has finished streaming.
+        """
+        # Add user message to history
+        if isinstance(user_input, str):
+            self.messages.append(Message(role="user", content=user_input))
+        else:
+            self.messages.append(user_input)
+        
+        text = ""
+        tool_calls = None
+        async for chunk in self._stream_response():
+            text += chunk.text
+            if chunk.done:
+                tool_calls = chunk.tool_calls
+            yield chunk
+        
+        # Check for tool calls
+        if tool_calls:
+            # Handle tool calls
+            tool_results = await self._handle_tool_calls(tool_calls)
+            
+            # Add assistant message with tool calls
+            self.messages.append(Message(
+                role="assistant",
+                content=text,
+                tool_calls=tool_calls
+            ))
+            
+            # Add tool results to history
+            for result in tool_results:
+                self.messages.append(Message(
+                    role="tool",
+                    content=result.get("result", f"Error: {result.get('error')}"),
+                    tool_call_id=result["id"]
+                ))
+            
+            # Stream a new response based on tool results
+            text = ""
+            async for chunk in self._stream_response():
+                text += chunk.text
+                yield chunk
+        
+        # Add final response to history
+        self.messages.append(Message(role="assistant", content=text))
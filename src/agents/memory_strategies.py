@@ -0,0 +1,160 @@
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional, Sequence
+
+from models.base import Message, ModelProvider
+from utils.token_utils import estimate_message_tokens
+
+
+class MemoryStrategy(ABC):
+    """
+    Decides which part of an agent's history is kept and sent to the model.
+    
+    History is split into units that are kept or dropped together: each
+    system message, and each turn (a user message with the assistant replies,
+    tool calls and tool results that follow it). Pinned units (system
+    messages, and turns that called a tool listed in pin_tools) are always
+    kept.
+    """
+    
+    def __init__(
+        self,
+        pin_system: bool = True,
+        pin_tools: Sequence[str] = (),
+        estimator: Callable[[Message], int] = estimate_message_tokens
+    ):
+        self.pin_system = pin_system
+        self.pin_tools = set(pin_tools)
+        self.estimator = estimator
+    
+    @abstractmethod
+    async def apply(self, messages: List[Message], model_provider: ModelProvider) -> List[Message]:
+        """Return the bounded history that replaces the agent's messages"""
+        pass
+    
+    def count_tokens(self, messages: List[Message]) -> int:
+        return sum(self.estimator(message) for message in messages)
+    
+    def _units(self, messages: List[Message]) -> List[List[Message]]:
+        """Split history into system messages and user turns"""
+        units = []
+        for message in messages:
+            if message.role in ("system", "user") or not units or units[-1][0].role == "system":
+                units.append([message])
+            else:
+                units[-1].append(message)
+        return units
+    
+    def _is_pinned(self, unit: List[Message]) -> bool:
+        if self.pin_system and unit[0].role == "system":
+            return True
+        return any(
+            tool_call.get("name") in self.pin_tools
+            for message in unit
+            for tool_call in message.tool_calls or []
+        )
+    
+    def _fit_recent(self, units: List[List[Message]], budget: int) -> int:
+        """Index of the oldest unpinned unit that still fits; the newest always stays"""
+        start = len(units)
+        used = 0
+        for index in range(len(units) - 1, -1, -1):
+            if self._is_pinned(units[index]):
+                continue
+            cost = self.count_tokens(units[index])
+            if used + cost > budget and start < len(units):
+                break
+            used += cost
+            start = index
+        return start
+    
+    def _assemble(self, units: List[List[Message]], start: int) -> List[Message]:
+        """Pinned units in their original position, followed by recent ones"""
+        return [
+            message
+            for index, unit in enumerate(units)
+            if index >= start or self._is_pinned(unit)
+            for message in unit
+        ]
+
+
+class TokenWindowMemory(MemoryStrategy):
+    """Keeps the most recent turns that fit in a token budget and drops the rest"""
+    
+    def __init__(self, max_tokens: int, **kwargs):
+        super().__init__(**kwargs)
+        self.max_tokens = max_tokens
+    
+    async def apply(self, messages: List[Message], model_provider: ModelProvider) -> List[Message]:
+        if self.count_tokens(messages) <= self.max_tokens:
+            return messages
+        
+        units = self._units(messages)
+        pinned_tokens = sum(self.count_tokens(unit) for unit in units if self._is_pinned(unit))
+        start = self._fit_recent(units, self.max_tokens - pinned_tokens)
+        return self._assemble(units, start)
+
+
+class SummaryMemory(MemoryStrategy):
+    """
+    Compacts older turns into a summary once history exceeds max_tokens.
+    
+    The most recent keep_recent_tokens of conversation are kept verbatim;
+    everything older (unpinned) is replaced by one system message holding a
+    model-written summary, which is folded into the next compaction.
+    """
+    
+    SUMMARY_PREFIX = "Summary of the earlier conversation: "
+    SUMMARY_PROMPT = (
+        "Summarize the conversation below for an assistant that will continue it. "
+        "Keep facts, decisions, user preferences and tool results that may be needed later. "
+        "Be concise.\n\n"
+    )
+    
+    def __init__(
+        self,
+        max_tokens: int,
+        keep_recent_tokens: Optional[int] = None,
+        summary_max_tokens: int = 512,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.max_tokens = max_tokens
+        self.keep_recent_tokens = keep_recent_tokens if keep_recent_tokens is not None else max_tokens // 2
+        self.summary_max_tokens = summary_max_tokens
+    
+    def _is_summary(self, unit: List[Message]) -> bool:
+        content = unit[0].content
+        return unit[0].role == "system" and isinstance(content, str) and content.startswith(self.SUMMARY_PREFIX)
+    
+    def _is_pinned(self, unit: List[Message]) -> bool:
+        # The summary is rebuilt on each compaction rather than pinned
+        return not self._is_summary(unit) and super()._is_pinned(unit)
+    
+    async def apply(self, messages: List[Message], model_provider: ModelProvider) -> List[Message]:
+        if self.count_tokens(messages) <= self.max_tokens:
+            return messages
+        
+        units = self._units(messages)
+        start = self._fit_recent(units, self.keep_recent_tokens)
+        older = [unit for unit in units[:start] if not self._is_pinned(unit)]
+        if not older:
+            return messages
+        
+        transcript = "\n".join(
+            f"{message.role}: {message.content}"
+            + (f" [tool calls: {message.tool_calls}]" if message.tool_calls else "")
+            for unit in older
+            for message in unit
+        )
+        response = await model_provider.generate(
+            messages=[Message(role="user", content=self.SUMMARY_PROMPT + transcript)],
+            max_tokens=self.summary_max_tokens,
+            temperature=0
+        )
+        summary = Message(role="system", content=self.SUMMARY_PREFIX + response.text)
+        
+        # Pinned context first, then the summary, then the recent turns
+        compacted = [message for unit in units[:start] if self._is_pinned(unit) for message in unit]
+        compacted.append(summary)
+        compacted.extend(message for unit in units[start:] for message in unit)
+        return compacted
@@ -44,7 +44,7 @@ class TeamAgent(Agent):
             for result in tool_results:
                 self.messages.append(Message(
                     role="tool",
-                    content=result["result"],
+                    content=result.get("result", f"Error: {result.get('error')}"),
                     tool_call_id=result["id"]
                 ))
                 
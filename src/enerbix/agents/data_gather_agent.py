@@ -10,6 +10,8 @@ from IPython.display import HTML, display
 from enerbix.agents.query_analysis_agent import *
 from enerbix.api_handler.neighborhood_sumary import *
 from enerbix.api_handler.ev_infra_station_analysis import *
+from enerbix.api_handler.http_client import close_http_client
+from enerbix.utils.tracing import span
 import nest_asyncio
 
 # Apply nest_asyncio to make async work in Colab
@@ -95,11 +97,21 @@ class DataGatherAgentOutput:
 
 
 class DataGatherAgent:
-    def __init__(self, api_key: str, radius_miles: float = 100.0, debug: bool = False):
-        """Initialize the agent with API configuration."""
+    def __init__(
+        self,
+        api_key: str,
+        radius_miles: float = 100.0,
+        debug: bool = False,
+        force_refresh: bool = False,
+    ):
+        """Initialize the agent with API configuration.
+
+        Set force_refresh to bypass the on-disk Overpass cache and refetch.
+        """
         self.api_key = api_key
         self.radius_miles = radius_miles
         self.debug = debug
+        self.force_refresh = force_refresh
         self.processor = CitySummaryProcessor()
         self.printer = ColorPrinter()
 
@@ -126,17 +138,21 @@ class DataGatherAgent:
             )
 
         try:
-            # Add small delay between cities to prevent rate limiting
-            await asyncio.sleep(1)
+            # Nominatim rate limiting is handled by the shared geocoder's
+            # token bucket, so no fixed delay between cities is needed here.
 
-            # Create tasks for both API calls
-            summary_task = asyncio.create_task(self._get_city_summary(city, state))
-            ev_task = asyncio.create_task(self._get_ev_data(city, state))
+            with span(f"gather: {city}", "data", city=city, state=state):
+                # Create tasks for both API calls
+                summary_task = asyncio.create_task(
+                    self._get_city_summary(city, state)
+                )
+                ev_task = asyncio.create_task(self._get_ev_data(city, state))
 
-            # Wait for both tasks to complete with timeout
-            summary, ev_data = await asyncio.wait_for(
-                asyncio.gather(summary_task, ev_task), timeout=300  # 5 minute timeout
-            )
+                # Wait for both tasks to complete with timeout
+                summary, ev_data = await asyncio.wait_for(
+                    asyncio.gather(summary_task, ev_task),
+                    timeout=300,  # 5 minute timeout
+                )
 
             if self.debug:
                 self._print_monologue(
@@ -165,13 +181,16 @@ class DataGatherAgent:
         payload = {
             "city": city,
             "state": state,
-            "config": {"categories": "all", "debug": self.debug},
+            "config": {
+                "categories": "all",
+                "debug": self.debug,
+                "force_refresh": self.force_refresh,
+            },
         }
 
         try:
-            summary = await asyncio.to_thread(
-                self.processor.create_city_summary, payload
-            )
+            with span("city_summary", "data", city=city):
+                summary = await self.processor.create_city_summary_async(payload)
 
             if self.debug:
                 self.printer.print_message(
@@ -200,8 +219,8 @@ class DataGatherAgent:
         }
 
         try:
-            # Convert synchronous call to async using asyncio
-            result = await asyncio.to_thread(get_charging_stations, payload)
+            with span("ev_stations", "data", city=city):
+                result = await get_charging_stations_async(payload)
 
             if self.debug:
                 self.printer.print_message(f"Received EV data for {city}", "success")
@@ -290,4 +309,8 @@ class DataGatherAgent:
                 cities_data=[],
                 status="error",
                 error=error_msg,
-            )
\ No newline at end of file
+            )
+
+        finally:
+            # Release the pooled connections opened on this event loop
+            await close_http_client()
\ No newline at end of file
@@ -6,6 +6,7 @@ from enerbix.agents.planning_agent import *
 from enerbix.agents.data_gather_agent import *
 from enerbix.agents.report_agent import *
 from enerbix.agents.visualize_agent import *
+from enerbix.utils.tracing import TracedGenAIClient, Tracer, span
 from pydantic import BaseModel
 from rich import print as rich_print
 from termcolor import colored
@@ -21,6 +22,13 @@ class ExecutionAgent(BaseModel):
     debug: bool = False
     stage_output: bool = False
     output_type: Optional[str] = None
+    # Write each run's trace here, as a Chrome trace ("chrome") or span JSON ("json")
+    trace_path: Optional[str] = None
+    trace_format: str = "chrome"
+    # Tracer of the last execute() call
+    trace: Optional[Any] = None
+    # Token usage of the last execute() call, in total and per stage
+    usage: Optional[Dict[str, Any]] = None
 
     def _debug_print(self, message: str, color: str = "blue") -> None:
         """Print colorful debug messages when debug is enabled"""
@@ -42,8 +50,48 @@ class ExecutionAgent(BaseModel):
         raise Exception(error_msg)
 
     async def execute(self, query: str) -> Union[Dict, str, tuple]:
-        """🎭 The main show! Execute the analysis pipeline"""
+        """🎭 The main show! Execute the analysis pipeline.
+
+        Every stage and external call is traced; the Tracer is kept in
+        self.trace (and results["trace"]) and written to trace_path if set.
+        Token usage of the run, in total and per stage, is kept in
+        self.usage (and results["usage"]).
+        """
+        tracer = Tracer("ExecutionAgent.execute")
+        self.trace = tracer
         try:
+            with tracer.activate(), tracer.span("execute", "pipeline", query=query):
+                return await self._execute(query, tracer)
+        finally:
+            self.usage = tracer.usage()
+            self._export_trace(tracer)
+
+    def _export_trace(self, tracer: Tracer) -> None:
+        """Write the trace to trace_path and print the stage timings and usage"""
+        if self.trace_path:
+            if self.trace_format == "chrome":
+                tracer.to_chrome_trace(self.trace_path)
+            else:
+                tracer.to_json(self.trace_path)
+            self._debug_print(f"🧭 Trace written to {self.trace_path}", "cyan")
+
+        for stage in tracer.spans:
+            if stage.category == "stage":
+                self._debug_print(f"⏱️ {stage.name}: {stage.duration:.2f}s", "cyan")
+
+        for stage, usage in tracer.usage()["stages"].items():
+            self._debug_print(
+                f"🪙 {stage}: {usage['prompt_tokens']:,} prompt "
+                f"({usage['cached_tokens']:,} cached), "
+                f"{usage['completion_tokens']:,} completion tokens",
+                "cyan",
+            )
+
+    async def _execute(self, query: str, tracer: Tracer) -> Union[Dict, str, tuple]:
+        try:
+            # Every raw Gemini call made by the agents becomes a span
+            client = TracedGenAIClient(self.client)
+
             # 🎬 Act 1: Planning Phase
             self._debug_print("🎯 Starting Planning Phase...", "cyan")
             if self.stage_output:
@@ -52,12 +100,20 @@ class ExecutionAgent(BaseModel):
 
             planning_agent = PlanningAgent(
                 query=query,
-                client=self.client,
+                client=client,
                 model_name=self.model_name,
                 debug=self.debug,
                 api_key=self.api_key,
             )
-            plan = planning_agent.create_plan()
+            query_agent = QueryAnalysisAgent(client, self.model_name)
+            extraction_agent = QueryExtractionAgent(
+                client, self.model_name, debug=self.debug
+            )
+
+            # One structured call feeds both the plan and the query analysis
+            with span("planning"):
+                extraction = await extraction_agent.extract_async(query)
+                plan = planning_agent.create_plan_from_extraction(extraction)
 
             if not plan.validated_query.is_valid:
                 return {
@@ -75,8 +131,10 @@ class ExecutionAgent(BaseModel):
 
             # Scene 1: Query Analysis
             self._debug_print("🔍 Starting Query Analysis...", "green")
-            query_agent = QueryAnalysisAgent(self.client, self.model_name)
-            results["query_analysis"] = query_agent.analyze(query)
+            with span("query_analysis"):
+                results["query_analysis"] = query_agent.analyze_extraction(
+                    query, extraction
+                )
             self.output_type = str(results["query_analysis"]["entities"]["output_type"])
 
             if self.stage_output:
@@ -89,7 +147,8 @@ class ExecutionAgent(BaseModel):
             data_agent = DataGatherAgent(
                 api_key=self.api_key, radius_miles=100.0, debug=self.debug
             )
-            results["data"] = await data_agent.process(results["query_analysis"])
+            with span("data_gather"):
+                results["data"] = await data_agent.process(results["query_analysis"])
 
             if self.stage_output:
                 rich_print(results["data"])
@@ -104,13 +163,14 @@ class ExecutionAgent(BaseModel):
             if any(step.agent_name == "ReportAgent" for step in plan.steps):
                 self._debug_print("📝 Generating Report...", "green")
                 report_agent = ReportAgent(
-                    client=self.client,
+                    client=client,
                     model_name=self.model_name,
                     enable_search=plan.enable_search,
                 )
-                report_result = await report_agent.analyze(
-                    results["query_analysis"], results["data"]
-                )
+                with span("report"):
+                    report_result = await report_agent.analyze(
+                        results["query_analysis"], results["data"]
+                    )
 
                 # Handle different output types
                 if self.output_type == "OutputType.REPORT":
@@ -131,9 +191,10 @@ class ExecutionAgent(BaseModel):
             # Scene 4: Visualization (if needed)
             if any(step.agent_name == "ChartBuilder" for step in plan.steps):
                 self._debug_print("📈 Creating Visualizations...", "green")
-                single_city_figs, comparison_figs = plot_all_visualizations(
-                    results["data"]
-                )
+                with span("visualization"):
+                    single_city_figs, comparison_figs = plot_all_visualizations(
+                        results["data"]
+                    )
                 results["visualizations"] = [single_city_figs, comparison_figs]
                 # Display single-city visualizations
                 if self.stage_output:
@@ -150,6 +211,8 @@ class ExecutionAgent(BaseModel):
 
             # 🎬 Final Act: Return Results
             self._debug_print("🎉 Execution Complete!", "cyan")
+            results["trace"] = tracer
+            results["usage"] = tracer.usage()
             return results
 
         except Exception as e:
@@ -164,6 +227,7 @@ class ExecutionAgent(BaseModel):
         debug: bool = False,
         stage_output: bool = False,
         output_type: Optional[str] = None,
+        trace_path: Optional[str] = None,
     ) -> "ExecutionAgent":
         """Factory method for creating an ExecutionAgent"""
         return cls(
@@ -173,4 +237,5 @@ class ExecutionAgent(BaseModel):
             debug=debug,
             stage_output=stage_output,
             output_type=output_type,
-        )
\ No newline at end of file
+            trace_path=trace_path,
+        )
@@ -1,11 +1,13 @@
 # @title Helper Functions
+import asyncio
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 from enerbix.agents.query_analysis_agent import *
+from enerbix.utils.usage import add_usage, empty_usage, gemini_usage
 from google.genai import types
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from rich import print as rich_print
 
 
@@ -84,87 +86,121 @@ class PlanningAgent(BaseModel):
     model_name: str
     debug: bool = False
     api_key: Optional[str] = None
+    # Token usage summed over this agent's model calls
+    usage: Dict[str, int] = Field(default_factory=empty_usage)
+
+    def _record_usage(self, response) -> None:
+        add_usage(self.usage, gemini_usage(response))
+
+    def _city_extraction_request(self) -> Dict[str, Any]:
+        """Request arguments for extracting city names from the query"""
+        return dict(
+            model=self.model_name,
+            contents=f"""Extract only city names from this query: '{self.query}'
+              Only return the city names, nothing else.""",
+        )
 
     def _validate_query(self) -> QueryValidation:
         """Step 0: Validates query for valid cities and provides enhancement suggestions"""
         try:
             # Extract potential cities from query
             response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=f"""Extract only city names from this query: '{self.query}'
-              Only return the city names, nothing else.""",
+                **self._city_extraction_request()
             )
+            self._record_usage(response)
+            return self._build_validation(response.text)
 
-            # Process and clean extracted cities
-            mentioned_cities = [
-                city.strip()
-                for city in response.text.lower().replace(".", "").split()
-                if city.strip()
-            ]
-
-            # Validate cities against mapping
-            valid_cities = []
-            invalid_cities = []
-
-            for city in mentioned_cities:
-                city_title = city.title()
-                if city_title in STATE_MAPPING:
-                    valid_cities.append(city_title)
-                else:
-                    invalid_cities.append(city_title)
-
-            # Build validation result
-            if not mentioned_cities:
-                return QueryValidation(
-                    cities=[],
-                    is_valid=False,
-                    missing_elements=["city"],
-                    suggestions=f"""Please specify one or more valid cities. Available cities are:
-                  {', '.join(STATE_MAPPING.keys())}.
-                  
-                  Example queries:
-                  1. "Analyze EV charging infrastructure in Austin"
-                  2. "Compare EV stations between Dallas and Houston"
-                  3. "Show gaps in San Francisco's charging network"
-                  """,
-                )
+        except Exception as e:
+            return self._validation_error(e)
 
-            if invalid_cities:
-                return QueryValidation(
-                    cities=valid_cities,
-                    is_valid=False,
-                    missing_elements=["valid city"],
-                    suggestions=f"""Invalid cities mentioned: {', '.join(invalid_cities)}
-                  
-                  Please use cities from this list: {', '.join(STATE_MAPPING.keys())}
-                  
-                  Try these instead:
-                  1. Replace {invalid_cities[0]} with {list(STATE_MAPPING.keys())[0]}
-                  2. "Compare EV infrastructure in Austin and Dallas"
-                  3. "Analyze charging stations in San Francisco"
-                  """,
-                )
+    async def _validate_query_async(self) -> QueryValidation:
+        """Async variant of _validate_query"""
+        try:
+            response = await self.client.aio.models.generate_content(
+                **self._city_extraction_request()
+            )
+            self._record_usage(response)
+            return self._build_validation(response.text)
 
+        except Exception as e:
+            return self._validation_error(e)
+
+    def _build_validation(self, response_text: str) -> QueryValidation:
+        """Validates the extracted city names against STATE_MAPPING"""
+        # Process and clean extracted cities
+        mentioned_cities = [
+            city.strip()
+            for city in response_text.lower().replace(".", "").split()
+            if city.strip()
+        ]
+        return self._validate_cities(mentioned_cities)
+
+    def _validate_cities(self, mentioned_cities: List[str]) -> QueryValidation:
+        """Checks city names against STATE_MAPPING and builds suggestions"""
+        # Validate cities against mapping
+        valid_cities = []
+        invalid_cities = []
+
+        for city in mentioned_cities:
+            city_title = city.title()
+            if city_title in STATE_MAPPING:
+                valid_cities.append(city_title)
+            else:
+                invalid_cities.append(city_title)
+
+        # Build validation result
+        if not mentioned_cities:
             return QueryValidation(
-                cities=valid_cities,
-                is_valid=True,
-                missing_elements=[],
-                suggestions=f"""Your query includes valid cities. To enhance it, you could:
-              1. Add comparison with another city (e.g., "Compare with {next(iter(set(STATE_MAPPING.keys()) - set(valid_cities)))}")
-              2. Request specific analysis (e.g., "gaps", "planning", "assessment")
-              3. Ask for visualizations (e.g., "with charts", "include plots")
-              4. Request grounded research (e.g., "with detailed research", "comprehensive analysis")
+                cities=[],
+                is_valid=False,
+                missing_elements=["city"],
+                suggestions=f"""Please specify one or more valid cities. Available cities are:
+              {', '.join(STATE_MAPPING.keys())}.
+              
+              Example queries:
+              1. "Analyze EV charging infrastructure in Austin"
+              2. "Compare EV stations between Dallas and Houston"
+              3. "Show gaps in San Francisco's charging network"
               """,
             )
 
-        except Exception as e:
-            if self.debug:
-                print(f"Validation error details: {str(e)}")
+        if invalid_cities:
             return QueryValidation(
-                cities=[],
+                cities=valid_cities,
                 is_valid=False,
-                missing_elements=["parseable city"],
-                suggestions=f"""Unable to process the query. Please specify cities clearly.
+                missing_elements=["valid city"],
+                suggestions=f"""Invalid cities mentioned: {', '.join(invalid_cities)}
+              
+              Please use cities from this list: {', '.join(STATE_MAPPING.keys())}
+              
+              Try these instead:
+              1. Replace {invalid_cities[0]} with {list(STATE_MAPPING.keys())[0]}
+              2. "Compare EV infrastructure in Austin and Dallas"
+              3. "Analyze charging stations in San Francisco"
+              """,
+            )
+
+        return QueryValidation(
+            cities=valid_cities,
+            is_valid=True,
+            missing_elements=[],
+            suggestions=f"""Your query includes valid cities. To enhance it, you could:
+          1. Add comparison with another city (e.g., "Compare with {next(iter(set(STATE_MAPPING.keys()) - set(valid_cities)))}")
+          2. Request specific analysis (e.g., "gaps", "planning", "assessment")
+          3. Ask for visualizations (e.g., "with charts", "include plots")
+          4. Request grounded research (e.g., "with detailed research", "comprehensive analysis")
+          """,
+        )
+
+    def _validation_error(self, e: Exception) -> QueryValidation:
+        """Validation result for a query the model call failed on"""
+        if self.debug:
+            print(f"Validation error details: {str(e)}")
+        return QueryValidation(
+            cities=[],
+            is_valid=False,
+            missing_elements=["parseable city"],
+            suggestions=f"""Unable to process the query. Please specify cities clearly.
               
               Example valid queries:
               1. "Analyze EV infrastructure in Austin"
@@ -173,16 +209,47 @@ class PlanningAgent(BaseModel):
               
               Available cities: {', '.join(STATE_MAPPING.keys())}
               """,
-            )
+        )
+
+    def _visualization_request(self) -> Dict[str, Any]:
+        return dict(
+            model=self.model_name,
+            contents=f"Return only true or false: Should this query include data visualization? '{self.query}'",
+            config=types.GenerateContentConfig(tools=[detect_visualization_need]),
+        )
+
+    def _search_request(self) -> Dict[str, Any]:
+        return dict(
+            model=self.model_name,
+            contents=f"Return only true or false: Does this query need enhanced search/grounding? '{self.query}'",
+            config=types.GenerateContentConfig(tools=[detect_search_need]),
+        )
 
     def _determine_visualization_requirement(self) -> bool:
         """Uses function calling to check visualization needs"""
         try:
             response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=f"Return only true or false: Should this query include data visualization? '{self.query}'",
-                config=types.GenerateContentConfig(tools=[detect_visualization_need]),
+                **self._visualization_request()
             )
+            self._record_usage(response)
+            if self.debug:
+                print("Visualisation response: ", response.text)
+                print("Visualisation response Bool: ", bool(response.text))
+
+            return response.text
+
+        except Exception as e:
+            if self.debug:
+                print(f"Visualization detection error: {str(e)}")
+            return False
+
+    async def _determine_visualization_requirement_async(self) -> bool:
+        """Async variant of _determine_visualization_requirement"""
+        try:
+            response = await self.client.aio.models.generate_content(
+                **self._visualization_request()
+            )
+            self._record_usage(response)
             if self.debug:
                 print("Visualisation response: ", response.text)
                 print("Visualisation response Bool: ", bool(response.text))
@@ -197,11 +264,26 @@ class PlanningAgent(BaseModel):
     def _determine_search_requirement(self) -> bool:
         """Uses function calling to check search/grounding needs"""
         try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=f"Return only true or false: Does this query need enhanced search/grounding? '{self.query}'",
-                config=types.GenerateContentConfig(tools=[detect_search_need]),
+            response = self.client.models.generate_content(**self._search_request())
+            self._record_usage(response)
+            if self.debug:
+                print("Search response: ", response.text)
+                print("Search response Bool: ", bool(response.text))
+
+            return response.text
+
+        except Exception as e:
+            if self.debug:
+                print(f"Search detection error: {str(e)}")
+            return False
+
+    async def _determine_search_requirement_async(self) -> bool:
+        """Async variant of _determine_search_requirement"""
+        try:
+            response = await self.client.aio.models.generate_content(
+                **self._search_request()
             )
+            self._record_usage(response)
             if self.debug:
                 print("Search response: ", response.text)
                 print("Search response Bool: ", bool(response.text))
@@ -214,9 +296,19 @@ class PlanningAgent(BaseModel):
             return False
 
     def _create_steps(
-        self, validated_query: QueryValidation, enable_search: bool
+        self,
+        validated_query: QueryValidation,
+        enable_search: bool,
+        needs_visualization: Optional[Union[str, bool]] = None,
+        needs_report: bool = True,
     ) -> List[PlanStep]:
-        """Creates appropriate steps based on validation results"""
+        """Creates appropriate steps based on validation results.
+
+        needs_visualization is the visualization check result when it was
+        already fetched (async planning); otherwise it is requested here.
+        needs_report is False only when the output type needs no report
+        (raw data); enable_search only configures the report step.
+        """
         steps = []
 
         # Only create steps if query is valid
@@ -246,10 +338,7 @@ class PlanningAgent(BaseModel):
             )
 
             # Step 3: Report Generation with search configuration
-            if enable_search:
-                # Use function calling to get search details
-                # search_result = self._determine_search_requirement()
-
+            if needs_report:
                 steps.append(
                     PlanStep(
                         step_id=3,
@@ -267,11 +356,15 @@ class PlanningAgent(BaseModel):
                 )
 
             # Step 4: Visualization (using function calling)
-            needs_visualization = self._determine_visualization_requirement()
+            if needs_visualization is None:
+                needs_visualization = self._determine_visualization_requirement()
             if self.debug:
                 print("visualization toggle: ", needs_visualization)
-                print("Type of Visual toggle:", type(eval(needs_visualization)))
-            if eval(needs_visualization):
+            if isinstance(needs_visualization, str):
+                needs_visualization = eval(needs_visualization)
+            if self.debug:
+                print("Type of Visual toggle:", type(needs_visualization))
+            if needs_visualization:
                 steps.append(
                     PlanStep(
                         step_id=4,
@@ -285,29 +378,37 @@ class PlanningAgent(BaseModel):
 
         return steps
 
-    def create_plan(self) -> ExecutionPlan:
-        """Creates execution plan based on query and configuration"""
-        # Step 0: Validate query
+    def _print_planning_banner(self) -> None:
         if not self.debug:
             rich_print(
                 "[bold yellow]ℹ️ Warning: Concocting the perfect plan! It's like a recipe, but with more algorithms and less chance of burning the kitchen down.  Want to see the secret ingredients? debug=True is your cookbook!  (And if you want to see the output of each agent stage, set stage_output=True!) 👨‍🍳🧪 [/bold yellow]"
             )
 
+    def _invalid_plan(self, validated_query: QueryValidation) -> ExecutionPlan:
+        """Plan with no steps for a query that failed validation"""
+        return ExecutionPlan(
+            query=self.query,
+            timestamp=datetime.now(),
+            validated_query=validated_query,
+            enable_search=False,
+            steps=[],
+            debug=self.debug,
+        )
+
+    def create_plan(self) -> ExecutionPlan:
+        """Creates execution plan based on query and configuration"""
+        # Step 0: Validate query
+        self._print_planning_banner()
+
         validated_query = self._validate_query()
 
         if not validated_query.is_valid:
             # If query is invalid, create plan with no steps
-            return ExecutionPlan(
-                query=self.query,
-                timestamp=datetime.now(),
-                validated_query=validated_query,
-                enable_search=False,
-                steps=[],
-                debug=self.debug,
-            )
+            return self._invalid_plan(validated_query)
 
         # Determine if search is needed
-        enable_search_toggle = self._determine_search_requirement().strip()
+        # The check returns the model's text, or False when the call failed
+        enable_search_toggle = str(self._determine_search_requirement()).strip()
         if self.debug:
             print("Search toggle: ", enable_search_toggle)
 
@@ -324,4 +425,82 @@ class PlanningAgent(BaseModel):
             debug=self.debug,
         )
 
-        return plan
\ No newline at end of file
+        return plan
+
+    async def create_plan_async(self) -> ExecutionPlan:
+        """Creates the same plan as create_plan, with the classification calls in parallel.
+
+        Validation, the search check and the visualization check don't depend
+        on each other, so all three are sent at once; for an invalid query
+        the two checks are simply discarded.
+        """
+        self._print_planning_banner()
+
+        (
+            validated_query,
+            enable_search_toggle,
+            needs_visualization,
+        ) = await asyncio.gather(
+            self._validate_query_async(),
+            self._determine_search_requirement_async(),
+            self._determine_visualization_requirement_async(),
+        )
+
+        if not validated_query.is_valid:
+            return self._invalid_plan(validated_query)
+
+        # The check returns the model's text, or False when the call failed
+        enable_search_toggle = str(enable_search_toggle).strip()
+        if self.debug:
+            print("Search toggle: ", enable_search_toggle)
+
+        steps = self._create_steps(
+            validated_query, enable_search_toggle, needs_visualization
+        )
+
+        return ExecutionPlan(
+            query=self.query,
+            timestamp=datetime.now(),
+            validated_query=validated_query,
+            enable_search=enable_search_toggle,
+            steps=steps,
+            debug=self.debug,
+        )
+
+    def create_plan_from_extraction(
+        self, extraction: Optional[QueryExtraction]
+    ) -> ExecutionPlan:
+        """Creates the plan from a QueryExtractionAgent result, without
+        making any model calls of its own.
+
+        extraction is None when the extraction call failed.
+        """
+        self._print_planning_banner()
+
+        if extraction is None:
+            return self._invalid_plan(
+                self._validation_error(ValueError("structured extraction failed"))
+            )
+
+        validated_query = self._validate_cities(extraction.cities)
+        if not validated_query.is_valid:
+            return self._invalid_plan(validated_query)
+
+        if self.debug:
+            print("Search toggle: ", extraction.needs_search)
+
+        steps = self._create_steps(
+            validated_query,
+            extraction.needs_search,
+            extraction.needs_visualization,
+            needs_report=extraction.output_type != OutputType.RAW,
+        )
+
+        return ExecutionPlan(
+            query=self.query,
+            timestamp=datetime.now(),
+            validated_query=validated_query,
+            enable_search=extraction.needs_search,
+            steps=steps,
+            debug=self.debug,
+        )
@@ -2,8 +2,9 @@
 
 from enum import Enum
 import json
-from typing import List
+from typing import List, Optional
 
+from enerbix.utils.usage import add_usage, empty_usage, gemini_usage
 from google.genai import types
 from pydantic import BaseModel
 from rich import print as rich_print
@@ -32,6 +33,16 @@ class QueryEntities(BaseModel):
     output_type: OutputType
 
 
+class QueryExtraction(BaseModel):
+    """Everything planning and query analysis need, from one model call"""
+
+    cities: List[str]
+    pattern_type: PatternType
+    output_type: OutputType
+    needs_visualization: bool
+    needs_search: bool
+
+
 # Debug Print Functions with both light and dark theme friendly colors
 def print_planning(msg: str):
     rich_print(f"[bold cyan]🤔 PLANNING:[/bold cyan] {msg}")
@@ -101,6 +112,7 @@ class QueryAnalysisAgent:
         self.client = client
         self.model_name = model_name
         self.debug = False
+        self.usage = empty_usage()
 
         # Function declaration
         self.function = dict(
@@ -134,18 +146,16 @@ class QueryAnalysisAgent:
             },
         )
 
-    def _extract_entities(self, query: str) -> QueryEntities:
-        if self.debug:
-            print_planning("Starting entity extraction...")
-            print_debug(f"Processing query: {query}")
+    def _record_usage(self, response) -> None:
+        add_usage(self.usage, gemini_usage(response))
 
-        try:
-            # First generation for entity extraction
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=[
-                    {
-                        "text": """Examples of patterns:
+    def _extraction_request(self, query: str) -> dict:
+        """Request arguments for the entity extraction call"""
+        return dict(
+            model=self.model_name,
+            contents=[
+                {
+                    "text": """Examples of patterns:
                         - "I want to understand..." -> DISCOVERY
                         - "Compare between..." -> COMPARISON
                         - "Show gaps in..." -> GAPS
@@ -153,31 +163,64 @@ class QueryAnalysisAgent:
                         - "How well are... performing" -> ASSESSMENT
 
                         Now extract entities from this query: """
-                        + query
-                    }
-                ],
-                config=types.GenerateContentConfig(
-                    tools=[types.Tool(function_declarations=[self.function])]
-                ),
+                    + query
+                }
+            ],
+            config=types.GenerateContentConfig(
+                tools=[types.Tool(function_declarations=[self.function])]
+            ),
+        )
+
+    def _entities_from_response(self, query: str, response) -> QueryEntities:
+        """Builds QueryEntities from the extraction function call"""
+        function_call = response.candidates[0].content.parts[0].function_call
+        extracted = function_call.args
+        if self.debug:
+            print_debug(f"Raw extracted entities: {json.dumps(extracted, indent=2)}")
+
+        # Get function response with state mapping
+        result = extract_query_entities(
+            query=query,
+            cities=extracted["cities"],
+            pattern_type=extracted["pattern_type"],
+            output_type=extracted["output_type"],
+            debug=self.debug,
+        )
+
+        return QueryEntities(**result)
+
+    def _extract_entities(self, query: str) -> QueryEntities:
+        if self.debug:
+            print_planning("Starting entity extraction...")
+            print_debug(f"Processing query: {query}")
+
+        try:
+            # First generation for entity extraction
+            response = self.client.models.generate_content(
+                **self._extraction_request(query)
             )
+            self._record_usage(response)
+            return self._entities_from_response(query, response)
 
-            function_call = response.candidates[0].content.parts[0].function_call
-            extracted = function_call.args
+        except Exception as e:
             if self.debug:
-                print_debug(
-                    f"Raw extracted entities: {json.dumps(extracted, indent=2)}"
-                )
-
-            # Get function response with state mapping
-            result = extract_query_entities(
-                query=query,
-                cities=extracted["cities"],
-                pattern_type=extracted["pattern_type"],
-                output_type=extracted["output_type"],
-                debug=self.debug,
+                print_debug(f"Error in entity extraction: {str(e)}")
+            raise ValueError(
+                f"Could not extract required entities from query. Details: {str(e)}"
             )
 
-            return QueryEntities(**result)
+    async def _extract_entities_async(self, query: str) -> QueryEntities:
+        """Async variant of _extract_entities"""
+        if self.debug:
+            print_planning("Starting entity extraction...")
+            print_debug(f"Processing query: {query}")
+
+        try:
+            response = await self.client.aio.models.generate_content(
+                **self._extraction_request(query)
+            )
+            self._record_usage(response)
+            return self._entities_from_response(query, response)
 
         except Exception as e:
             if self.debug:
@@ -186,7 +229,7 @@ class QueryAnalysisAgent:
                 f"Could not extract required entities from query. Details: {str(e)}"
             )
 
-    def analyze(self, query: str) -> dict:
+    def _print_analysis_banner(self) -> None:
         if not self.debug:
             rich_print(
                 "[bold yellow]ℹ️ Warning: Deciphering your cryptic commands!  It's like translating ancient hieroglyphs, but with more emojis.  Curious about my interpretations? debug=True reveals all! (And if you want to see the output of each agent stage, set stage_output=True!) 🤔📜 [/bold yellow]"
@@ -195,40 +238,153 @@ class QueryAnalysisAgent:
         if self.debug:
             print_executing("Starting analysis...")
 
+    def _analysis_result(self, entities: QueryEntities) -> dict:
+        """Validates extracted entities and builds the analysis result"""
+        if self.debug:
+            print_planning(f"Found a {entities.pattern_type} pattern! 🎯")
+
+        # Validate cities and states
+        if not entities.cities:
+            raise ValueError("No cities mentioned in query. Please specify the city.")
+
+        if entities.pattern_type == PatternType.COMPARISON and len(entities.cities) < 2:
+            raise ValueError(
+                "Comparison requires at least two cities. Please mention both cities."
+            )
+
+        if self.debug:
+            print_executing(f"Analyzing {', '.join(entities.cities)} 🔄")
+            print_info(f"States involved: {', '.join(entities.states)}")
+
+        result = {
+            "status": "success",
+            "entities": entities.model_dump(),
+        }
+
+        if self.debug:
+            print_debug("Analysis completed successfully! 🎉")
+        return result
+
+    def analyze(self, query: str) -> dict:
+        self._print_analysis_banner()
+
         try:
             # Extract entities
             entities = self._extract_entities(query)
-            if self.debug:
-                print_planning(f"Found a {entities.pattern_type} pattern! 🎯")
-
-            # Validate cities and states
-            if not entities.cities:
-                raise ValueError(
-                    "No cities mentioned in query. Please specify the city."
-                )
-
-            if (
-                entities.pattern_type == PatternType.COMPARISON
-                and len(entities.cities) < 2
-            ):
-                raise ValueError(
-                    "Comparison requires at least two cities. Please mention both cities."
-                )
+            return self._analysis_result(entities)
 
+        except Exception as e:
             if self.debug:
-                print_executing(f"Analyzing {', '.join(entities.cities)} 🔄")
-                print_info(f"States involved: {', '.join(entities.states)}")
+                print_debug(f"Error in analysis: {str(e)}")
+            return {"status": "error", "message": str(e)}
 
-            result = {
-                "status": "success",
-                "entities": entities.model_dump(),
-            }
+    async def analyze_async(self, query: str) -> dict:
+        """Async variant of analyze, so it can run alongside planning"""
+        self._print_analysis_banner()
 
+        try:
+            entities = await self._extract_entities_async(query)
+            return self._analysis_result(entities)
+
+        except Exception as e:
             if self.debug:
-                print_debug("Analysis completed successfully! 🎉")
-            return result
+                print_debug(f"Error in analysis: {str(e)}")
+            return {"status": "error", "message": str(e)}
+
+    def analyze_extraction(self, query: str, extraction: QueryExtraction) -> dict:
+        """Same result as analyze, built from a QueryExtractionAgent result"""
+        self._print_analysis_banner()
+
+        try:
+            result = extract_query_entities(
+                query=query,
+                cities=extraction.cities,
+                pattern_type=extraction.pattern_type,
+                output_type=extraction.output_type,
+                debug=self.debug,
+            )
+            return self._analysis_result(QueryEntities(**result))
 
         except Exception as e:
             if self.debug:
                 print_debug(f"Error in analysis: {str(e)}")
-            return {"status": "error", "message": str(e)}
\ No newline at end of file
+            return {"status": "error", "message": str(e)}
+
+
+class QueryExtractionAgent:
+    """Single structured-output call that replaces the separate planning
+    classification calls and the entity extraction call.
+
+    The result fills both the ExecutionPlan (cities, search and
+    visualization flags) and QueryEntities (pattern and output type).
+    """
+
+    def __init__(self, client, model_name: str, debug: bool = False):
+        self.client = client
+        self.model_name = model_name
+        self.debug = debug
+        self.usage = empty_usage()
+
+    def _record_usage(self, response) -> None:
+        add_usage(self.usage, gemini_usage(response))
+
+    def _extraction_request(self, query: str) -> dict:
+        return dict(
+            model=self.model_name,
+            contents=f"""Extract the following from this EV infrastructure query: '{query}'
+
+            - cities: every city mentioned, with its full proper name (e.g. "San Francisco")
+            - pattern_type: the type of analysis requested. Examples of patterns:
+                - "I want to understand..." -> DISCOVERY
+                - "Compare between..." -> COMPARISON
+                - "Show gaps in..." -> GAPS
+                - "Where should we add..." -> PLANNING
+                - "How well are... performing" -> ASSESSMENT
+            - output_type: the type of output requested
+            - needs_visualization: true if the query asks for visualizations ("plot", "chart", "graph", "visualize")
+            - needs_search: true if the query asks for enhanced search/grounding ("detailed research", "comprehensive", "grounded", "ground with search", "enhance sections", "cross check citations")
+            """,
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=QueryExtraction,
+            ),
+        )
+
+    def _parse_response(self, response) -> QueryExtraction:
+        extraction = response.parsed
+        if not isinstance(extraction, QueryExtraction):
+            extraction = QueryExtraction.model_validate_json(response.text)
+
+        # Match STATE_MAPPING keys
+        extraction.cities = [city.strip().title() for city in extraction.cities]
+        if self.debug:
+            print_debug(f"Structured extraction: {extraction.model_dump_json()}")
+        return extraction
+
+    def extract(self, query: str) -> Optional[QueryExtraction]:
+        """Extracts query details, or returns None if the call fails"""
+        try:
+            response = self.client.models.generate_content(
+                **self._extraction_request(query)
+            )
+            self._record_usage(response)
+            return self._parse_response(response)
+
+        except Exception as e:
+            if self.debug:
+                print_debug(f"Error in structured extraction: {str(e)}")
+            return None
+
+    async def extract_async(self, query: str) -> Optional[QueryExtraction]:
+        """Async variant of extract"""
+        try:
+            response = await self.client.aio.models.generate_content(
+                **self._extraction_request(query)
+            )
+            self._record_usage(response)
+            return self._parse_response(response)
+
+        except Exception as e:
+            if self.debug:
+                print_debug(f"Error in structured extraction: {str(e)}")
+            return None
@@ -4,9 +4,15 @@ import asyncio
 from dataclasses import dataclass
 from datetime import datetime
 import json
-from typing import Dict, List, Optional, Union
+import random
+import time
+from typing import Dict, List, Optional, Tuple, Union
 
+from enerbix.utils.tracing import record, span
+from enerbix.utils.usage import add_usage, empty_usage, gemini_cache_usage, gemini_usage
+from google.genai import errors
 from google.genai.types import (
+    CreateCachedContentConfig,
     DynamicRetrievalConfig,
     GenerateContentConfig,
     GoogleSearchRetrieval,
@@ -48,6 +54,7 @@ class Section:
     citations: Dict[int, CitationData]
     key_findings: List[str]
     enhanced_content: Optional[str] = None
+    enhancement_seconds: Optional[float] = None
 
 
 @dataclass
@@ -75,15 +82,220 @@ class SearchEnhancement(BaseModel):
     analysis_gaps: List[str] = Field(default_factory=list)
 
 
+# HTTP codes worth retrying: rate limited or temporarily unavailable
+RETRYABLE_STATUS_CODES = (429, 500, 503)
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Check if a Gemini API error is a rate limit or transient server error"""
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return "RESOURCE_EXHAUSTED" in str(error)
+
+
+SECTION_NAMES = [
+    "Executive Summary",
+    "Infrastructure Overview",
+    "Current EV Assessment",
+    "Demand Analysis",
+    "Supply Analysis",
+    "Gap Analysis",
+    "Location Recommendations",
+    "Implementation Strategy",
+]
+
+# Prompt encodings for the data map: "flat" is a path | value | unit table,
+# "compact" JSON without whitespace, "json" the original indented JSON
+DATA_FORMATS = ("flat", "compact", "json")
+DATA_MAP_KEYS = ("path", "value", "unit")
+
+
+def flatten_data_map(data_map: Dict) -> List[Tuple[str, str, str]]:
+    """Flattens a data map into (path, value, unit) rows.
+
+    Entries carry their own source path, so the map's nesting and the
+    repeated path/unit keys add nothing for the model. Extra fields on an
+    entry (e.g. ports) become rows under the entry's path.
+    """
+    rows = []
+
+    def walk(node):
+        if isinstance(node, list):
+            for item in node:
+                walk(item)
+        elif isinstance(node, dict) and "path" in node:
+            if "value" in node:
+                rows.append((node["path"], node["value"], node.get("unit", "")))
+            for key, value in node.items():
+                if key not in DATA_MAP_KEYS:
+                    rows.append((f"{node['path']}.{key}", str(value), ""))
+        elif isinstance(node, dict):
+            for child in node.values():
+                walk(child)
+
+    walk(data_map)
+    return rows
+
+
+def format_data_map(data_map: Dict, data_format: str = "flat") -> str:
+    """Serializes a data map for a prompt"""
+    if data_format == "json":
+        return json.dumps(data_map, indent=2)
+    if data_format == "compact":
+        return json.dumps(data_map, separators=(",", ":"))
+    if data_format != "flat":
+        raise ValueError(f"data_format must be one of {DATA_FORMATS}")
+    lines = ["path | value | unit"]
+    lines.extend(" | ".join(row).rstrip(" |") for row in flatten_data_map(data_map))
+    return "\n".join(lines)
+
+
+# Data map paths (or path prefixes) each section is given. Sections not listed
+# here get the full data map.
+SECTION_DATA_PATHS: Dict[str, List[str]] = {
+    "Executive Summary": [
+        "summary.area_metrics.total_area_sqkm",
+        "summary.parking.ev_charging",
+        "ev_data.metadata",
+        "ev_data.charging_capabilities",
+        "ev_data.network_analysis.networks",
+    ],
+    "Infrastructure Overview": [
+        "summary.area_metrics",
+        "summary.roads",
+        "summary.transport",
+        "summary.parking",
+        "ev_data.metadata",
+    ],
+    "Current EV Assessment": ["ev_data"],
+    "Demand Analysis": [
+        "summary.area_metrics",
+        "summary.buildings",
+        "summary.retail",
+        "summary.transport",
+        "summary.parking",
+        "ev_data.metadata",
+    ],
+    "Supply Analysis": [
+        "summary.parking.ev_charging",
+        "ev_data.metadata",
+        "ev_data.charging_capabilities",
+        "ev_data.accessibility",
+        "ev_data.network_analysis",
+    ],
+    "Gap Analysis": [
+        "summary.area_metrics",
+        "summary.roads",
+        "summary.buildings",
+        "summary.parking",
+        "ev_data.metadata",
+        "ev_data.charging_capabilities",
+        "ev_data.accessibility",
+    ],
+    "Location Recommendations": [
+        "summary.area_metrics",
+        "summary.roads",
+        "summary.transport",
+        "summary.buildings",
+        "summary.retail",
+        "summary.parking",
+        "ev_data.metadata",
+        "ev_data.charging_capabilities",
+    ],
+    "Implementation Strategy": [
+        "summary.parking",
+        "ev_data.metadata",
+        "ev_data.charging_capabilities",
+        "ev_data.network_analysis",
+        "ev_data.station_age",
+    ],
+}
+
+
+def _path_matches(path: str, prefixes: List[str]) -> bool:
+    return any(
+        path == prefix or path.startswith((f"{prefix}.", f"{prefix}["))
+        for prefix in prefixes
+    )
+
+
+def slice_data_map(data_map: Dict, prefixes: List[str]) -> Dict:
+    """Returns the part of a data map whose entry paths match the prefixes"""
+
+    def prune(node):
+        if isinstance(node, list):
+            return [item for item in map(prune, node) if item]
+        if isinstance(node, dict) and "path" in node:
+            return node if _path_matches(node["path"], prefixes) else None
+        if isinstance(node, dict):
+            pruned = {key: prune(child) for key, child in node.items()}
+            return {key: child for key, child in pruned.items() if child}
+        return node
+
+    return prune(data_map)
+
+
+def data_map_paths(data_map: Dict) -> Dict[str, str]:
+    """Maps every path a citation may use to the entry's data path.
+
+    Besides the entry paths (and their extra fields, as in the flat table),
+    the key path through the data map itself is accepted, since that is what
+    a model sees in the JSON encodings.
+    """
+    paths = {}
+
+    def walk(node, key_path):
+        if isinstance(node, list):
+            for i, item in enumerate(node):
+                walk(item, f"{key_path}[{i}]")
+        elif isinstance(node, dict) and "path" in node:
+            paths[node["path"]] = paths[key_path] = node["path"]
+            for key in node:
+                if key not in DATA_MAP_KEYS:
+                    paths[f"{node['path']}.{key}"] = f"{node['path']}.{key}"
+                    paths[f"{key_path}.{key}"] = f"{node['path']}.{key}"
+        elif isinstance(node, dict):
+            for key, child in node.items():
+                walk(child, f"{key_path}.{key}" if key_path else key)
+
+    walk(data_map, "")
+    return paths
+
+
 class ReportAgent:
     def __init__(
-        self, client, model_name: str, enable_search: bool = False, debug: bool = False
+        self,
+        client,
+        model_name: str,
+        enable_search: bool = False,
+        debug: bool = False,
+        max_concurrent_enhancements: int = 4,
+        max_retries: int = 3,
+        retry_base_delay: float = 2.0,
+        max_concurrent_requests: int = 8,
+        data_format: str = "flat",
+        prompt_cache: bool = False,
+        prompt_cache_ttl: int = 600,
     ):
         self.client = client
         self.model_name = model_name
         self.enable_search = enable_search
         self.citation_counter = 0
         self.debug = debug
+        self.max_concurrent_enhancements = max_concurrent_enhancements
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        if data_format not in DATA_FORMATS:
+            raise ValueError(f"data_format must be one of {DATA_FORMATS}")
+        self.data_format = data_format
+        # Send the instructions and the full data map once per city as Gemini
+        # cached content instead of a data slice in every section prompt
+        self.prompt_cache = prompt_cache
+        self.prompt_cache_ttl = prompt_cache_ttl
+        # Global cap on in-flight model calls across all cities and sections
+        self.request_semaphore = asyncio.Semaphore(max(1, max_concurrent_requests))
+        # Token usage summed over this agent's model calls and cache writes
+        self.usage = empty_usage()
         # print("self.debug", self.debug)
         if not self.debug:
             rich_print(
@@ -102,17 +314,122 @@ class ReportAgent:
     def log_error(self, msg: str):
         print(colored(f"ERROR: {msg}", "red", attrs=["bold"]))
 
+    async def _generate_with_retry(self, **request):
+        """Calls the model, backing off and retrying on rate limits and
+        transient server errors"""
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                record(retries=1)
+            try:
+                # The slot is released while backing off
+                async with self.request_semaphore:
+                    response = await self.client.aio.models.generate_content(**request)
+                add_usage(self.usage, gemini_usage(response))
+                return response
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable_error(e):
+                    raise
+                # Exponential backoff with jitter so parallel calls spread out
+                delay = self.retry_base_delay * 2**attempt * (1 + random.random())
+                if self.debug:
+                    self.log_debug(
+                        f"Retryable error ({e}), retrying in {delay:.1f}s "
+                        f"(attempt {attempt + 1}/{self.max_retries})"
+                    )
+                await asyncio.sleep(delay)
+
     async def _generate_section(
-        self, section_name: str, city_data, agent_1_result
+        self,
+        section_name: str,
+        city_data,
+        agent_1_result,
+        section_data: Optional[Dict] = None,
+        shared_prompt: Optional[str] = None,
+        cached_content: Optional[str] = None,
     ) -> Optional[Section]:
+        """Generates one section.
+
+        By default the prompt carries the section's slice of the data map.
+        With a shared_prompt (the full data map, see _generate_sections) only
+        the section name and its focus paths are added, and with
+        cached_content the shared part is read from the Gemini cache.
+        """
 
         if self.debug:
             self.log_info(f"Generating {section_name}...")
 
-        data_map = self._prepare_data_map(city_data)
-        formatted_data = json.dumps(data_map, indent=2)
+        if section_data is None:
+            section_data = self._prepare_data_map(city_data)
+            if shared_prompt is None:
+                section_data = self._section_data(section_data, section_name)
+
+        focus_paths = None
+        if shared_prompt is None:
+            shared_prompt = self._shared_prompt(
+                city_data, format_data_map(section_data, self.data_format)
+            )
+        else:
+            focus_paths = SECTION_DATA_PATHS.get(section_name)
+        valid_paths = data_map_paths(section_data)
+        section_prompt = self._section_prompt(section_name, focus_paths)
+
+        if cached_content:
+            request = {
+                "contents": section_prompt,
+                "config": GenerateContentConfig(cached_content=cached_content),
+            }
+        else:
+            request = {"contents": shared_prompt + section_prompt}
 
-        prompt = f"""Generate {section_name} for EV infrastructure analysis in {city_data.summary.city}, {city_data.summary.state}. Return JSON without markdown code fences:
+        try:
+            with span(f"section: {section_name}", "report", section=section_name):
+                response = await self._generate_with_retry(
+                    model=self.model_name, **request
+                )
+
+            # Clean response text of markdown code fences
+            cleaned_json = response.text.replace("```json\n", "").replace("\n```", "")
+            data = json.loads(cleaned_json)
+
+            citations = {}
+            for c in data.get("citations", []):
+                try:
+                    if not (c.get("value") and c.get("data_path")):
+                        continue  # Only process valid citations
+                    data_path = valid_paths.get(str(c["data_path"]).strip())
+                    if data_path is None:
+                        if self.debug:
+                            self.log_debug(
+                                f"{section_name}: dropping citation [{c.get('number')}] "
+                                f"with unknown data_path {c['data_path']}"
+                            )
+                        continue
+                    citations[c["number"]] = CitationData(
+                        number=c["number"],
+                        value=str(c["value"]),  # Ensure string
+                        data_path=data_path,
+                        raw_value=str(c.get("raw_value", c["value"])),
+                        context=str(c.get("context", "")),
+                    )
+                except Exception as citation_error:
+                    self.log_error(f"Citation processing error: {citation_error}")
+                    continue
+
+            return Section(
+                title=section_name,
+                content=data["content"],
+                citations=citations,
+                key_findings=data["key_findings"],
+            )
+
+        except Exception as e:
+            self.log_error(f"{section_name} generation failed: {str(e)}")
+            return None
+
+    def _shared_prompt(self, city_data, formatted_data: str) -> str:
+        """Instructions and data, identical for every section that gets the
+        same data, so they form a cacheable prompt prefix"""
+        return f"""You are writing sections of an EV infrastructure analysis report for {city_data.summary.city}, {city_data.summary.state}. Return each section as JSON without markdown code fences:
       {{
           "content": "Analysis text with citations [n]",
           "citations": [
@@ -132,7 +449,7 @@ class ReportAgent:
       2. Min 5 data points with citations
       3. Min 3 paragraphs
       4. Use markdown headings
-      5. Include source data paths
+      5. Set each citation's data_path to the cited value's path exactly as given in the available data
 
       Guidelines:
       1. Use specific data points with citation numbers [n]
@@ -148,43 +465,53 @@ class ReportAgent:
       {formatted_data}
       """
 
+    def _section_prompt(
+        self, section_name: str, focus_paths: Optional[List[str]] = None
+    ) -> str:
+        prompt = f"Generate the {section_name} section."
+        if focus_paths:
+            prompt += f" Draw mainly on these data paths: {', '.join(focus_paths)}."
+        return prompt
+
+    async def _create_prompt_cache(
+        self, city_data, shared_prompt: str
+    ) -> Optional[str]:
+        """Stores the shared prompt as Gemini cached content. Returns the cache
+        name, or None when it cannot be cached (e.g. below the model's minimum
+        cacheable size), in which case each section gets its data slice."""
         try:
-            response = await self.client.aio.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-            )
-
-            # Clean response text of markdown code fences
-            cleaned_json = response.text.replace("```json\n", "").replace("\n```", "")
-            data = json.loads(cleaned_json)
-
-            citations = {}
-            for c in data.get("citations", []):
-                try:
-                    if c.get("value") and c.get(
-                        "data_path"
-                    ):  # Only process valid citations
-                        citations[c["number"]] = CitationData(
-                            number=c["number"],
-                            value=str(c["value"]),  # Ensure string
-                            data_path=str(c["data_path"]),  # Ensure string
-                            raw_value=str(c.get("raw_value", c["value"])),
-                            context=str(c.get("context", "")),
-                        )
-                except Exception as citation_error:
-                    self.log_error(f"Citation processing error: {citation_error}")
-                    continue
+            async with self.request_semaphore:
+                with span("prompt_cache", "llm", city=city_data.summary.city):
+                    cache = await self.client.aio.caches.create(
+                        model=self.model_name,
+                        config=CreateCachedContentConfig(
+                            contents=[shared_prompt],
+                            display_name=f"report-{city_data.summary.city}",
+                            ttl=f"{self.prompt_cache_ttl}s",
+                        ),
+                    )
+                    usage = gemini_cache_usage(cache)
+                    record(tokens=usage)
+                    add_usage(self.usage, usage)
+        except Exception as e:
+            if self.debug:
+                self.log_debug(f"Prompt cache unavailable, sending data slices: {e}")
+            return None
 
-            return Section(
-                title=section_name,
-                content=data["content"],
-                citations=citations,
-                key_findings=data["key_findings"],
-            )
+        if self.debug:
+            self.log_debug(f"Cached shared prompt for {city_data.summary.city}")
+        return cache.name
 
+    async def _delete_prompt_cache(self, name: str):
+        try:
+            await self.client.aio.caches.delete(name=name)
         except Exception as e:
-            self.log_error(f"{section_name} generation failed: {str(e)}")
-            return None
+            self.log_error(f"Could not delete prompt cache {name}: {e}")
+
+    def _section_data(self, data_map: Dict, section_name: str) -> Dict:
+        """Slice of the data map that a section's prompt carries"""
+        prefixes = SECTION_DATA_PATHS.get(section_name)
+        return slice_data_map(data_map, prefixes) if prefixes else data_map
 
     def _prepare_data_map(self, city_data) -> Dict:
         """Prepare complete data mapping with paths."""
@@ -426,8 +753,9 @@ class ReportAgent:
                             "name": net.name,
                             "count": str(net.station_count),
                             "percentage": f"{net.percentage:.1f}",
+                            "path": f"ev_data.network_analysis.networks[{i}]",
                         }
-                        for net in ev_data.network_analysis.networks
+                        for i, net in enumerate(ev_data.network_analysis.networks)
                     ],
                     "pricing": {
                         "free": {
@@ -471,43 +799,76 @@ class ReportAgent:
         if self.debug:
             self.log_process("Starting analysis...")
 
-        reports = []
-        for city, city_data in zip(
-            agent_1_result["entities"]["cities"], data_output.cities_data
-        ):
-            if self.debug:
-                self.log_info(f"Processing {city}")
+        # Cities run concurrently; request_semaphore bounds the model calls
+        # they make in total, and gather keeps the reports in city order
+        reports = await asyncio.gather(
+            *(
+                self._analyze_city(city, city_data, agent_1_result)
+                for city, city_data in zip(
+                    agent_1_result["entities"]["cities"], data_output.cities_data
+                )
+            )
+        )
+
+        return reports[0] if len(reports) == 1 else list(reports)
+
+    async def _analyze_city(self, city: str, city_data, agent_1_result) -> Report:
+        if self.debug:
+            self.log_info(f"Processing {city}")
+        with span(f"report: {city}", "report", city=city):
             sections = await self._generate_sections(city_data, agent_1_result)
 
             if self.enable_search:
                 sections = await self.enhance_sections(sections, city_data)
 
-            report = self._assemble_report(city_data, sections)
-            reports.append(report)
-
-        return reports[0] if len(reports) == 1 else reports
+            return self._assemble_report(city_data, sections)
 
     async def _generate_sections(self, city_data, agent_1_result) -> Dict[str, Section]:
         if self.debug:
             self.log_process("Generating sections...")
 
-        section_names = [
-            "Executive Summary",
-            "Infrastructure Overview",
-            "Current EV Assessment",
-            "Demand Analysis",
-            "Supply Analysis",
-            "Gap Analysis",
-            "Location Recommendations",
-            "Implementation Strategy",
-        ]
-
-        tasks = [
-            self._generate_section(name, city_data, agent_1_result)
-            for name in section_names
-        ]
-
-        sections = await asyncio.gather(*tasks)
+        # The data map is the same for every section of a city, so it is
+        # built once here
+        data_map = self._prepare_data_map(city_data)
+
+        cached_content = None
+        if self.prompt_cache:
+            # Every section shares one prefix with the full map, cached once
+            # per city; the section requests only add the section name
+            shared_prompt = self._shared_prompt(
+                city_data, format_data_map(data_map, self.data_format)
+            )
+            cached_content = await self._create_prompt_cache(city_data, shared_prompt)
+
+        if cached_content is None:
+            # Each section is given its slice of the map
+            tasks = [
+                self._generate_section(
+                    name,
+                    city_data,
+                    agent_1_result,
+                    self._section_data(data_map, name),
+                )
+                for name in SECTION_NAMES
+            ]
+        else:
+            tasks = [
+                self._generate_section(
+                    name,
+                    city_data,
+                    agent_1_result,
+                    data_map,
+                    shared_prompt,
+                    cached_content,
+                )
+                for name in SECTION_NAMES
+            ]
+
+        try:
+            sections = await asyncio.gather(*tasks)
+        finally:
+            if cached_content:
+                await self._delete_prompt_cache(cached_content)
         return {s.title: s for s in sections if s}
 
     def _assemble_report(self, city_data, sections: Dict[str, Section]) -> Report:
@@ -617,7 +978,7 @@ class ReportAgent:
           """
 
             # Get response with grounding
-            response = await self.client.aio.models.generate_content(
+            response = await self._generate_with_retry(
                 model=self.model_name,
                 contents=prompt,
                 config=GenerateContentConfig(
@@ -737,17 +1098,31 @@ class ReportAgent:
     async def enhance_sections(
         self, sections: Dict[str, Section], city_data
     ) -> Dict[str, Section]:
+        """Enhances all sections concurrently, at most
+        max_concurrent_enhancements at a time. Each section records how long
+        its enhancement took in enhancement_seconds."""
         if self.debug:
             self.log_process("Enhancing sections with external data...")
-        enhanced = {}
-
-        for name, section in sections.items():
-            enhanced[name] = await self._enhance_section_with_search(section, city_data)
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrent_enhancements))
+
+        async def enhance(name: str, section: Section) -> Section:
+            async with semaphore:
+                start = time.perf_counter()
+                with span(f"enhance: {name}", "report", section=name):
+                    section = await self._enhance_section_with_search(
+                        section, city_data
+                    )
+                section.enhancement_seconds = time.perf_counter() - start
             self.log_debug(
-                f"Enhanced {name} with {len(section.citations)} new citations"
+                f"Enhanced {name} with {len(section.citations)} new citations "
+                f"in {section.enhancement_seconds:.2f}s"
             )
+            return section
 
-        return enhanced
+        enhanced = await asyncio.gather(
+            *(enhance(name, section) for name, section in sections.items())
+        )
+        return dict(zip(sections.keys(), enhanced))
 
     async def enhance_all_sections(
         self, sections: Dict[str, Section], city_data
@@ -757,4 +1132,4 @@ class ReportAgent:
             enhanced[name] = await self._safe_generate(
                 self._enhance_section_with_search, section, city_data
             )
-        return enhanced
\ No newline at end of file
+        return enhanced
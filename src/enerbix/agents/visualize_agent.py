@@ -1,5 +1,6 @@
 # @title Helper Functions
 
+from enerbix.utils.tracing import span
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -480,11 +481,13 @@ def plot_all_visualizations(data):
                comparison_figs will be empty if only one city is provided
     """
     # Generate single city visualizations
-    single_city_figs = create_comprehensive_city_analysis(data)
+    with span("city_figures", "visualization"):
+        single_city_figs = create_comprehensive_city_analysis(data)
 
     # Generate multi-city comparison visualizations if applicable
     comparison_figs = {}
     if len(data.cities_data) > 1:
-        comparison_figs = plot_multi_city_comparison(data)
+        with span("comparison_figures", "visualization"):
+            comparison_figs = plot_multi_city_comparison(data)
 
     return single_city_figs, comparison_figs
\ No newline at end of file
@@ -0,0 +1,131 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "ENERBIX_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "enerbix")
+)
+
+
+class OverpassCache:
+    """
+    Content-addressed on-disk cache for Overpass city pulls.
+
+    Entries are keyed by (city, bbox, query hash) and stored as gzipped compact
+    JSON, one file per entry. File mtime tracks last access so the cache can
+    evict least recently used entries once it grows past `max_bytes`.
+    """
+
+    SUFFIX = ".json.gz"
+
+    def __init__(
+        self,
+        cache_dir: str = os.path.join(DEFAULT_CACHE_DIR, "overpass"),
+        ttl_seconds: Optional[float] = 7 * 24 * 3600,
+        max_bytes: int = 1024**3,
+        debug: bool = False,
+    ):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.debug = debug
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(city: str, bbox: List, query: str) -> str:
+        """Build the content address for a (city, bbox, query) triple"""
+        query_hash = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        identity = json.dumps(
+            [city.strip().lower(), [str(b) for b in bbox], query_hash],
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + self.SUFFIX)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for key, or None if missing or expired"""
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, json.JSONDecodeError) as e:
+            if self.debug:
+                print(f"Debug: Dropping unreadable cache entry {key}: {str(e)}")
+            self.delete(key)
+            return None
+
+        if (
+            self.ttl_seconds is not None
+            and time.time() - entry["stored_at"] > self.ttl_seconds
+        ):
+            if self.debug:
+                print(f"Debug: Cache entry {key} expired")
+            self.delete(key)
+            return None
+
+        # Refresh mtime so LRU eviction sees this entry as recently used
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+        return entry["result"]
+
+    def set(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a result atomically and evict old entries if over budget"""
+        entry = {"stored_at": time.time(), "result": result}
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(
+                fileobj=raw, mode="wb"
+            ) as f:
+                f.write(json.dumps(entry, separators=(",", ":")).encode("utf-8"))
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self.evict()
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(self.SUFFIX):
+                self.delete(name[: -len(self.SUFFIX)])
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits max_bytes"""
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self.SUFFIX):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+            total += stat.st_size
+
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if self.debug:
+                print(f"Debug: Evicting cache entry {name}")
+            self.delete(name[: -len(self.SUFFIX)])
+            total -= size
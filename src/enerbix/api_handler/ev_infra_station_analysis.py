@@ -1,9 +1,26 @@
 # @title Helper Functions
 
+import asyncio
+from collections import deque
 from datetime import datetime
 from math import atan2, cos, radians, sin, sqrt
-from typing import Any, Dict, List, Optional, Union
-
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from enerbix.api_handler.geocoding import get_geocoder
+from enerbix.api_handler.http_client import get_http_client
+from enerbix.utils.tracing import span
+import numpy as np
+import pandas as pd
 from pydantic import BaseModel
 import requests
 
@@ -11,7 +28,9 @@ import requests
 DEFAULT_TIMEOUT = 30
 DEFAULT_RADIUS = 25.0
 DEFAULT_STATIONS_PER_PAGE = 200
+DEFAULT_PAGE_CONCURRENCY = 4  # NREL pages requested in parallel per city
 EARTH_RADIUS_MILES = 3956
+NREL_URL = "https://developer.nrel.gov/api/alt-fuel-stations/v1.json"
 
 
 # Data Models
@@ -102,215 +121,398 @@ class StationAnalysis(BaseModel):
     station_age: StationAge
 
 
-def analyze_facility_types(stations: List[Dict]) -> FacilityTypeCount:
-    """Analyze facility types from station data"""
-    counts = FacilityTypeCount()
-
-    for station in stations:
-        # Handle potential None values properly
-        facility_type = (station.get("facility_type") or "").lower()
-
-        if "parking" in facility_type or "garage" in facility_type:
-            counts.parking_garage += 1
-        elif "retail" in facility_type or "shopping" in facility_type:
-            counts.retail += 1
-        elif "workplace" in facility_type or "office" in facility_type:
-            counts.workplace += 1
-        else:
-            counts.other += 1
+def _percentage(count: int, total: int) -> float:
+    return round((count / total * 100), 2) if total > 0 else 0
+
+
+# NREL fields read by the station analysis
+STATION_COLUMNS = [
+    "facility_type",
+    "intersection_directions",
+    "city_center",
+    "ev_dc_fast_num",
+    "ev_level2_evse_num",
+    "ev_level1_evse_num",
+    "ev_power_level_dc_max",
+    "ev_power_level_l2_max",
+    "ev_power_level_l1_max",
+    "ev_connector_types",
+    "access_days_time",
+    "access_code",
+    "ev_network",
+    "status_code",
+    "ev_pricing",
+    "open_date",
+    "date_last_confirmed",
+]
+
+# (speed name, port count field, max power field)
+CHARGING_LEVELS = [
+    ("dc_fast", "ev_dc_fast_num", "ev_power_level_dc_max"),
+    ("level2", "ev_level2_evse_num", "ev_power_level_l2_max"),
+    ("level1", "ev_level1_evse_num", "ev_power_level_l1_max"),
+]
+
+# Parse outcome codes for date columns
+DATE_MISSING, DATE_PARSED, DATE_INVALID = 0, 1, 2
+
+
+def _numbers(column: pd.Series) -> np.ndarray:
+    """Equivalent of `float(value or 0)` for a whole column"""
+    return pd.to_numeric(column, errors="coerce").fillna(0).to_numpy(np.float64)
+
+
+def _ordered_counts(values: Union[pd.Series, np.ndarray]) -> Dict[Any, int]:
+    """Value counts keyed in order of first appearance"""
+    codes, uniques = pd.factorize(values)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    return {value: int(count) for value, count in zip(uniques, counts)}
+
+
+def _facility_category(facility_type: str) -> str:
+    if "parking" in facility_type or "garage" in facility_type:
+        return "parking_garage"
+    if "retail" in facility_type or "shopping" in facility_type:
+        return "retail"
+    if "workplace" in facility_type or "office" in facility_type:
+        return "workplace"
+    return "other"
+
+
+class TextColumn:
+    """
+    Categorical encoding of a low-cardinality text field.
+
+    String tests are evaluated once per distinct value and broadcast back to
+    the rows through the factorized codes.
+    """
+
+    def __init__(self, column: pd.Series):
+        self.codes, uniques = pd.factorize(column)
+        # Code -1 (None/NaN) selects the trailing "" slot
+        self.values = [value or "" for value in uniques] + [""]
+
+    def lower(self) -> "TextColumn":
+        self.values = [value.lower() for value in self.values]
+        return self
+
+    def mask(self, predicate: Callable[[str], bool]) -> np.ndarray:
+        return np.array([predicate(v) for v in self.values], dtype=bool)[self.codes]
+
+    def map(self, function: Callable[[str], Any]) -> np.ndarray:
+        return np.array([function(v) for v in self.values], dtype=object)[self.codes]
+
+
+class StationTable:
+    """
+    Columnar view of a batch of NREL stations.
+
+    Every field used by the analysis is pulled out of the station dicts once
+    into NumPy arrays of flags, categorical codes, port counts, power levels
+    and station ages, so the metrics reduce to vectorized sums.
+    """
+
+    def __init__(
+        self, stations: List[Dict], now: Optional[datetime] = None, debug: bool = False
+    ):
+        self.now = now or datetime.now()
+        self.debug = debug
+        self.size = len(stations)
+        frame = pd.DataFrame(stations, columns=STATION_COLUMNS)
+
+        # Geography
+        self.facility_type = (
+            TextColumn(frame["facility_type"]).lower().map(_facility_category)
+        )
+        self.near_highway = TextColumn(frame["intersection_directions"]).mask(bool)
+        self.city_center = (
+            TextColumn(frame["city_center"]).lower().mask(lambda v: "downtown" in v)
+        )
 
-    return counts
+        # Charging levels
+        self.ports = {}
+        self.max_power = {}
+        for speed_name, ports_field, power_field in CHARGING_LEVELS:
+            self.ports[speed_name] = _numbers(frame[ports_field]).astype(np.int64)
+            self.max_power[speed_name] = _numbers(frame[power_field])
+
+        connectors = frame["ev_connector_types"].explode().dropna()
+        self.connectors = connectors[connectors.astype(bool)]
+
+        # Accessibility
+        access_time = TextColumn(frame["access_days_time"]).lower()
+        self.access_24_7 = access_time.mask(lambda v: "24 hours" in v)
+        self.access_restricted = access_time.mask(lambda v: "restricted" in v)
+        self.access_public = (
+            TextColumn(frame["access_code"]).lower().mask(lambda v: v == "public")
+        )
 
+        network = TextColumn(frame["ev_network"]).lower()
+        self.networked = network.mask(
+            lambda v: bool(v) and v not in ["tesla", "non-networked"]
+        )
+        self.tesla = ~self.networked & network.mask(lambda v: "tesla" in v)
+        self.pay_mentioned = (
+            ~self.networked
+            & ~self.tesla
+            & access_time.mask(
+                lambda v: any(keyword in v for keyword in ["pay", "fee", "paid"])
+            )
+        )
+        self.operational = (frame["status_code"] == "E").to_numpy()
 
-def analyze_charging_capabilities(stations: List[Dict]) -> ChargingCapabilities:
-    """Analyze charging capabilities from station data"""
-    speeds = {
-        "dc_fast": ChargingSpeed(),
-        "level2": ChargingSpeed(),
-        "level1": ChargingSpeed(),
-    }
+        # Networks and pricing
+        self.networks = TextColumn(frame["ev_network"]).map(lambda v: v or "Unknown")
+        pricing = TextColumn(frame["ev_pricing"]).lower()
+        self.free = pricing.mask(lambda v: not v or v in ["free", "no fee", "no charge"])
+        self.variable = ~self.free & pricing.mask(lambda v: "variable" in v)
 
-    connector_types = {}
-    total_ports = 0
+        # Station age
+        self.open_status, self.open_age = self._parse_dates(
+            frame["open_date"], "open date"
+        )
+        self.verified_status, self.verified_age = self._parse_dates(
+            frame["date_last_confirmed"], "verification date"
+        )
 
-    for station in stations:
-        # Count ports and analyze charging speeds
-        dc_ports = int(station.get("ev_dc_fast_num") or 0)
-        l2_ports = int(station.get("ev_level2_evse_num") or 0)
-        l1_ports = int(station.get("ev_level1_evse_num") or 0)
+    def _parse_dates(self, column: pd.Series, label: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Parse a date column into (status, age in days) arrays.
+
+        Each distinct value is parsed once with the same strptime format as
+        before, then broadcast back to every row through its factorized code.
+        """
+        codes, uniques = pd.factorize(column)
+        status = np.full(len(uniques) + 1, DATE_MISSING, dtype=np.int8)
+        age = np.zeros(len(uniques) + 1, dtype=np.int64)
+
+        for i, value in enumerate(uniques):
+            if not value:
+                continue
+            try:
+                age[i] = (self.now - datetime.strptime(value, "%Y-%m-%d")).days
+                status[i] = DATE_PARSED
+            except:
+                if self.debug:
+                    print(f"Debug: Could not parse {label}: {value}")
+                status[i] = DATE_INVALID
+
+        # Code -1 (missing value) selects the trailing DATE_MISSING slot
+        return status[codes], age[codes]
+
+    def facility_counts(self) -> Dict[str, int]:
+        return {
+            name: int(np.count_nonzero(self.facility_type == name))
+            for name in ["parking_garage", "retail", "workplace", "other"]
+        }
 
-        total_ports += dc_ports + l2_ports + l1_ports
+    def age_distribution(self) -> Dict[str, int]:
+        parsed = self.open_status == DATE_PARSED
+        return {
+            "less_than_1_year": int(np.count_nonzero(parsed & (self.open_age <= 365))),
+            "1_to_3_years": int(
+                np.count_nonzero(
+                    parsed & (self.open_age > 365) & (self.open_age <= 1095)
+                )
+            ),
+            "more_than_3_years": int(
+                np.count_nonzero(parsed & (self.open_age > 1095))
+                + np.count_nonzero(self.open_status == DATE_INVALID)
+            ),
+        }
 
-        if dc_ports:
-            speeds["dc_fast"].count += 1
-            speeds["dc_fast"].total_ports += dc_ports
-            speeds["dc_fast"].max_power = max(
-                speeds["dc_fast"].max_power,
-                float(station.get("ev_power_level_dc_max") or 0),
+    def last_verified(self) -> Dict[str, int]:
+        parsed = self.verified_status == DATE_PARSED
+        last_30_days = int(np.count_nonzero(parsed & (self.verified_age <= 30)))
+        last_90_days = int(
+            np.count_nonzero(
+                parsed & (self.verified_age > 30) & (self.verified_age <= 90)
             )
+        )
+        return {
+            "last_30_days": last_30_days,
+            "last_90_days": last_90_days,
+            "older": self.size - last_30_days - last_90_days,
+        }
 
-        if l2_ports:
-            speeds["level2"].count += 1
-            speeds["level2"].total_ports += l2_ports
-            speeds["level2"].max_power = max(
-                speeds["level2"].max_power,
-                float(station.get("ev_power_level_l2_max") or 0),
-            )
 
-        if l1_ports:
-            speeds["level1"].count += 1
-            speeds["level1"].total_ports += l1_ports
-            speeds["level1"].max_power = max(
-                speeds["level1"].max_power,
-                float(station.get("ev_power_level_l1_max") or 0),
-            )
+class StationAccumulator:
+    """
+    Incrementally aggregates station metrics.
 
-        # Analyze connector types
-        connectors = station.get("ev_connector_types", []) or []
-        for connector in connectors:
-            if connector:
-                connector_types[connector] = connector_types.get(connector, 0) + 1
-
-    # Calculate percentages
-    total_stations = len(stations)
-    for speed in speeds.values():
-        speed.percentage = (
-            round((speed.count / total_stations * 100), 2) if total_stations > 0 else 0
-        )
+    Stations are added a batch at a time (typically one NREL page) as they
+    arrive, so aggregation overlaps with downloading the remaining pages.
+    Each batch is turned into a StationTable and its counts are folded into
+    the running totals. `result()` produces the same StationAnalysis as
+    analysing the full list at once.
+    """
 
-    # Create connector distribution list
-    connector_distribution = [
-        ConnectorDistribution(
-            connector_type=c_type,
-            count=count,
-            percentage=(
-                round((count / total_stations * 100), 2) if total_stations > 0 else 0
-            ),
-            ports_per_station=(
-                round(count / total_stations, 2) if total_stations > 0 else 0
-            ),
-        )
-        for c_type, count in connector_types.items()
-    ]
+    def __init__(self, debug: bool = False):
+        self.debug = debug
+        self.now = datetime.now()
+        self.total_stations = 0
 
-    return ChargingCapabilities(
-        by_type=speeds,
-        connector_distribution=connector_distribution,
-        total_ports=total_ports,
-    )
+        self.facility_counts = FacilityTypeCount()
+        self.near_highway = 0
+        self.city_center = 0
 
+        self.speeds = {
+            "dc_fast": ChargingSpeed(),
+            "level2": ChargingSpeed(),
+            "level1": ChargingSpeed(),
+        }
+        self.connector_types: Dict[str, int] = {}
+        self.total_ports = 0
 
-def analyze_accessibility(stations: List[Dict]) -> AccessibilityMetrics:
-    """Analyze accessibility metrics from station data"""
-    metrics = AccessibilityMetrics()
-    total_stations = len(stations)
-
-    for station in stations:
-        # Access type analysis
-        access_time = (station.get("access_days_time") or "").lower()
-        access_code = (station.get("access_code") or "").lower()
-
-        if "24 hours" in access_time:
-            metrics.access_type["24_7_access"]["count"] += 1
-        if "restricted" in access_time:
-            metrics.access_type["restricted"]["count"] += 1
-        if access_code == "public":
-            metrics.access_type["public"]["count"] += 1
-
-        # print(station)
-
-        # Payment methods analysis based on network and other indicators
-        network = station.get("ev_network", "").lower()
-        # If it's a networked station (not Tesla and not Non-Networked)
-        if network and network not in ["tesla", "non-networked"]:
-            # Most charging networks support multiple payment methods
-            metrics.payment_methods["credit_card"]["count"] += 1
-            metrics.payment_methods["mobile_pay"]["count"] += 1
-            metrics.payment_methods["network_card"]["count"] += 1
-        elif "tesla" in network.lower():
-            # Tesla specific payment methods
-            metrics.payment_methods["mobile_pay"]["count"] += 1
-        elif any(keyword in access_time.lower() for keyword in ["pay", "fee", "paid"]):
-            # For non-networked stations that mention payment
-            metrics.payment_methods["credit_card"]["count"] += 1
-
-        # Operational status
-        if station.get("status_code") == "E":
-            metrics.operational_status["operational"]["count"] += 1
-        else:
-            metrics.operational_status["non_operational"]["count"] += 1
-
-    # Calculate percentages
-    if total_stations > 0:
-        for category in [
-            metrics.access_type,
-            metrics.payment_methods,
-            metrics.operational_status,
-        ]:
-            for metric in category.values():
-                metric["percentage"] = round(
-                    (metric["count"] / total_stations * 100), 2
-                )
+        self.accessibility = AccessibilityMetrics()
 
-    return metrics
+        self.networks: Dict[str, int] = {}
+        self.pricing_types = {"free": 0, "paid": 0, "variable": 0}
 
+        self.age_distribution = {
+            "less_than_1_year": 0,
+            "1_to_3_years": 0,
+            "more_than_3_years": 0,
+        }
+        self.last_verified = {"last_30_days": 0, "last_90_days": 0, "older": 0}
 
-def process_station_data(
-    data: Dict, city_area: float, debug: bool = False
-) -> StationAnalysis:
-    """Process station data with enhanced metrics"""
-    try:
-        stations = data["stations"]
+    def extend(self, stations: List[Dict]) -> "StationAccumulator":
+        """Fold a batch of stations into the running metrics"""
         if not stations:
-            if debug:
+            return self
+
+        table = StationTable(stations, self.now, self.debug)
+        self.total_stations += table.size
+        self._add_geography(table)
+        self._add_charging(table)
+        self._add_accessibility(table)
+        self._add_network(table)
+        self._add_age(table)
+        return self
+
+    def _add_geography(self, table: StationTable) -> None:
+        for name, count in table.facility_counts().items():
+            setattr(
+                self.facility_counts, name, getattr(self.facility_counts, name) + count
+            )
+
+        self.near_highway += int(np.count_nonzero(table.near_highway))
+        self.city_center += int(np.count_nonzero(table.city_center))
+
+    def _add_charging(self, table: StationTable) -> None:
+        for speed_name, ports in table.ports.items():
+            self.total_ports += int(ports.sum())
+            has_ports = ports != 0
+            if not has_ports.any():
+                continue
+
+            speed = self.speeds[speed_name]
+            speed.count += int(np.count_nonzero(has_ports))
+            speed.total_ports += int(ports[has_ports].sum())
+            speed.max_power = max(
+                speed.max_power, float(table.max_power[speed_name][has_ports].max())
+            )
+
+        for connector, count in _ordered_counts(table.connectors).items():
+            self.connector_types[connector] = (
+                self.connector_types.get(connector, 0) + count
+            )
+
+    def _add_accessibility(self, table: StationTable) -> None:
+        metrics = self.accessibility
+
+        for bucket, key, mask in [
+            (metrics.access_type, "24_7_access", table.access_24_7),
+            (metrics.access_type, "restricted", table.access_restricted),
+            (metrics.access_type, "public", table.access_public),
+            # Most charging networks support multiple payment methods, Tesla
+            # is app-only, and non-networked stations that mention payment
+            # are assumed to take cards
+            (metrics.payment_methods, "credit_card", table.networked | table.pay_mentioned),
+            (metrics.payment_methods, "mobile_pay", table.networked | table.tesla),
+            (metrics.payment_methods, "network_card", table.networked),
+            (metrics.operational_status, "operational", table.operational),
+            (metrics.operational_status, "non_operational", ~table.operational),
+        ]:
+            bucket[key]["count"] += int(np.count_nonzero(mask))
+
+    def _add_network(self, table: StationTable) -> None:
+        for network, count in _ordered_counts(table.networks).items():
+            self.networks[network] = self.networks.get(network, 0) + count
+
+        free = int(np.count_nonzero(table.free))
+        variable = int(np.count_nonzero(table.variable))
+        self.pricing_types["free"] += free
+        self.pricing_types["variable"] += variable
+        self.pricing_types["paid"] += table.size - free - variable
+
+    def _add_age(self, table: StationTable) -> None:
+        for key, count in table.age_distribution().items():
+            self.age_distribution[key] += count
+        for key, count in table.last_verified().items():
+            self.last_verified[key] += count
+
+    def charging_capabilities(self) -> ChargingCapabilities:
+        total_stations = self.total_stations
+        speeds = {name: speed.model_copy() for name, speed in self.speeds.items()}
+        for speed in speeds.values():
+            speed.percentage = _percentage(speed.count, total_stations)
+
+        # Create connector distribution list
+        connector_distribution = [
+            ConnectorDistribution(
+                connector_type=c_type,
+                count=count,
+                percentage=_percentage(count, total_stations),
+                ports_per_station=(
+                    round(count / total_stations, 2) if total_stations > 0 else 0
+                ),
+            )
+            for c_type, count in self.connector_types.items()
+        ]
+
+        return ChargingCapabilities(
+            by_type=speeds,
+            connector_distribution=connector_distribution,
+            total_ports=self.total_ports,
+        )
+
+    def accessibility_metrics(self) -> AccessibilityMetrics:
+        metrics = self.accessibility.model_copy(deep=True)
+
+        # Calculate percentages
+        if self.total_stations > 0:
+            for category in [
+                metrics.access_type,
+                metrics.payment_methods,
+                metrics.operational_status,
+            ]:
+                for metric in category.values():
+                    metric["percentage"] = _percentage(
+                        metric["count"], self.total_stations
+                    )
+
+        return metrics
+
+    def result(self, city_area: float) -> StationAnalysis:
+        """Build the final StationAnalysis from everything added so far"""
+        total_stations = self.total_stations
+        if not total_stations:
+            if self.debug:
                 print("Debug: No stations found in data")
             return StationAnalysis()
 
-        total_stations = len(stations)
-
-        # Geographic Analysis
-        facility_counts = analyze_facility_types(stations)
         geographic = GeographicAnalysis(
             total_stations_per_square_mile=(
                 round(total_stations / city_area, 2) if city_area > 0 else 0
             ),
-            stations_by_facility_type=facility_counts,
+            stations_by_facility_type=self.facility_counts.model_copy(),
             highway_proximity={
-                "near_highway": sum(
-                    1 for s in stations if s.get("intersection_directions")
-                ),
-                "city_center": sum(
-                    1
-                    for s in stations
-                    if "downtown" in (s.get("city_center", "") or "").lower()
-                ),
+                "near_highway": self.near_highway,
+                "city_center": self.city_center,
             },
         )
 
-        # Charging Capabilities
-        charging = analyze_charging_capabilities(stations)
-
-        # Accessibility Metrics
-        accessibility = analyze_accessibility(stations)
-
-        # Network Analysis
-        networks = {}
-        pricing_types = {"free": 0, "paid": 0, "variable": 0}
-
-        for station in stations:
-            # Network analysis
-            network = station.get("ev_network") or "Unknown"
-            networks[network] = networks.get(network, 0) + 1
-
-            # Pricing analysis
-            pricing = station.get("ev_pricing", "") or ""
-            if not pricing or pricing.lower() in ["free", "no fee", "no charge"]:
-                pricing_types["free"] += 1
-            elif "variable" in pricing.lower():
-                pricing_types["variable"] += 1
-            else:
-                pricing_types["paid"] += 1
-
         network_info = [
             NetworkInfo(
                 name=name,
@@ -318,7 +520,7 @@ def process_station_data(
                 percentage=round((count / total_stations * 100), 2),
             )
             for name, count in sorted(
-                networks.items(), key=lambda x: x[1], reverse=True
+                self.networks.items(), key=lambda x: x[1], reverse=True
             )
         ]
 
@@ -326,67 +528,18 @@ def process_station_data(
             networks=network_info,
             pricing_types={
                 k: {"count": v, "percentage": round((v / total_stations * 100), 2)}
-                for k, v in pricing_types.items()
+                for k, v in self.pricing_types.items()
             },
         )
 
-        now = datetime.now()
-        age_distribution = {
-            "less_than_1_year": 0,
-            "1_to_3_years": 0,
-            "more_than_3_years": 0,
-        }
-        last_verified = {"last_30_days": 0, "last_90_days": 0, "older": 0}
-
-        for station in stations:
-            # Age distribution
-            open_date = station.get("open_date")
-            if open_date:
-                try:
-                    date_opened = datetime.strptime(open_date, "%Y-%m-%d")
-                    age_days = (now - date_opened).days
-                    if age_days <= 365:
-                        age_distribution["less_than_1_year"] += 1
-                    elif age_days <= 1095:
-                        age_distribution["1_to_3_years"] += 1
-                    else:
-                        age_distribution["more_than_3_years"] += 1
-                except:
-                    if debug:
-                        print(f"Debug: Could not parse open date: {open_date}")
-                    age_distribution["more_than_3_years"] += 1
-
-            # Last verified - Fixed to handle date_last_confirmed field
-            date_last_verified = station.get(
-                "date_last_confirmed"
-            )  # Changed from date_last_verified
-            if date_last_verified:
-                try:
-                    verified_date = datetime.strptime(date_last_verified, "%Y-%m-%d")
-                    days_since_verified = (now - verified_date).days
-                    if days_since_verified <= 30:
-                        last_verified["last_30_days"] += 1
-                    elif days_since_verified <= 90:
-                        last_verified["last_90_days"] += 1
-                    else:
-                        last_verified["older"] += 1
-                except:
-                    if debug:
-                        print(
-                            f"Debug: Could not parse verification date: {date_last_verified}"
-                        )
-                    last_verified["older"] += 1
-            else:
-                last_verified["older"] += 1
-
         station_age = StationAge(
             age_distribution={
                 k: {"count": v, "percentage": round((v / total_stations * 100), 2)}
-                for k, v in age_distribution.items()
+                for k, v in self.age_distribution.items()
             },
             last_verified={
                 k: {"count": v, "percentage": round((v / total_stations * 100), 2)}
-                for k, v in last_verified.items()
+                for k, v in self.last_verified.items()
             },
         )
 
@@ -397,63 +550,121 @@ def process_station_data(
                 "analysis_timestamp": datetime.now().isoformat(),
             },
             geographic_analysis=geographic,
-            charging_capabilities=charging,
-            accessibility=accessibility,
+            charging_capabilities=self.charging_capabilities(),
+            accessibility=self.accessibility_metrics(),
             network_analysis=network_analysis,
             station_age=station_age,
         )
 
+
+def analyze_facility_types(stations: List[Dict]) -> FacilityTypeCount:
+    """Analyze facility types from station data"""
+    return StationAccumulator().extend(stations).facility_counts
+
+
+def analyze_charging_capabilities(stations: List[Dict]) -> ChargingCapabilities:
+    """Analyze charging capabilities from station data"""
+    return StationAccumulator().extend(stations).charging_capabilities()
+
+
+def analyze_accessibility(stations: List[Dict]) -> AccessibilityMetrics:
+    """Analyze accessibility metrics from station data"""
+    return StationAccumulator().extend(stations).accessibility_metrics()
+
+
+def process_station_data(
+    data: Dict, city_area: float, debug: bool = False
+) -> StationAnalysis:
+    """Process station data with enhanced metrics"""
+    try:
+        return StationAccumulator(debug).extend(data["stations"]).result(city_area)
+
+    except Exception as e:
+        if debug:
+            print(f"Debug: Error processing station data: {str(e)}")
+        raise
+
+
+async def process_station_stream(
+    stations: AsyncIterator[Dict],
+    city_area: float,
+    debug: bool = False,
+    batch_size: int = DEFAULT_STATIONS_PER_PAGE,
+) -> StationAnalysis:
+    """Aggregate stations from an async iterator in batches as they arrive"""
+    try:
+        accumulator = StationAccumulator(debug)
+        batch = []
+        async for station in stations:
+            batch.append(station)
+            if len(batch) >= batch_size:
+                accumulator.extend(batch)
+                batch = []
+        return accumulator.extend(batch).result(city_area)
+
     except Exception as e:
         if debug:
             print(f"Debug: Error processing station data: {str(e)}")
         raise
 
 
+def _format_coordinates(location: Dict, city: str, state: str) -> Dict[str, float]:
+    """Convert a raw Nominatim record into coordinates and approximate area"""
+    bbox = location.get("boundingbox")
+    area = 0.0
+    if bbox:
+        lat_diff = abs(float(bbox[1]) - float(bbox[0]))
+        lon_diff = abs(float(bbox[3]) - float(bbox[2]))
+        area = lat_diff * lon_diff * 69 * 54  # Approximate square miles
+
+    return {
+        "lat": float(location["lat"]),
+        "lon": float(location["lon"]),
+        "city_area": area if area > 0 else 100.0,
+        "bbox": bbox,
+        "display_name": location.get("display_name", f"{city}, {state}"),
+    }
+
+
 def get_city_coordinates(
     city: str, state: str, debug: bool = False
 ) -> Dict[str, float]:
     """Get city coordinates and metadata"""
     try:
-        url = "https://nominatim.openstreetmap.org/search"
-        params = {
-            "city": city,
-            "state": state,
-            "country": "USA",
-            "format": "json",
-            "limit": 1,
-        }
-        headers = {"User-Agent": "EVChargingStationFinder/1.0"}
-
         if debug:
             print(f"\nDebug: Getting coordinates for {city}, {state}")
 
-        response = requests.get(
-            url, params=params, headers=headers, timeout=DEFAULT_TIMEOUT
-        )
-        response.raise_for_status()
-
-        data = response.json()
-        if not data:
+        location = get_geocoder().lookup(city, state, debug)
+        if not location:
             raise LocationError(f"Location not found: {city}, {state}")
 
-        location = data[0]
         if debug:
             print(f"Debug: Found location data: {location}")
 
-        bbox = location.get("boundingbox")
-        area = 0.0
-        if bbox:
-            lat_diff = abs(float(bbox[1]) - float(bbox[0]))
-            lon_diff = abs(float(bbox[3]) - float(bbox[2]))
-            area = lat_diff * lon_diff * 69 * 54  # Approximate square miles
+        return _format_coordinates(location, city, state)
 
-        return {
-            "lat": float(location["lat"]),
-            "lon": float(location["lon"]),
-            "city_area": area if area > 0 else 100.0,
-            "bbox": bbox,
-            "display_name": location.get("display_name", f"{city}, {state}"),
-        }
+    except Exception as e:
+        if debug:
+            print(f"Debug: Error getting coordinates: {str(e)}")
+        raise
+
+
+async def get_city_coordinates_async(
+    city: str, state: str, debug: bool = False
+) -> Dict[str, float]:
+    """Async variant of get_city_coordinates"""
+    try:
+        if debug:
+            print(f"\nDebug: Getting coordinates for {city}, {state}")
+
+        location = await get_geocoder().lookup_async(city, state, debug)
+        if not location:
+            raise LocationError(f"Location not found: {city}, {state}")
+
+        if debug:
+            print(f"Debug: Found location data: {location}")
+
+        return _format_coordinates(location, city, state)
 
     except Exception as e:
         if debug:
@@ -461,20 +672,15 @@ def get_city_coordinates(
         raise
 
 
-def get_station_data_filtered(
+def _station_params(
     lat: float,
     lon: float,
     radius: float,
     state: str,
     api_key: str,
-    max_stations: Optional[int] = None,
-    stations_per_page: int = DEFAULT_STATIONS_PER_PAGE,
-    debug: bool = False,
-) -> Dict:
-    """Get charging station data with proper location filtering"""
-    url = "https://developer.nrel.gov/api/alt-fuel-stations/v1.json"
-
-    base_params = {
+    stations_per_page: int,
+) -> Dict[str, Any]:
+    return {
         "api_key": api_key,
         "fuel_type": "ELEC",
         "latitude": lat,
@@ -487,8 +693,51 @@ def get_station_data_filtered(
         "limit": stations_per_page,
     }
 
+
+def _validate_stations(
+    stations: Iterable[Dict], lat: float, lon: float, radius: float
+) -> List[Dict]:
+    stations = list(stations)
+    station_lats, station_lons = station_coordinates(stations)
+    indices = np.flatnonzero(
+        within_radius_mask(lat, lon, station_lats, station_lons, radius)
+    )
+    return [stations[i] for i in indices]
+
+
+def _station_result(stations: List[Dict]) -> Dict:
+    return {
+        "stations": stations,
+        "total_available": len(stations),
+        "stations_processed": len(stations),
+    }
+
+
+def _page_offsets(total_results: int, stations_per_page: int) -> range:
+    """Offsets of every page after the first"""
+    return range(stations_per_page, total_results, stations_per_page)
+
+
+def get_station_data_filtered(
+    lat: float,
+    lon: float,
+    radius: float,
+    state: str,
+    api_key: str,
+    max_stations: Optional[int] = None,
+    stations_per_page: int = DEFAULT_STATIONS_PER_PAGE,
+    debug: bool = False,
+) -> Dict:
+    """
+    Get charging station data with proper location filtering.
+
+    Pages through the NREL results sequentially and stops as soon as
+    max_stations validated stations have been collected.
+    """
+    base_params = _station_params(lat, lon, radius, state, api_key, stations_per_page)
+
     try:
-        response = requests.get(url, params=base_params, timeout=DEFAULT_TIMEOUT)
+        response = requests.get(NREL_URL, params=base_params, timeout=DEFAULT_TIMEOUT)
         response.raise_for_status()
         data = response.json()
 
@@ -496,11 +745,24 @@ def get_station_data_filtered(
         if debug:
             print(f"Debug: Found {total_available} stations in {state}")
 
-        # Validate and collect stations
-        stations = []
-        for station in data.get("fuel_stations", []):
-            if validate_station_location(station, lat, lon, radius):
-                stations.append(station)
+        stations = _validate_stations(data.get("fuel_stations", []), lat, lon, radius)
+        for offset in _page_offsets(total_available, stations_per_page):
+            if max_stations and len(stations) >= max_stations:
+                break
+            if debug:
+                print(f"Debug: Fetching stations from offset {offset}")
+
+            response = requests.get(
+                NREL_URL,
+                params={**base_params, "offset": offset},
+                timeout=DEFAULT_TIMEOUT,
+            )
+            response.raise_for_status()
+            stations.extend(
+                _validate_stations(
+                    response.json().get("fuel_stations", []), lat, lon, radius
+                )
+            )
 
         if debug:
             print(f"Debug: Validated {len(stations)} stations within {radius} miles")
@@ -513,11 +775,7 @@ def get_station_data_filtered(
                     f"Debug: Limited to {len(stations)} stations due to max_stations setting"
                 )
 
-        return {
-            "stations": stations,
-            "total_available": len(stations),
-            "stations_processed": len(stations),
-        }
+        return _station_result(stations)
 
     except Exception as e:
         if debug:
@@ -525,6 +783,124 @@ def get_station_data_filtered(
         raise
 
 
+async def _fetch_station_page(params: Dict[str, Any]) -> Dict:
+    with span("nrel_page", "external", offset=params.get("offset", 0)):
+        response = await get_http_client().get(
+            NREL_URL, params=params, timeout=DEFAULT_TIMEOUT
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+async def iter_stations_async(
+    lat: float,
+    lon: float,
+    radius: float,
+    state: str,
+    api_key: str,
+    max_stations: Optional[int] = None,
+    stations_per_page: int = DEFAULT_STATIONS_PER_PAGE,
+    concurrency: int = DEFAULT_PAGE_CONCURRENCY,
+    debug: bool = False,
+) -> AsyncIterator[Dict]:
+    """
+    Stream validated stations from every page of the NREL results.
+
+    The first page reports total_results; the remaining pages are fetched
+    with up to `concurrency` requests in flight and yielded in page order as
+    soon as each one is ready. Iteration stops early once max_stations
+    stations have been yielded, and any outstanding page requests are
+    cancelled.
+    """
+    base_params = _station_params(lat, lon, radius, state, api_key, stations_per_page)
+    pending: "deque[asyncio.Task]" = deque()
+    yielded = 0
+
+    try:
+        first_page = await _fetch_station_page(base_params)
+        total_available = first_page.get("total_results", 0)
+        if debug:
+            print(f"Debug: Found {total_available} stations in {state}")
+
+        offsets = iter(_page_offsets(total_available, stations_per_page))
+
+        def schedule() -> None:
+            while len(pending) < max(concurrency, 1):
+                offset = next(offsets, None)
+                if offset is None:
+                    return
+                if debug:
+                    print(f"Debug: Fetching stations from offset {offset}")
+                pending.append(
+                    asyncio.create_task(
+                        _fetch_station_page({**base_params, "offset": offset})
+                    )
+                )
+
+        page = first_page
+        while True:
+            # Keep later pages downloading while this one is consumed
+            schedule()
+            for station in _validate_stations(
+                page.get("fuel_stations", []), lat, lon, radius
+            ):
+                yield station
+                yielded += 1
+                if max_stations and yielded >= max_stations:
+                    if debug:
+                        print(
+                            f"Debug: Limited to {yielded} stations due to max_stations setting"
+                        )
+                    return
+
+            if not pending:
+                break
+            page = await pending.popleft()
+
+        if debug:
+            print(f"Debug: Validated {yielded} stations within {radius} miles")
+
+    except Exception as e:
+        if debug:
+            print(f"Debug: Error fetching station data: {str(e)}")
+        raise
+
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def get_station_data_filtered_async(
+    lat: float,
+    lon: float,
+    radius: float,
+    state: str,
+    api_key: str,
+    max_stations: Optional[int] = None,
+    stations_per_page: int = DEFAULT_STATIONS_PER_PAGE,
+    debug: bool = False,
+    concurrency: int = DEFAULT_PAGE_CONCURRENCY,
+) -> Dict:
+    """Async variant of get_station_data_filtered fetching pages concurrently"""
+    stations = [
+        station
+        async for station in iter_stations_async(
+            lat,
+            lon,
+            radius,
+            state,
+            api_key,
+            max_stations,
+            stations_per_page,
+            concurrency,
+            debug,
+        )
+    ]
+    return _station_result(stations)
+
+
 def validate_station_location(
     station: Dict, center_lat: float, center_lon: float, radius_miles: float
 ) -> bool:
@@ -553,16 +929,78 @@ def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return EARTH_RADIUS_MILES * c
 
 
-def get_charging_stations(config: Dict) -> Dict:
-    """Main function to get and analyze charging station data"""
-    debug = config.get("debug", False)
-    radius_miles = config.get("radius_miles", DEFAULT_RADIUS)
-    api_key = config.get("api_key", "DEMO_KEY")
+def station_coordinates(stations: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Extract station coordinates as float arrays.
 
+    Missing or zero coordinates become NaN so they never pass a radius check,
+    matching validate_station_location.
+    """
+    lats = np.array(
+        [float(s.get("latitude") or np.nan) for s in stations], dtype=np.float64
+    )
+    lons = np.array(
+        [float(s.get("longitude") or np.nan) for s in stations], dtype=np.float64
+    )
+    return lats, lons
+
+
+def haversine_distances(
+    center_lat: float, center_lon: float, lats: np.ndarray, lons: np.ndarray
+) -> np.ndarray:
+    """Vectorized calculate_distance from one center to many points, in miles"""
+    lat1, lon1 = np.radians(float(center_lat)), np.radians(float(center_lon))
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    return EARTH_RADIUS_MILES * c
+
+
+def within_radius_mask(
+    center_lat: float,
+    center_lon: float,
+    lats: np.ndarray,
+    lons: np.ndarray,
+    radius_miles: float,
+) -> np.ndarray:
+    """Boolean mask of the points lying within radius_miles of the center"""
+    return haversine_distances(center_lat, center_lon, lats, lons) <= radius_miles
+
+
+def _resolve_api_key(config: Dict) -> str:
+    api_key = config.get("api_key", "DEMO_KEY")
     if api_key == "YOUR_API_KEY":
         api_key = "DEMO_KEY"
-        if debug:
+        if config.get("debug", False):
             print("Debug: Using DEMO_KEY for API access")
+    return api_key
+
+
+def _add_location_metadata(
+    result: StationAnalysis, config: Dict, coords: Dict, radius_miles: float
+) -> StationAnalysis:
+    result.metadata.update(
+        {
+            "city": config["city"],
+            "state": config["state"],
+            "radius_miles": radius_miles,
+            "coordinates": {"latitude": coords["lat"], "longitude": coords["lon"]},
+            "display_name": coords.get("display_name"),
+        }
+    )
+    return result
+
+
+def get_charging_stations(config: Dict) -> Dict:
+    """Main function to get and analyze charging station data"""
+    debug = config.get("debug", False)
+    radius_miles = config.get("radius_miles", DEFAULT_RADIUS)
+    api_key = _resolve_api_key(config)
 
     try:
         if not config.get("city") or not config.get("state"):
@@ -587,17 +1025,43 @@ def get_charging_stations(config: Dict) -> Dict:
         result = process_station_data(station_data, coords["city_area"], debug)
 
         # Add location metadata
-        result.metadata.update(
-            {
-                "city": config["city"],
-                "state": config["state"],
-                "radius_miles": radius_miles,
-                "coordinates": {"latitude": coords["lat"], "longitude": coords["lon"]},
-                "display_name": coords.get("display_name"),
-            }
+        return _add_location_metadata(result, config, coords, radius_miles)
+
+    except Exception as e:
+        if debug:
+            print(f"Error: {str(e)}")
+        raise
+
+
+async def get_charging_stations_async(config: Dict) -> Dict:
+    """Async variant of get_charging_stations for use on a shared event loop"""
+    debug = config.get("debug", False)
+    radius_miles = config.get("radius_miles", DEFAULT_RADIUS)
+    api_key = _resolve_api_key(config)
+
+    try:
+        if not config.get("city") or not config.get("state"):
+            raise ValueError("City and state are required")
+
+        coords = await get_city_coordinates_async(
+            config["city"], config["state"], debug
+        )
+
+        # Aggregate each page while the next ones are still downloading
+        stations = iter_stations_async(
+            coords["lat"],
+            coords["lon"],
+            radius_miles,
+            config["state"],
+            api_key,
+            config.get("max_total_stations"),
+            config.get("stations_per_page", DEFAULT_STATIONS_PER_PAGE),
+            config.get("max_concurrent_pages", DEFAULT_PAGE_CONCURRENCY),
+            debug,
         )
+        result = await process_station_stream(stations, coords["city_area"], debug)
 
-        return result
+        return _add_location_metadata(result, config, coords, radius_miles)
 
     except Exception as e:
         if debug:
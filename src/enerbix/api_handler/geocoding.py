@@ -0,0 +1,352 @@
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import Future
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from enerbix.api_handler.cache import DEFAULT_CACHE_DIR
+from enerbix.api_handler.http_client import get_http_client
+from enerbix.utils.tracing import record, span
+import httpx
+import requests
+
+
+class GeocodingConfig:
+    """Nominatim configuration and constants"""
+
+    NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+    USER_AGENT = "EV-Planning-Tool/1.0"
+    MAX_RETRIES = 3
+    TIMEOUT = 30  # seconds
+    RATE_PER_SECOND = 1.0  # Nominatim usage policy: max 1 request/second
+    LRU_SIZE = 256
+    DB_PATH = os.path.join(DEFAULT_CACHE_DIR, "geocoding.sqlite3")
+    TTL = 90 * 24 * 3600  # seconds, None to never expire
+
+
+class TokenBucket:
+    """Thread-safe token bucket used to pace requests to a rate-limited API"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take a token and return how long the caller must wait before using it"""
+        with self.lock:
+            self._refill()
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self) -> None:
+        """Block until a token is available"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+
+class GeocodeCache:
+    """In-process LRU in front of a persistent SQLite store of Nominatim results"""
+
+    def __init__(
+        self,
+        db_path: str = GeocodingConfig.DB_PATH,
+        lru_size: int = GeocodingConfig.LRU_SIZE,
+        ttl_seconds: Optional[float] = GeocodingConfig.TTL,
+    ):
+        self.db_path = db_path
+        self.lru_size = lru_size
+        self.ttl_seconds = ttl_seconds
+        self.lru: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS geocode (
+                    city TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    PRIMARY KEY (city, state)
+                )"""
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _remember(self, key: Tuple[str, str], location: Dict[str, Any]) -> None:
+        with self.lock:
+            self.lru[key] = location
+            self.lru.move_to_end(key)
+            while len(self.lru) > self.lru_size:
+                self.lru.popitem(last=False)
+
+    def get(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            if key in self.lru:
+                self.lru.move_to_end(key)
+                return self.lru[key]
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload, stored_at FROM geocode WHERE city = ? AND state = ?",
+                key,
+            ).fetchone()
+        if row is None:
+            return None
+
+        payload, stored_at = row
+        if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+            return None
+
+        location = json.loads(payload)
+        self._remember(key, location)
+        return location
+
+    def set(self, key: Tuple[str, str], location: Dict[str, Any]) -> None:
+        self._remember(key, location)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO geocode (city, state, payload, stored_at) "
+                "VALUES (?, ?, ?, ?)",
+                (*key, json.dumps(location, separators=(",", ":")), time.time()),
+            )
+
+
+class Geocoder:
+    """
+    Shared Nominatim client.
+
+    Lookups go through the GeocodeCache first. Concurrent lookups for the same
+    (city, state) share one in-flight request, and all requests are paced by a
+    token bucket to respect Nominatim's 1 request/second policy.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[GeocodeCache] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+    ):
+        self.cache = cache or GeocodeCache()
+        self.rate_limiter = rate_limiter or TokenBucket(GeocodingConfig.RATE_PER_SECOND)
+        self.in_flight: Dict[Tuple[str, str], Future] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def make_key(city: str, state: str) -> Tuple[str, str]:
+        return city.strip().lower(), state.strip().lower()
+
+    def _cached(self, key: Tuple[str, str], debug: bool) -> Optional[Dict[str, Any]]:
+        cached = self.cache.get(key)
+        if cached is not None and debug:
+            print(f"Debug: Geocoding cache hit for {key[0]}, {key[1]}")
+        return cached
+
+    def _claim(self, key: Tuple[str, str]) -> Tuple[Future, bool]:
+        """Return the in-flight future for key and whether the caller owns it"""
+        with self.lock:
+            future = self.in_flight.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self.in_flight[key] = future
+            return future, True
+
+    def _settle(
+        self,
+        key: Tuple[str, str],
+        future: Future,
+        location: Optional[Dict[str, Any]] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        try:
+            if error is None and location is not None:
+                # Best effort: a failed write must not strand the waiters
+                try:
+                    self.cache.set(key, location)
+                except Exception as e:
+                    print(f"Warning: Could not cache geocode for {key[0]}, {key[1]}: {str(e)}")
+        finally:
+            with self.lock:
+                self.in_flight.pop(key, None)
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(location)
+
+    def lookup(
+        self, city: str, state: str, debug: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the raw Nominatim record for a city, or None if not found.
+
+        Raises the last request error if every attempt fails.
+        """
+        key = self.make_key(city, state)
+        cached = self._cached(key, debug)
+        if cached is not None:
+            return cached
+
+        future, owner = self._claim(key)
+        if not owner:
+            if debug:
+                print(f"Debug: Waiting on in-flight geocode for {city}, {state}")
+            return future.result()
+
+        try:
+            location = self._fetch(city, state, debug)
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, location)
+        return location
+
+    async def lookup_async(
+        self, city: str, state: str, debug: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Async variant of lookup sharing the same cache and in-flight requests.
+        The SQLite cache is read and written in a worker thread"""
+        key = self.make_key(city, state)
+        cached = await asyncio.to_thread(self._cached, key, debug)
+        if cached is not None:
+            return cached
+
+        future, owner = self._claim(key)
+        if not owner:
+            if debug:
+                print(f"Debug: Waiting on in-flight geocode for {city}, {state}")
+            return await asyncio.wrap_future(future)
+
+        try:
+            with span("geocode", "external", city=city, state=state):
+                location = await self._fetch_async(city, state, debug)
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        await asyncio.to_thread(self._settle, key, future, location)
+        return location
+
+    @staticmethod
+    def _params(city: str, state: str) -> Dict[str, Any]:
+        return {
+            "city": city,
+            "state": state,
+            "country": "USA",
+            "format": "json",
+            "limit": 1,
+        }
+
+    def _fetch(self, city: str, state: str, debug: bool) -> Optional[Dict[str, Any]]:
+        headers = {"User-Agent": GeocodingConfig.USER_AGENT}
+        params = self._params(city, state)
+
+        if debug:
+            print(f"\nDebug: Querying Nominatim API for {city}, {state}")
+            print(f"Debug: Parameters: {params}")
+
+        last_error: Optional[Exception] = None
+        for attempt in range(GeocodingConfig.MAX_RETRIES):
+            self.rate_limiter.acquire()
+            try:
+                response = requests.get(
+                    GeocodingConfig.NOMINATIM_URL,
+                    params=params,
+                    headers=headers,
+                    timeout=GeocodingConfig.TIMEOUT,
+                )
+
+                if debug:
+                    print(f"Debug: Attempt {attempt + 1} - Status: {response.status_code}")
+
+                if response.status_code == 429:
+                    last_error = requests.HTTPError(
+                        "Nominatim rate limit exceeded", response=response
+                    )
+                    continue
+
+                response.raise_for_status()
+                data = response.json()
+                return data[0] if data else None
+
+            except (requests.Timeout, requests.ConnectionError) as e:
+                if debug:
+                    print(f"Debug: {type(e).__name__} on attempt {attempt + 1}")
+                last_error = e
+
+        raise last_error
+
+    async def _fetch_async(
+        self, city: str, state: str, debug: bool
+    ) -> Optional[Dict[str, Any]]:
+        headers = {"User-Agent": GeocodingConfig.USER_AGENT}
+        params = self._params(city, state)
+
+        if debug:
+            print(f"\nDebug: Querying Nominatim API for {city}, {state}")
+            print(f"Debug: Parameters: {params}")
+
+        client = get_http_client()
+        last_error: Optional[Exception] = None
+        for attempt in range(GeocodingConfig.MAX_RETRIES):
+            if attempt:
+                record(retries=1)
+            wait = self.rate_limiter.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                response = await client.get(
+                    GeocodingConfig.NOMINATIM_URL,
+                    params=params,
+                    headers=headers,
+                    timeout=GeocodingConfig.TIMEOUT,
+                )
+
+                if debug:
+                    print(f"Debug: Attempt {attempt + 1} - Status: {response.status_code}")
+
+                if response.status_code == 429:
+                    last_error = httpx.HTTPStatusError(
+                        "Nominatim rate limit exceeded",
+                        request=response.request,
+                        response=response,
+                    )
+                    continue
+
+                response.raise_for_status()
+                data = response.json()
+                return data[0] if data else None
+
+            except httpx.TransportError as e:
+                if debug:
+                    print(f"Debug: {type(e).__name__} on attempt {attempt + 1}")
+                last_error = e
+
+        raise last_error
+
+
+_default_geocoder: Optional[Geocoder] = None
+_default_lock = threading.Lock()
+
+
+def get_geocoder() -> Geocoder:
+    """Return the process-wide Geocoder shared by all API handlers"""
+    global _default_geocoder
+    with _default_lock:
+        if _default_geocoder is None:
+            _default_geocoder = Geocoder()
+        return _default_geocoder
@@ -0,0 +1,120 @@
+import asyncio
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+import weakref
+
+import httpx
+
+from enerbix.utils.tracing import record, span
+
+
+class HTTPConfig:
+    """Connection pool and concurrency settings for the async HTTP layer"""
+
+    # Max in-flight requests (and pooled connections) per host
+    HOST_CONCURRENCY = {
+        "nominatim.openstreetmap.org": 1,
+        "overpass-api.de": 2,
+        "developer.nrel.gov": 8,
+    }
+    DEFAULT_CONCURRENCY = 4
+    KEEPALIVE_EXPIRY = 30  # seconds
+    TIMEOUT = 180  # seconds
+
+
+class AsyncHTTPClient:
+    """
+    Async HTTP client with one pooled, keep-alive connection pool per host.
+
+    Each host also gets a semaphore so a slow or rate-limited API cannot be
+    flooded when many cities are processed on the same event loop.
+    """
+
+    def __init__(
+        self,
+        host_concurrency: Optional[Dict[str, int]] = None,
+        default_concurrency: int = HTTPConfig.DEFAULT_CONCURRENCY,
+        timeout: float = HTTPConfig.TIMEOUT,
+    ):
+        self.host_concurrency = {**HTTPConfig.HOST_CONCURRENCY, **(host_concurrency or {})}
+        self.default_concurrency = default_concurrency
+        self.timeout = timeout
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _limit_for(self, host: str) -> int:
+        return self.host_concurrency.get(host, self.default_concurrency)
+
+    def _client_for(self, host: str) -> httpx.AsyncClient:
+        client = self._clients.get(host)
+        if client is None:
+            limit = self._limit_for(host)
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=limit,
+                    max_keepalive_connections=limit,
+                    keepalive_expiry=HTTPConfig.KEEPALIVE_EXPIRY,
+                ),
+                timeout=self.timeout,
+            )
+            self._clients[host] = client
+        return client
+
+    def _semaphore_for(self, host: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._limit_for(host))
+            self._semaphores[host] = semaphore
+        return semaphore
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request through the host's pool, honouring its concurrency limit"""
+        host = urlsplit(url).hostname or ""
+        # The span includes any wait for the host's concurrency slot
+        with span(f"{method} {host}", "http", url=url):
+            async with self._semaphore_for(host):
+                response = await self._client_for(host).request(method, url, **kwargs)
+            record(
+                bytes_sent=len(response.request.content),
+                bytes_received=len(response.content),
+            )
+            return response
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        await asyncio.gather(*(client.aclose() for client in clients.values()))
+
+    async def __aenter__(self) -> "AsyncHTTPClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+_clients_by_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncHTTPClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_http_client() -> AsyncHTTPClient:
+    """Return the shared AsyncHTTPClient for the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _clients_by_loop.get(loop)
+    if client is None:
+        client = AsyncHTTPClient()
+        _clients_by_loop[loop] = client
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the running event loop's shared AsyncHTTPClient, if any. The next
+    get_http_client() call on the loop opens a fresh one"""
+    client = _clients_by_loop.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
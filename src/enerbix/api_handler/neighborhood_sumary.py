@@ -259,11 +259,18 @@ class NeighborhoodSummary:
         }
 
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import time
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
 from urllib.parse import quote
 
+from enerbix.api_handler.cache import OverpassCache
+from enerbix.api_handler.geocoding import get_geocoder
+from enerbix.api_handler.http_client import get_http_client
+from enerbix.utils.tracing import record, span
+import httpx
 import requests
 
 
@@ -276,247 +283,1038 @@ class APIConfig:
     MAX_RETRIES = 3
     RETRY_DELAY = 2  # seconds
     TIMEOUT = 180  # seconds
+    OVERPASS_CACHE_TTL = 7 * 24 * 3600  # seconds, None to never expire
+    OVERPASS_CACHE_MAX_BYTES = 1024**3  # 1 GB
+    OVERPASS_SHARD_CONCURRENCY = 2  # public Overpass allows ~2 slots per client
 
 
 class LocationAPI:
     """Handles Nominatim API interactions"""
 
+    @staticmethod
+    def _format_location(location: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "bbox": location["boundingbox"],
+            "osm_id": location.get("osm_id"),
+            "lat": location["lat"],
+            "lon": location["lon"],
+            "display_name": location["display_name"],
+            "timestamp": datetime.now().isoformat(),
+        }
+
     @staticmethod
     def get_city_coordinates(
         city: str, state: str, debug: bool = False
     ) -> Optional[Dict[str, Any]]:
         """Get city coordinates and boundary information"""
         try:
-            headers = {"User-Agent": APIConfig.USER_AGENT}
-            params = {
-                "city": city,
-                "state": state,
-                "country": "USA",
-                "format": "json",
-                "limit": 1,
-            }
+            location = get_geocoder().lookup(city, state, debug)
+            if not location:
+                return None
 
-            if debug:
-                print(f"\nDebug: Querying Nominatim API for {city}, {state}")
-                print(f"Debug: Parameters: {params}")
-
-            for attempt in range(APIConfig.MAX_RETRIES):
-                try:
-                    response = requests.get(
-                        APIConfig.NOMINATIM_URL,
-                        params=params,
-                        headers=headers,
-                        timeout=APIConfig.TIMEOUT,
-                    )
+            return LocationAPI._format_location(location)
 
-                    if debug:
-                        print(
-                            f"Debug: Attempt {attempt + 1} - Status: {response.status_code}"
-                        )
+        except Exception as e:
+            if debug:
+                print(f"Debug: Error in get_city_coordinates: {str(e)}")
+            return None
 
-                    if response.status_code == 200:
-                        data = response.json()
-                        if data:
-                            return {
-                                "bbox": data[0]["boundingbox"],
-                                "osm_id": data[0].get("osm_id"),
-                                "lat": data[0]["lat"],
-                                "lon": data[0]["lon"],
-                                "display_name": data[0]["display_name"],
-                                "timestamp": datetime.now().isoformat(),
-                            }
-                    elif response.status_code == 429:
-                        if debug:
-                            print(
-                                f"Debug: Rate limited, waiting {APIConfig.RETRY_DELAY}s"
-                            )
-                        time.sleep(APIConfig.RETRY_DELAY)
-
-                except requests.Timeout:
-                    if debug:
-                        print(f"Debug: Timeout on attempt {attempt + 1}")
-                    time.sleep(APIConfig.RETRY_DELAY)
+    @staticmethod
+    async def get_city_coordinates_async(
+        city: str, state: str, debug: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Async variant of get_city_coordinates"""
+        try:
+            location = await get_geocoder().lookup_async(city, state, debug)
+            if not location:
+                return None
 
-            return None
+            return LocationAPI._format_location(location)
 
         except Exception as e:
             if debug:
-                print(f"Debug: Error in get_city_coordinates: {str(e)}")
+                print(f"Debug: Error in get_city_coordinates_async: {str(e)}")
             return None
 
 
+# Overpass selectors per summary category, in query order. Each selector is
+# (element type, tag key, operator, values); operator "~" is an unanchored
+# regex over the values and None matches any value of the key.
+QUERY_SELECTORS = {
+    "healthcare": [
+        (
+            "node",
+            "amenity",
+            "~",
+            (
+                "hospital",
+                "clinic",
+                "doctors",
+                "dentist",
+                "pharmacy",
+                "healthcare",
+                "veterinary",
+            ),
+        ),
+        (
+            "way",
+            "amenity",
+            "~",
+            (
+                "hospital",
+                "clinic",
+                "doctors",
+                "dentist",
+                "pharmacy",
+                "healthcare",
+                "veterinary",
+            ),
+        ),
+    ],
+    "education": [
+        (
+            "node",
+            "amenity",
+            "~",
+            (
+                "school",
+                "kindergarten",
+                "college",
+                "university",
+                "library",
+                "training",
+                "language_school",
+                "music_school",
+            ),
+        ),
+        (
+            "way",
+            "amenity",
+            "~",
+            (
+                "school",
+                "kindergarten",
+                "college",
+                "university",
+                "library",
+                "training",
+                "language_school",
+                "music_school",
+            ),
+        ),
+    ],
+    "transport": [
+        ("node", "public_transport", None, None),
+        ("node", "highway", "=", ("bus_stop",)),
+        ("node", "railway", "~", ("station", "subway_entrance", "tram_stop")),
+        ("node", "amenity", "=", ("taxi",)),
+        ("node", "amenity", "=", ("bicycle_rental",)),
+        ("node", "amenity", "=", ("ferry_terminal",)),
+    ],
+    "roads": [
+        (
+            "way",
+            "highway",
+            "~",
+            (
+                "motorway",
+                "trunk",
+                "primary",
+                "secondary",
+                "tertiary",
+                "residential",
+                "service",
+                "cycleway",
+                "footway",
+            ),
+        ),
+        ("way", "bridge", None, None),
+        ("way", "tunnel", None, None),
+    ],
+    "retail": [
+        (
+            "node",
+            "shop",
+            "~",
+            (
+                "mall",
+                "supermarket",
+                "department_store",
+                "convenience",
+                "grocery",
+                "market",
+            ),
+        ),
+        (
+            "way",
+            "shop",
+            "~",
+            (
+                "mall",
+                "supermarket",
+                "department_store",
+                "convenience",
+                "grocery",
+                "market",
+            ),
+        ),
+    ],
+    "food": [
+        (
+            "node",
+            "amenity",
+            "~",
+            (
+                "restaurant",
+                "cafe",
+                "fast_food",
+                "pub",
+                "bar",
+                "food_court",
+                "ice_cream",
+                "bistro",
+            ),
+        ),
+    ],
+    "leisure": [
+        (
+            "way",
+            "leisure",
+            "~",
+            (
+                "park",
+                "sports_centre",
+                "fitness_center",
+                "swimming_pool",
+                "stadium",
+                "playground",
+                "recreation_ground",
+                "golf_course",
+            ),
+        ),
+        (
+            "node",
+            "leisure",
+            "~",
+            (
+                "park",
+                "sports_centre",
+                "fitness_center",
+                "swimming_pool",
+                "stadium",
+                "playground",
+                "recreation_ground",
+                "golf_course",
+            ),
+        ),
+    ],
+    "buildings": [
+        (
+            "way",
+            "building",
+            "~",
+            (
+                "residential",
+                "apartments",
+                "commercial",
+                "retail",
+                "industrial",
+                "warehouse",
+                "office",
+                "government",
+                "hospital",
+                "school",
+                "university",
+                "hotel",
+                "parking",
+            ),
+        ),
+    ],
+    "parking": [
+        ("node", "amenity", "=", ("parking",)),
+        ("way", "amenity", "=", ("parking",)),
+        ("node", "amenity", "=", ("parking_space",)),
+        ("node", "amenity", "=", ("bicycle_parking",)),
+        ("node", "amenity", "=", ("charging_station",)),
+    ],
+    "emergency": [
+        (
+            "node",
+            "amenity",
+            "~",
+            ("police", "fire_station", "ambulance_station", "emergency_post", "rescue"),
+        ),
+        (
+            "way",
+            "amenity",
+            "~",
+            ("police", "fire_station", "ambulance_station", "emergency_post", "rescue"),
+        ),
+    ],
+    "entertainment": [
+        (
+            "node",
+            "amenity",
+            "~",
+            (
+                "cinema",
+                "theatre",
+                "arts_centre",
+                "nightclub",
+                "community_centre",
+                "events_venue",
+                "museum",
+                "gallery",
+            ),
+        ),
+        (
+            "way",
+            "amenity",
+            "~",
+            (
+                "cinema",
+                "theatre",
+                "arts_centre",
+                "nightclub",
+                "community_centre",
+                "events_venue",
+                "museum",
+                "gallery",
+            ),
+        ),
+    ],
+    "automotive": [
+        ("node", "shop", "~", ("car", "car_repair", "car_parts")),
+        ("node", "amenity", "~", ("car_wash", "car_rental", "car_sharing", "fuel")),
+    ],
+    "amenities": [
+        (
+            "node",
+            "amenity",
+            "~",
+            (
+                "post_office",
+                "bank",
+                "atm",
+                "toilets",
+                "recycling",
+                "waste_disposal",
+                "water_point",
+                "bench",
+            ),
+        ),
+    ],
+    "area_metrics": [
+        ("way", "natural", "=", ("water",)),
+        ("way", "landuse", "=", ("grass",)),
+        ("way", "landuse", "~", ("residential", "commercial", "industrial")),
+    ],
+}
+
+# Categories to fetch: a list of category names, or category -> fields
+CategorySelection = Union[Iterable[str], Dict[str, Iterable[str]]]
+
+# Output statements per output mode. "tags" skips the recursion into way
+# nodes, which carry no tags and are never classified; "count" returns one
+# count element per selector group instead of the elements themselves.
+OUTPUT_MODES = {
+    "body": """out body;
+        >;
+        out skel qt;""",
+    "tags": "out tags;",
+    "count": "out count;",
+}
+
+
+def _render_selector(selector: Tuple) -> str:
+    element_type, key, operator, values = selector
+    if operator is None:
+        return f'{element_type}(area.searchArea)["{key}"];'
+    return f'{element_type}(area.searchArea)["{key}"{operator}"{"|".join(values)}"];'
+
+
+def _requested_tags(selection: Dict[str, Set[str]]) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Tag values the classifier needs for the selected fields, per element type.
+
+    An empty field set selects every field of the category. Area metrics are
+    proportional, so any selected field needs all of its way counts.
+    """
+    wanted = {"node": {}, "way": {}}
+    for category, fields in selection.items():
+        element_types = ["way"] if category in WAY_ONLY_CATEGORIES else ["node", "way"]
+        for chain in CATEGORY_RULES.get(category, []):
+            for conditions, field_name in chain:
+                if fields and category != "area_metrics" and field_name not in fields:
+                    continue
+                key, value = conditions[0]
+                for element_type in element_types:
+                    values = wanted[element_type].setdefault(key, [])
+                    if value not in values:
+                        values.append(value)
+    return wanted
+
+
+def _prune_selector(
+    selector: Tuple, wanted: Dict[str, Dict[str, List[str]]]
+) -> Optional[Tuple]:
+    """Narrow a selector to the wanted values it can match, or drop it"""
+    element_type, key, operator, values = selector
+    wanted_values = wanted[element_type].get(key)
+    if not wanted_values:
+        return None
+
+    if operator is None:
+        operator = "=" if len(wanted_values) == 1 else "~"
+        return element_type, key, operator, tuple(wanted_values)
+    if operator == "=":
+        return selector if values[0] in wanted_values else None
+
+    # Regex alternatives are unanchored, so keep any alternative that is a
+    # substring of a wanted value (e.g. "market" still fetches "marketplace")
+    kept = tuple(v for v in values if any(v in w for w in wanted_values))
+    return (element_type, key, operator, kept) if kept else None
+
+
+def normalize_selection(
+    categories: Optional[CategorySelection],
+) -> Optional[Dict[str, Set[str]]]:
+    """
+    Normalise a category selection to a category -> fields mapping.
+
+    None selects everything, a list of categories selects all of their fields
+    and a mapping selects the listed fields (an empty list meaning all).
+    """
+    if categories is None:
+        return None
+    if isinstance(categories, dict):
+        return {category: set(fields or []) for category, fields in categories.items()}
+    return {category: set() for category in categories}
+
+
+def select_query_groups(
+    categories: Optional[CategorySelection] = None,
+) -> Dict[str, List[Tuple]]:
+    """
+    Selector groups needed for a category/field selection.
+
+    Every selector is narrowed to the tag values counted by the selected
+    fields, so groups of other categories are kept only where their elements
+    feed a selected field (e.g. building=school ways for education.schools).
+    Empty groups are dropped; QUERY_SELECTORS order is kept so queries are
+    stable cache keys.
+    """
+    selection = normalize_selection(categories)
+    if selection is None:
+        return {group: list(selectors) for group, selectors in QUERY_SELECTORS.items()}
+
+    wanted = _requested_tags(selection)
+    groups = {}
+    for group, selectors in QUERY_SELECTORS.items():
+        pruned = [
+            selector
+            for selector in (_prune_selector(s, wanted) for s in selectors)
+            if selector is not None
+        ]
+        if pruned:
+            groups[group] = pruned
+    return groups
+
+
 class OverpassAPI:
     """Handles Overpass API interactions"""
 
+    _cache: Optional[OverpassCache] = None
+
+    @classmethod
+    def get_cache(cls) -> OverpassCache:
+        """Return the shared on-disk cache, creating it on first use"""
+        if cls._cache is None:
+            cls._cache = OverpassCache(
+                ttl_seconds=APIConfig.OVERPASS_CACHE_TTL,
+                max_bytes=APIConfig.OVERPASS_CACHE_MAX_BYTES,
+            )
+        return cls._cache
+
     @staticmethod
-    def build_query(city: str, bbox: list) -> str:
-        """Build comprehensive Overpass query for all raw data"""
+    def _render_query(
+        city: str, bbox: list, groups: Dict[str, List[Tuple]], output: str = "body"
+    ) -> str:
         city_escaped = quote(city)
         south, north, west, east = map(str, bbox)
+        out = OUTPUT_MODES[output]
+
+        blocks = [
+            f"            // {group}\n"
+            + "\n".join(
+                f"            {_render_selector(selector)}" for selector in selectors
+            )
+            for group, selectors in groups.items()
+        ]
+        if output == "count":
+            # One count per group, in group order
+            statements = "\n".join(
+                f"        (\n{block}\n        );\n        {out}" for block in blocks
+            )
+        else:
+            selectors = "\n".join(blocks)
+            statements = f"        (\n{selectors}\n        );\n        {out}"
 
         return f"""[out:json][timeout:180][bbox:{south},{west},{north},{east}];
         area["admin_level"~"4|6|8"]["name"~"^{city_escaped}$|^{city_escaped} City$",i]->.searchArea;
-        (
-            // Healthcare
-            node(area.searchArea)["amenity"~"hospital|clinic|doctors|dentist|pharmacy|healthcare|veterinary"];
-            way(area.searchArea)["amenity"~"hospital|clinic|doctors|dentist|pharmacy|healthcare|veterinary"];
-
-            // Education
-            node(area.searchArea)["amenity"~"school|kindergarten|college|university|library|training|language_school|music_school"];
-            way(area.searchArea)["amenity"~"school|kindergarten|college|university|library|training|language_school|music_school"];
-
-            // Transportation
-            node(area.searchArea)["public_transport"];
-            node(area.searchArea)["highway"="bus_stop"];
-            node(area.searchArea)["railway"~"station|subway_entrance|tram_stop"];
-            node(area.searchArea)["amenity"="taxi"];
-            node(area.searchArea)["amenity"="bicycle_rental"];
-            node(area.searchArea)["amenity"="ferry_terminal"];
-
-            // Road Network
-            way(area.searchArea)["highway"~"motorway|trunk|primary|secondary|tertiary|residential|service|cycleway|footway"];
-            way(area.searchArea)["bridge"];
-            way(area.searchArea)["tunnel"];
-
-            // Retail
-            node(area.searchArea)["shop"~"mall|supermarket|department_store|convenience|grocery|market"];
-            way(area.searchArea)["shop"~"mall|supermarket|department_store|convenience|grocery|market"];
-
-            // Food and Drink
-            node(area.searchArea)["amenity"~"restaurant|cafe|fast_food|pub|bar|food_court|ice_cream|bistro"];
-
-            // Leisure
-            way(area.searchArea)["leisure"~"park|sports_centre|fitness_center|swimming_pool|stadium|playground|recreation_ground|golf_course"];
-            node(area.searchArea)["leisure"~"park|sports_centre|fitness_center|swimming_pool|stadium|playground|recreation_ground|golf_course"];
-
-            // Buildings
-            way(area.searchArea)["building"~"residential|apartments|commercial|retail|industrial|warehouse|office|government|hospital|school|university|hotel|parking"];
-
-            // Parking
-            node(area.searchArea)["amenity"="parking"];
-            way(area.searchArea)["amenity"="parking"];
-            node(area.searchArea)["amenity"="parking_space"];
-            node(area.searchArea)["amenity"="bicycle_parking"];
-            node(area.searchArea)["amenity"="charging_station"];
-
-            // Emergency Services
-            node(area.searchArea)["amenity"~"police|fire_station|ambulance_station|emergency_post|rescue"];
-            way(area.searchArea)["amenity"~"police|fire_station|ambulance_station|emergency_post|rescue"];
-
-            // Entertainment
-            node(area.searchArea)["amenity"~"cinema|theatre|arts_centre|nightclub|community_centre|events_venue|museum|gallery"];
-            way(area.searchArea)["amenity"~"cinema|theatre|arts_centre|nightclub|community_centre|events_venue|museum|gallery"];
-
-            // Automotive
-            node(area.searchArea)["shop"~"car|car_repair|car_parts"];
-            node(area.searchArea)["amenity"~"car_wash|car_rental|car_sharing|fuel"];
-
-            // Public Amenities
-            node(area.searchArea)["amenity"~"post_office|bank|atm|toilets|recycling|waste_disposal|water_point|bench"];
-
-            // Area Features
-            way(area.searchArea)["natural"="water"];
-            way(area.searchArea)["landuse"="grass"];
-            way(area.searchArea)["landuse"~"residential|commercial|industrial"];
-        );
-        out body;
-        >;
-        out skel qt;"""
+{statements}"""
+
+    @staticmethod
+    def build_query(
+        city: str,
+        bbox: list,
+        categories: Optional[CategorySelection] = None,
+        output: str = "body",
+    ) -> str:
+        """
+        Build Overpass query for the requested categories and fields.
+
+        Args:
+            city: City name matched against admin boundaries
+            bbox: Nominatim bounding box (south, north, west, east)
+            categories: None for all raw data, a list of categories, or a
+                category -> fields mapping (see select_query_groups)
+            output: "body" for full elements plus way nodes, "tags" for
+                tagged elements only, "count" for per-group counts
+        """
+        return OverpassAPI._render_query(
+            city, bbox, select_query_groups(categories), output
+        )
+
+    @staticmethod
+    def build_shard_queries(
+        city: str,
+        bbox: list,
+        categories: Optional[CategorySelection] = None,
+        output: str = "body",
+    ) -> Dict[str, str]:
+        """One query per selector group needed for the requested categories"""
+        return {
+            group: OverpassAPI._render_query(city, bbox, {group: selectors}, output)
+            for group, selectors in select_query_groups(categories).items()
+        }
+
+    @staticmethod
+    def _cache_lookup(
+        city: str, bbox: list, query: str, debug: bool, force_refresh: bool
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Return the cache key for a query and the cached result, if fresh"""
+        cache_key = OverpassCache.make_key(city, bbox, query)
+        if force_refresh:
+            return cache_key, None
+
+        cached = OverpassAPI.get_cache().get(cache_key)
+        if cached is not None and debug:
+            print(
+                f"Debug: Overpass cache hit for {city} "
+                f"({len(cached['elements'])} elements)"
+            )
+        return cache_key, cached
+
+    @staticmethod
+    def _build_result(
+        data: Dict, start_time: float, debug: bool, response_bytes: int = 0
+    ) -> Dict[str, Any]:
+        query_time = time.time() - start_time
+        elements = data.get("elements", [])
+
+        result = {
+            "elements": elements,
+            "timestamp": datetime.now().isoformat(),
+            "query_time_seconds": query_time,
+            "response_bytes": response_bytes,
+            "node_count": sum(1 for e in elements if e.get("type") == "node"),
+            "way_count": sum(1 for e in elements if e.get("type") == "way"),
+            "relation_count": sum(1 for e in elements if e.get("type") == "relation"),
+        }
+
+        if debug:
+            print(f"Debug: Retrieved {len(result['elements'])} elements")
+            print(f"Debug: {result['node_count']} nodes, {result['way_count']} ways")
+            print(f"Debug: Response size: {response_bytes:,} bytes")
+            print(f"Debug: Query time: {query_time:.2f} seconds")
+
+        return result
+
+    @staticmethod
+    def _merge_elements(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Merge shard results into one elements list.
+
+        Elements returned by several shards (shared skeleton nodes, features
+        matching more than one selector group) are kept once, preferring the
+        copy that carries tags.
+        """
+        merged: Dict[Tuple[str, Any], Dict] = {}
+        for result in results:
+            for element in result["elements"]:
+                key = (element.get("type"), element.get("id"))
+                existing = merged.get(key)
+                if existing is None or (
+                    element.get("tags") and not existing.get("tags")
+                ):
+                    merged[key] = element
+        return {"elements": list(merged.values())}
+
+    @staticmethod
+    def _post_query(query: str, debug: bool) -> Optional[requests.Response]:
+        """POST a query with retries, returning the successful response or None"""
+        for attempt in range(APIConfig.MAX_RETRIES):
+            try:
+                response = requests.post(
+                    APIConfig.OVERPASS_URL,
+                    data={"data": query},
+                    timeout=APIConfig.TIMEOUT,
+                )
+
+                if debug:
+                    print(
+                        f"Debug: Attempt {attempt + 1} - Status: {response.status_code}"
+                    )
+
+                if response.status_code == 200:
+                    return response
+
+                elif response.status_code == 429:
+                    if debug:
+                        print(f"Debug: Rate limited, waiting {APIConfig.RETRY_DELAY}s")
+                    time.sleep(APIConfig.RETRY_DELAY)
+
+                elif attempt < APIConfig.MAX_RETRIES - 1:
+                    time.sleep(APIConfig.RETRY_DELAY)
+
+            except requests.Timeout:
+                if debug:
+                    print(f"Debug: Timeout on attempt {attempt + 1}")
+                if attempt < APIConfig.MAX_RETRIES - 1:
+                    time.sleep(APIConfig.RETRY_DELAY)
+
+        return None
+
+    @staticmethod
+    async def _post_query_async(query: str, debug: bool) -> Optional[httpx.Response]:
+        """Async variant of _post_query using the pooled HTTP client"""
+        client = get_http_client()
+        for attempt in range(APIConfig.MAX_RETRIES):
+            if attempt:
+                record(retries=1)
+            try:
+                response = await client.post(
+                    APIConfig.OVERPASS_URL,
+                    data={"data": query},
+                    timeout=APIConfig.TIMEOUT,
+                )
+
+                if debug:
+                    print(
+                        f"Debug: Attempt {attempt + 1} - Status: {response.status_code}"
+                    )
+
+                if response.status_code == 200:
+                    return response
+
+                elif response.status_code == 429:
+                    if debug:
+                        print(f"Debug: Rate limited, waiting {APIConfig.RETRY_DELAY}s")
+                    await asyncio.sleep(APIConfig.RETRY_DELAY)
+
+                elif attempt < APIConfig.MAX_RETRIES - 1:
+                    await asyncio.sleep(APIConfig.RETRY_DELAY)
+
+            except httpx.TransportError as e:
+                # Timeouts, dropped connections and other network errors
+                if debug:
+                    print(f"Debug: {type(e).__name__} on attempt {attempt + 1}")
+                if attempt < APIConfig.MAX_RETRIES - 1:
+                    await asyncio.sleep(APIConfig.RETRY_DELAY)
+
+        return None
+
+    @staticmethod
+    def _run_query(
+        city: str,
+        bbox: list,
+        query: str,
+        debug: bool,
+        use_cache: bool,
+        force_refresh: bool,
+    ) -> Optional[Dict[str, Any]]:
+        """Run one query, served from the disk cache when fresh"""
+        start_time = time.time()
+
+        cache_key = None
+        if use_cache:
+            cache_key, cached = OverpassAPI._cache_lookup(
+                city, bbox, query, debug, force_refresh
+            )
+            if cached is not None:
+                return cached
+
+        if debug:
+            print("\nDebug: Sending Overpass API request")
+            print(f"Debug: Query length: {len(query)} characters")
+
+        response = OverpassAPI._post_query(query, debug)
+        if response is None:
+            return None
+
+        result = OverpassAPI._build_result(
+            response.json(), start_time, debug, len(response.content)
+        )
+        if cache_key:
+            OverpassAPI.get_cache().set(cache_key, result)
+        return result
+
+    @staticmethod
+    async def _run_query_async(
+        city: str,
+        bbox: list,
+        query: str,
+        debug: bool,
+        use_cache: bool,
+        force_refresh: bool,
+    ) -> Optional[Dict[str, Any]]:
+        """Async variant of _run_query. Cache reads and writes (gzip JSON) run
+        in a worker thread so they don't stall the other requests on the loop"""
+        start_time = time.time()
+
+        cache_key = None
+        if use_cache:
+            cache_key, cached = await asyncio.to_thread(
+                OverpassAPI._cache_lookup, city, bbox, query, debug, force_refresh
+            )
+            if cached is not None:
+                return cached
+
+        if debug:
+            print("\nDebug: Sending Overpass API request")
+            print(f"Debug: Query length: {len(query)} characters")
+
+        with span("overpass", "external", city=city, query_chars=len(query)):
+            response = await OverpassAPI._post_query_async(query, debug)
+        if response is None:
+            return None
+
+        result = OverpassAPI._build_result(
+            response.json(), start_time, debug, len(response.content)
+        )
+        if cache_key:
+            await asyncio.to_thread(OverpassAPI.get_cache().set, cache_key, result)
+        return result
+
+    @staticmethod
+    def _merge_shards(
+        city: str,
+        shard_results: Dict[str, Optional[Dict[str, Any]]],
+        start_time: float,
+        debug: bool,
+    ) -> Optional[Dict[str, Any]]:
+        failed = [shard for shard, result in shard_results.items() if result is None]
+        if failed:
+            if debug:
+                print(f"Debug: Overpass shards failed for {city}: {', '.join(failed)}")
+            return None
+
+        return OverpassAPI._build_result(
+            OverpassAPI._merge_elements(list(shard_results.values())),
+            start_time,
+            debug,
+            sum(result.get("response_bytes", 0) for result in shard_results.values()),
+        )
 
     @staticmethod
     def get_city_data(
-        city: str, bbox: list, debug: bool = False
+        city: str,
+        bbox: list,
+        debug: bool = False,
+        use_cache: bool = True,
+        force_refresh: bool = False,
+        categories: Optional[CategorySelection] = None,
+        output: str = "body",
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get raw city data from Overpass API, served from the disk cache when fresh.
+
+        Only selectors needed for `categories` are queried (see build_query).
+        """
+        try:
+            query = OverpassAPI.build_query(city, bbox, categories, output)
+            return OverpassAPI._run_query(
+                city, bbox, query, debug, use_cache, force_refresh
+            )
+
+        except Exception as e:
+            if debug:
+                print(f"Debug: Error in get_city_data: {str(e)}")
+            return None
+
+    @staticmethod
+    async def get_city_data_async(
+        city: str,
+        bbox: list,
+        debug: bool = False,
+        use_cache: bool = True,
+        force_refresh: bool = False,
+        categories: Optional[CategorySelection] = None,
+        output: str = "body",
     ) -> Optional[Dict[str, Any]]:
-        """Get raw city data from Overpass API"""
+        """Async variant of get_city_data using the pooled HTTP client"""
+        try:
+            query = OverpassAPI.build_query(city, bbox, categories, output)
+            return await OverpassAPI._run_query_async(
+                city, bbox, query, debug, use_cache, force_refresh
+            )
+
+        except Exception as e:
+            if debug:
+                print(f"Debug: Error in get_city_data_async: {str(e)}")
+            return None
+
+    @staticmethod
+    def get_city_data_sharded(
+        city: str,
+        bbox: list,
+        categories: Optional[CategorySelection] = None,
+        debug: bool = False,
+        use_cache: bool = True,
+        force_refresh: bool = False,
+        max_in_flight: int = APIConfig.OVERPASS_SHARD_CONCURRENCY,
+        output: str = "body",
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get raw city data with one query per selector group.
+
+        Shards run in a thread pool with at most max_in_flight requests at a
+        time. Each shard is cached and retried on its own, so a slow or failed
+        group no longer costs the whole result. Only the groups needed for
+        `categories` are fetched.
+        """
         try:
             start_time = time.time()
-            query = OverpassAPI.build_query(city, bbox)
+            queries = OverpassAPI.build_shard_queries(city, bbox, categories, output)
+            if debug:
+                print(f"Debug: Fetching {len(queries)} Overpass shards for {city}")
+
+            with ThreadPoolExecutor(max_workers=max(max_in_flight, 1)) as executor:
+                futures = {
+                    shard: executor.submit(
+                        OverpassAPI._run_query,
+                        city,
+                        bbox,
+                        query,
+                        debug,
+                        use_cache,
+                        force_refresh,
+                    )
+                    for shard, query in queries.items()
+                }
+                shard_results = {
+                    shard: future.result() for shard, future in futures.items()
+                }
+
+            return OverpassAPI._merge_shards(city, shard_results, start_time, debug)
 
+        except Exception as e:
+            if debug:
+                print(f"Debug: Error in get_city_data_sharded: {str(e)}")
+            return None
+
+    @staticmethod
+    async def get_city_data_sharded_async(
+        city: str,
+        bbox: list,
+        categories: Optional[CategorySelection] = None,
+        debug: bool = False,
+        use_cache: bool = True,
+        force_refresh: bool = False,
+        max_in_flight: int = APIConfig.OVERPASS_SHARD_CONCURRENCY,
+        output: str = "body",
+    ) -> Optional[Dict[str, Any]]:
+        """Async variant of get_city_data_sharded"""
+        try:
+            start_time = time.time()
+            queries = OverpassAPI.build_shard_queries(city, bbox, categories, output)
             if debug:
-                print("\nDebug: Sending Overpass API request")
-                print(f"Debug: Query length: {len(query)} characters")
-
-            for attempt in range(APIConfig.MAX_RETRIES):
-                try:
-                    response = requests.post(
-                        APIConfig.OVERPASS_URL,
-                        data={"data": query},
-                        timeout=APIConfig.TIMEOUT,
+                print(f"Debug: Fetching {len(queries)} Overpass shards for {city}")
+
+            semaphore = asyncio.Semaphore(max(max_in_flight, 1))
+
+            async def run_shard(query: str) -> Optional[Dict[str, Any]]:
+                async with semaphore:
+                    return await OverpassAPI._run_query_async(
+                        city, bbox, query, debug, use_cache, force_refresh
                     )
 
+            # Collect every shard, so one failing shard neither cancels the
+            # others mid-request nor leaves them running unobserved
+            results = await asyncio.gather(
+                *(run_shard(query) for query in queries.values()),
+                return_exceptions=True,
+            )
+            shard_results = {}
+            for shard, result in zip(queries, results):
+                if isinstance(result, Exception):
                     if debug:
                         print(
-                            f"Debug: Attempt {attempt + 1} - Status: {response.status_code}"
+                            f"Debug: Overpass shard {shard} for {city} raised {result!r}"
                         )
-
-                    if response.status_code == 200:
-                        data = response.json()
-                        query_time = time.time() - start_time
-
-                        result = {
-                            "elements": data.get("elements", []),
-                            "timestamp": datetime.now().isoformat(),
-                            "query_time_seconds": query_time,
-                            "node_count": sum(
-                                1
-                                for e in data.get("elements", [])
-                                if e.get("type") == "node"
-                            ),
-                            "way_count": sum(
-                                1
-                                for e in data.get("elements", [])
-                                if e.get("type") == "way"
-                            ),
-                            "relation_count": sum(
-                                1
-                                for e in data.get("elements", [])
-                                if e.get("type") == "relation"
-                            ),
-                        }
-
-                        if debug:
-                            print(
-                                f"Debug: Retrieved {len(result['elements'])} elements"
-                            )
-                            print(
-                                f"Debug: {result['node_count']} nodes, {result['way_count']} ways"
-                            )
-                            print(f"Debug: Query time: {query_time:.2f} seconds")
-
-                        return result
-
-                    elif response.status_code == 429:
-                        if debug:
-                            print(
-                                f"Debug: Rate limited, waiting {APIConfig.RETRY_DELAY}s"
-                            )
-                        time.sleep(APIConfig.RETRY_DELAY)
-
-                except requests.Timeout:
-                    if debug:
-                        print(f"Debug: Timeout on attempt {attempt + 1}")
-                    if attempt < APIConfig.MAX_RETRIES - 1:
-                        time.sleep(APIConfig.RETRY_DELAY)
-
-            return None
+                    result = None
+                elif isinstance(result, BaseException):
+                    raise result
+                shard_results[shard] = result
+            return OverpassAPI._merge_shards(city, shard_results, start_time, debug)
 
         except Exception as e:
             if debug:
-                print(f"Debug: Error in get_city_data: {str(e)}")
+                print(f"Debug: Error in get_city_data_sharded_async: {str(e)}")
             return None
 
+    @staticmethod
+    def _count_result(
+        groups: List[str], city_data: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, int]]:
+        if city_data is None:
+            return None
+        counts = [
+            int(element.get("tags", {}).get("total", 0))
+            for element in city_data["elements"]
+            if element.get("type") == "count"
+        ]
+        return dict(zip(groups, counts))
+
+    @staticmethod
+    def count_features(
+        city: str,
+        bbox: list,
+        categories: Optional[CategorySelection] = None,
+        debug: bool = False,
+        use_cache: bool = True,
+        force_refresh: bool = False,
+    ) -> Optional[Dict[str, int]]:
+        """
+        Count features per selector group with `out count`, without
+        downloading the elements.
+
+        Counts are raw selector matches; unlike the summary they do not apply
+        the first-match precedence of CATEGORY_RULES.
+        """
+        groups = list(select_query_groups(categories))
+        return OverpassAPI._count_result(
+            groups,
+            OverpassAPI.get_city_data(
+                city, bbox, debug, use_cache, force_refresh, categories, "count"
+            ),
+        )
+
+    @staticmethod
+    async def count_features_async(
+        city: str,
+        bbox: list,
+        categories: Optional[CategorySelection] = None,
+        debug: bool = False,
+        use_cache: bool = True,
+        force_refresh: bool = False,
+    ) -> Optional[Dict[str, int]]:
+        """Async variant of count_features"""
+        groups = list(select_query_groups(categories))
+        return OverpassAPI._count_result(
+            groups,
+            await OverpassAPI.get_city_data_async(
+                city, bbox, debug, use_cache, force_refresh, categories, "count"
+            ),
+        )
+
 
 def fetch_city_data(
-    city: str, state: str, debug: bool = False
+    city: str,
+    state: str,
+    debug: bool = False,
+    force_refresh: bool = False,
+    categories: Optional[CategorySelection] = None,
+    sharded: bool = False,
+    max_concurrent_shards: int = APIConfig.OVERPASS_SHARD_CONCURRENCY,
+    output: str = "body",
 ) -> Tuple[Optional[Dict], Optional[Dict]]:
-    """Fetch all raw city data from both APIs"""
+    """
+    Fetch raw city data from both APIs.
+
+    Only the Overpass selectors needed for `categories` are queried. With
+    sharded=True the query is split per selector group.
+    """
     location_data = LocationAPI.get_city_coordinates(city, state, debug)
     if not location_data:
         if debug:
             print("Debug: Failed to get location data")
         return None, None
 
-    city_data = OverpassAPI.get_city_data(city, location_data["bbox"], debug)
+    if sharded:
+        city_data = OverpassAPI.get_city_data_sharded(
+            city,
+            location_data["bbox"],
+            categories,
+            debug,
+            force_refresh=force_refresh,
+            max_in_flight=max_concurrent_shards,
+            output=output,
+        )
+    else:
+        city_data = OverpassAPI.get_city_data(
+            city,
+            location_data["bbox"],
+            debug,
+            force_refresh=force_refresh,
+            categories=categories,
+            output=output,
+        )
+    if not city_data:
+        if debug:
+            print("Debug: Failed to get city data")
+        return None, None
+
+    return location_data, city_data
+
+
+async def fetch_city_data_async(
+    city: str,
+    state: str,
+    debug: bool = False,
+    force_refresh: bool = False,
+    categories: Optional[CategorySelection] = None,
+    sharded: bool = False,
+    max_concurrent_shards: int = APIConfig.OVERPASS_SHARD_CONCURRENCY,
+    output: str = "body",
+) -> Tuple[Optional[Dict], Optional[Dict]]:
+    """Fetch raw city data from both APIs without blocking the event loop"""
+    location_data = await LocationAPI.get_city_coordinates_async(city, state, debug)
+    if not location_data:
+        if debug:
+            print("Debug: Failed to get location data")
+        return None, None
+
+    if sharded:
+        city_data = await OverpassAPI.get_city_data_sharded_async(
+            city,
+            location_data["bbox"],
+            categories,
+            debug,
+            force_refresh=force_refresh,
+            max_in_flight=max_concurrent_shards,
+            output=output,
+        )
+    else:
+        city_data = await OverpassAPI.get_city_data_async(
+            city,
+            location_data["bbox"],
+            debug,
+            force_refresh=force_refresh,
+            categories=categories,
+            output=output,
+        )
     if not city_data:
         if debug:
             print("Debug: Failed to get city data")
@@ -902,6 +1700,34 @@ class RawDataProcessor:
 
     @staticmethod
     def process_area_metrics(location_data: Dict, elements: List[Dict]) -> AreaMetrics:
+        # Count areas by type (no processing, just raw counts converted to area)
+        water_ways = sum(
+            1
+            for e in elements
+            if e.get("type") == "way" and e.get("tags", {}).get("natural") == "water"
+        )
+        green_ways = sum(
+            1
+            for e in elements
+            if e.get("type") == "way" and e.get("tags", {}).get("landuse") == "grass"
+        )
+        built_ways = sum(
+            1
+            for e in elements
+            if e.get("type") == "way"
+            and e.get("tags", {}).get("landuse")
+            in ["residential", "commercial", "industrial"]
+        )
+
+        return RawDataProcessor.area_metrics_from_counts(
+            location_data, water_ways, green_ways, built_ways
+        )
+
+    @staticmethod
+    def area_metrics_from_counts(
+        location_data: Dict, water_ways: int, green_ways: int, built_ways: int
+    ) -> AreaMetrics:
+        """Build area metrics from the bbox and pre-counted area ways"""
         metrics = AreaMetrics()
 
         # Get bounds
@@ -927,25 +1753,6 @@ class RawDataProcessor:
         height = R * abs(lat2 - lat1)
         metrics.total_area_sqkm = width * height
 
-        # Count areas by type (no processing, just raw counts converted to area)
-        water_ways = sum(
-            1
-            for e in elements
-            if e.get("type") == "way" and e.get("tags", {}).get("natural") == "water"
-        )
-        green_ways = sum(
-            1
-            for e in elements
-            if e.get("type") == "way" and e.get("tags", {}).get("landuse") == "grass"
-        )
-        built_ways = sum(
-            1
-            for e in elements
-            if e.get("type") == "way"
-            and e.get("tags", {}).get("landuse")
-            in ["residential", "commercial", "industrial"]
-        )
-
         # Simple proportional area assignment
         total_counted_ways = water_ways + green_ways + built_ways
         if total_counted_ways > 0:
@@ -962,6 +1769,345 @@ class RawDataProcessor:
         return metrics
 
 
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Tag rules mirroring the RawDataProcessor.process_* functions. Each category
+# holds a list of chains; a chain is an ordered list of (conditions, field)
+# rules where the first matching rule wins, like an if/elif block. Separate
+# chains in a category are independent `if` blocks.
+CATEGORY_RULES = {
+    "healthcare": [
+        [
+            ((("amenity", "hospital"),), "hospitals"),
+            ((("amenity", "clinic"),), "clinics"),
+            ((("amenity", "doctors"),), "doctors"),
+            ((("amenity", "dentist"),), "dentists"),
+            ((("amenity", "pharmacy"),), "pharmacies"),
+            ((("amenity", "healthcare"),), "healthcare_centres"),
+            ((("amenity", "veterinary"),), "veterinary"),
+        ],
+    ],
+    "education": [
+        [
+            ((("amenity", "school"),), "schools"),
+            ((("building", "school"),), "schools"),
+            ((("amenity", "kindergarten"),), "kindergartens"),
+            ((("amenity", "college"),), "colleges"),
+            ((("amenity", "university"),), "universities"),
+            ((("building", "university"),), "universities"),
+            ((("amenity", "library"),), "libraries"),
+            ((("amenity", "training"),), "training_centers"),
+            ((("amenity", "language_school"),), "language_schools"),
+            ((("amenity", "music_school"),), "music_schools"),
+        ],
+    ],
+    "transport": [
+        [
+            ((("public_transport", "platform"),), "transport_platforms"),
+            ((("public_transport", "station"),), "bus_stations"),
+        ],
+        [
+            ((("highway", "bus_stop"),), "bus_stops"),
+            ((("railway", "station"),), "train_stations"),
+            ((("railway", "subway_entrance"),), "subway_stations"),
+            ((("railway", "tram_stop"),), "tram_stops"),
+            ((("amenity", "ferry_terminal"),), "ferry_terminals"),
+            ((("amenity", "taxi"),), "taxi_stands"),
+            ((("amenity", "bicycle_rental"),), "bike_rental"),
+        ],
+    ],
+    "roads": [
+        [
+            ((("highway", "motorway"),), "motorways"),
+            ((("highway", "trunk"),), "trunks"),
+            ((("highway", "primary"),), "primary_roads"),
+            ((("highway", "secondary"),), "secondary_roads"),
+            ((("highway", "tertiary"),), "tertiary_roads"),
+            ((("highway", "residential"),), "residential_roads"),
+            ((("highway", "service"),), "service_roads"),
+            ((("highway", "cycleway"),), "cycleways"),
+            ((("highway", "footway"),), "footways"),
+        ],
+        [((("bridge", "yes"),), "bridges")],
+        [((("tunnel", "yes"),), "tunnels")],
+    ],
+    "retail": [
+        [
+            ((("shop", "mall"),), "malls"),
+            ((("shop", "supermarket"),), "supermarkets"),
+            ((("shop", "department_store"),), "department_stores"),
+            ((("shop", "convenience"),), "convenience_stores"),
+            ((("shop", "grocery"),), "grocery_stores"),
+            ((("shop", "greengrocer"),), "grocery_stores"),
+            ((("shop", "marketplace"),), "markets"),
+            ((("amenity", "marketplace"),), "markets"),
+        ],
+        [((("landuse", "retail"),), "retail_parks")],
+        [
+            ((("building", "retail"),), "shopping_centres"),
+            ((("shop", "shopping_centre"),), "shopping_centres"),
+        ],
+    ],
+    "food": [
+        [
+            ((("amenity", "restaurant"),), "restaurants"),
+            ((("amenity", "cafe"),), "cafes"),
+            ((("amenity", "fast_food"),), "fast_food"),
+            ((("amenity", "pub"),), "pubs"),
+            ((("amenity", "bar"),), "bars"),
+            ((("amenity", "food_court"),), "food_courts"),
+            ((("amenity", "ice_cream"),), "ice_cream"),
+            ((("amenity", "bistro"),), "bistros"),
+        ],
+    ],
+    "leisure": [
+        [
+            ((("leisure", "park"),), "parks"),
+            ((("leisure", "sports_centre"),), "sports_centres"),
+            ((("leisure", "fitness_center"),), "fitness_centers"),
+            ((("leisure", "fitness_centre"),), "fitness_centers"),
+            ((("leisure", "swimming_pool"),), "swimming_pools"),
+            ((("leisure", "stadium"),), "stadiums"),
+            ((("leisure", "playground"),), "playgrounds"),
+            ((("leisure", "recreation_ground"),), "recreation_grounds"),
+            ((("leisure", "golf_course"),), "golf_courses"),
+        ],
+        [
+            ((("amenity", "swimming_pool"),), "swimming_pools"),
+            ((("amenity", "sports_centre"),), "sports_centres"),
+        ],
+    ],
+    "buildings": [
+        [
+            ((("building", "residential"),), "residential"),
+            ((("building", "house"),), "residential"),
+            ((("building", "detached"),), "residential"),
+            ((("building", "apartments"),), "apartments"),
+            ((("building", "commercial"),), "commercial"),
+            ((("building", "retail"),), "retail"),
+            ((("building", "industrial"),), "industrial"),
+            ((("building", "warehouse"),), "warehouse"),
+            ((("building", "office"),), "office"),
+            ((("building", "government"),), "government"),
+            ((("building", "hospital"),), "hospital"),
+            ((("building", "school"),), "school"),
+            ((("building", "university"),), "university"),
+            ((("building", "hotel"),), "hotel"),
+            ((("building", "parking"),), "parking"),
+        ],
+    ],
+    "parking": [
+        [
+            ((("amenity", "parking"), ("parking", "surface")), "surface_parking"),
+            (
+                (("amenity", "parking"), ("parking", "multi-storey")),
+                "parking_structures",
+            ),
+            ((("amenity", "parking"), ("parking", "street_side")), "street_parking"),
+            # Count as surface parking by default
+            ((("amenity", "parking"),), "surface_parking"),
+        ],
+        [((("amenity", "bicycle_parking"),), "bike_parking")],
+        [((("amenity", "parking_space"),), "parking_spaces")],
+        [((("amenity", "charging_station"),), "ev_charging")],
+        [((("amenity", "parking"), ("disabled", "yes")), "disabled_parking")],
+    ],
+    "emergency": [
+        [
+            ((("amenity", "police"),), "police_stations"),
+            ((("amenity", "fire_station"),), "fire_stations"),
+            ((("amenity", "ambulance_station"),), "ambulance_stations"),
+            ((("amenity", "emergency_post"),), "emergency_posts"),
+            ((("amenity", "rescue_station"),), "rescue_stations"),
+        ],
+        [
+            ((("emergency", "disaster_response"),), "disaster_response"),
+            ((("emergency", "emergency_ward"),), "disaster_response"),
+        ],
+    ],
+    "entertainment": [
+        [
+            ((("amenity", "cinema"),), "cinemas"),
+            ((("amenity", "theatre"),), "theatres"),
+            ((("amenity", "arts_centre"),), "arts_centres"),
+            ((("amenity", "nightclub"),), "nightclubs"),
+            ((("amenity", "community_centre"),), "community_centres"),
+            ((("building", "events_venue"),), "event_venues"),
+            ((("amenity", "events_venue"),), "event_venues"),
+            ((("amenity", "museum"),), "museums"),
+            ((("amenity", "gallery"),), "galleries"),
+        ],
+    ],
+    "automotive": [
+        [
+            ((("shop", "car"),), "car_dealerships"),
+            ((("shop", "car_repair"),), "car_repair"),
+            ((("amenity", "car_wash"),), "car_wash"),
+            ((("amenity", "car_rental"),), "car_rental"),
+            ((("amenity", "car_sharing"),), "car_sharing"),
+            ((("amenity", "fuel"),), "fuel_stations"),
+            ((("amenity", "charging_station"),), "ev_charging_stations"),
+        ],
+    ],
+    "amenities": [
+        [
+            ((("amenity", "post_office"),), "post_offices"),
+            ((("amenity", "bank"),), "banks"),
+            ((("amenity", "atm"),), "atms"),
+            ((("amenity", "toilets"),), "toilets"),
+            ((("amenity", "recycling"),), "recycling"),
+            ((("amenity", "waste_disposal"),), "waste_disposal"),
+            ((("amenity", "water_point"),), "water_points"),
+            ((("amenity", "drinking_water"),), "water_points"),
+            ((("amenity", "bench"),), "benches"),
+        ],
+    ],
+    # Way counts used for proportional area assignment
+    "area_metrics": [
+        [((("natural", "water"),), "water_ways")],
+        [((("landuse", "grass"),), "green_ways")],
+        [
+            ((("landuse", "residential"),), "built_ways"),
+            ((("landuse", "commercial"),), "built_ways"),
+            ((("landuse", "industrial"),), "built_ways"),
+        ],
+    ],
+}
+
+# Categories whose processors only look at OSM ways
+WAY_ONLY_CATEGORIES = {"roads", "buildings", "area_metrics"}
+
+CATEGORY_CLASSES = {
+    "healthcare": HealthcareFacilities,
+    "education": EducationalFacilities,
+    "transport": TransportFacilities,
+    "roads": RoadNetwork,
+    "retail": Retail,
+    "food": FoodAndDrink,
+    "leisure": LeisureFacilities,
+    "buildings": Buildings,
+    "parking": Parking,
+    "emergency": EmergencyServices,
+    "entertainment": Entertainment,
+    "automotive": Automotive,
+    "amenities": PublicAmenities,
+}
+
+
+class ElementClassifier:
+    """
+    Single-pass classifier for OSM elements.
+
+    Compiles CATEGORY_RULES into a tag key -> tag value -> rules dispatch table
+    so each element is visited once and routed to every counter it matches,
+    instead of re-scanning the element list once per category.
+    """
+
+    def __init__(self, categories: Optional[Iterable[str]] = None):
+        self.categories = list(categories or CATEGORY_RULES.keys())
+        unknown = [c for c in self.categories if c not in CATEGORY_RULES]
+        if unknown:
+            raise ValueError(f"Unknown categories: {', '.join(unknown)}")
+
+        # slot index -> (category, field)
+        self.slots: List[Tuple[str, str]] = []
+        # tag key -> tag value -> [(chain, priority, slot, extra_conditions, way_only)]
+        self.dispatch: Dict[str, Dict[str, List[Tuple]]] = {}
+        self._compile()
+
+    def _compile(self):
+        slot_index = {}
+        chain_id = 0
+        for category in self.categories:
+            way_only = category in WAY_ONLY_CATEGORIES
+            for chain in CATEGORY_RULES[category]:
+                for priority, (conditions, field_name) in enumerate(chain):
+                    key = (category, field_name)
+                    if key not in slot_index:
+                        slot_index[key] = len(self.slots)
+                        self.slots.append(key)
+
+                    (tag_key, tag_value), *extra = conditions
+                    self.dispatch.setdefault(tag_key, {}).setdefault(
+                        tag_value, []
+                    ).append(
+                        (chain_id, priority, slot_index[key], tuple(extra), way_only)
+                    )
+                chain_id += 1
+
+    def count(self, elements: List[Dict]) -> List[int]:
+        """Count matches for every compiled slot in one pass over elements"""
+        counts = [0] * len(self.slots)
+        dispatch = self.dispatch
+
+        for element in elements:
+            tags = element.get("tags")
+            if not tags:
+                continue
+
+            is_way = element.get("type") == "way"
+            matched = None
+            for tag_key, tag_value in tags.items():
+                by_value = dispatch.get(tag_key)
+                if by_value is None:
+                    continue
+                rules = by_value.get(tag_value)
+                if rules is None:
+                    continue
+
+                for chain, priority, slot, extra, way_only in rules:
+                    if way_only and not is_way:
+                        continue
+                    if extra and any(tags.get(k) != v for k, v in extra):
+                        continue
+                    if matched is None:
+                        matched = {}
+                    current = matched.get(chain)
+                    if current is None or priority < current[0]:
+                        matched[chain] = (priority, slot)
+
+            if matched:
+                for _, slot in matched.values():
+                    counts[slot] += 1
+
+        return counts
+
+    def classify(
+        self, elements: List[Dict], location_data: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """
+        Classify elements into category dataclasses in a single pass.
+
+        Args:
+            elements: Overpass elements
+            location_data: Nominatim result, required for area_metrics
+
+        Returns:
+            Dict mapping category name to its populated dataclass
+        """
+        counts = self.count(elements)
+
+        results = {
+            category: CATEGORY_CLASSES[category]()
+            for category in self.categories
+            if category in CATEGORY_CLASSES
+        }
+        area_counts = {"water_ways": 0, "green_ways": 0, "built_ways": 0}
+
+        for (category, field_name), value in zip(self.slots, counts):
+            if category == "area_metrics":
+                area_counts[field_name] = value
+            else:
+                setattr(results[category], field_name, value)
+
+        if "area_metrics" in self.categories and location_data:
+            results["area_metrics"] = RawDataProcessor.area_metrics_from_counts(
+                location_data, **area_counts
+            )
+
+        return results
+
+
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Set, Union
 
@@ -1037,43 +2183,48 @@ class CitySummaryProcessor:
             }
         return config
 
-    def _process_category(
-        self,
-        category: str,
-        category_config: Union[bool, List[str]],
-        elements: List[Dict],
-        location_data: Optional[Dict] = None,
-    ) -> Any:
-        """Process a single category based on configuration"""
-        selected_fields = self._get_selected_fields(
-            category_config, self.category_fields[category]
+    def _enabled_categories(self, config: Dict) -> List[str]:
+        """Categories switched on in the payload's categories config"""
+        categories_config = self._expand_categories_config(
+            config.get("categories", "all")
         )
-
-        # Map categories to their processor methods
-        processors = {
-            "healthcare": RawDataProcessor.process_healthcare,
-            "education": RawDataProcessor.process_education,
-            "transport": RawDataProcessor.process_transport,
-            "roads": RawDataProcessor.process_roads,
-            "retail": RawDataProcessor.process_retail,
-            "food": RawDataProcessor.process_food_drink,
-            "leisure": RawDataProcessor.process_leisure,
-            "buildings": RawDataProcessor.process_buildings,
-            "parking": RawDataProcessor.process_parking,
-            "emergency": RawDataProcessor.process_emergency,
-            "entertainment": RawDataProcessor.process_entertainment,
-            "automotive": RawDataProcessor.process_automotive,
-            "amenities": RawDataProcessor.process_amenities,
+        return [
+            category
+            for category, category_config in categories_config.items()
+            if category_config
+        ]
+
+    def _field_selection(self, config: Dict) -> Dict[str, Set[str]]:
+        """Requested fields per enabled category, used to prune the Overpass query"""
+        categories_config = self._expand_categories_config(
+            config.get("categories", "all")
+        )
+        return {
+            category: self._get_selected_fields(
+                category_config, self.category_fields[category]
+            )
+            for category, category_config in categories_config.items()
+            if category_config
         }
 
-        if category == "area_metrics" and location_data:
-            processed = RawDataProcessor.process_area_metrics(location_data, elements)
-        elif category in processors:
-            processed = processors[category](elements)
-        else:
-            return None
+    def _fetch_options(self, config: Dict) -> Dict[str, Any]:
+        """fetch_city_data keyword arguments derived from the payload config"""
+        output = config.get("output", "body")
+        if output not in ("body", "tags"):
+            raise ValueError(
+                f"Summaries need element output ('body' or 'tags'), got '{output}'; "
+                "use OverpassAPI.count_features for counts"
+            )
 
-        return self._filter_dataclass_fields(processed, selected_fields)
+        return {
+            "force_refresh": config.get("force_refresh", False),
+            "categories": self._field_selection(config),
+            "output": output,
+            "sharded": config.get("sharded", False),
+            "max_concurrent_shards": config.get(
+                "max_concurrent_shards", APIConfig.OVERPASS_SHARD_CONCURRENCY
+            ),
+        }
 
     def create_city_summary(
         self, payload: Dict[str, Any]
@@ -1087,17 +2238,51 @@ class CitySummaryProcessor:
         Returns:
             NeighborhoodSummary object or None if data fetching fails
         """
-        # Extract basic parameters
-        city = payload["city"]
-        state = payload["state"]
         config = payload.get("config", {})
         debug = payload.get("debug", False) or config.get("debug", False)
 
         # Fetch raw data
-        location_data, city_data = fetch_city_data(city, state, debug)
+        location_data, city_data = fetch_city_data(
+            payload["city"], payload["state"], debug, **self._fetch_options(config)
+        )
         if not location_data or not city_data:
             return None
 
+        return self.build_summary(payload, location_data, city_data)
+
+    async def create_city_summary_async(
+        self, payload: Dict[str, Any]
+    ) -> Optional[NeighborhoodSummary]:
+        """
+        Async variant of create_city_summary.
+
+        Fetches over the shared async HTTP client and runs the CPU-bound
+        classification in a worker thread so the event loop stays free.
+        """
+        config = payload.get("config", {})
+        debug = payload.get("debug", False) or config.get("debug", False)
+
+        location_data, city_data = await fetch_city_data_async(
+            payload["city"], payload["state"], debug, **self._fetch_options(config)
+        )
+        if not location_data or not city_data:
+            return None
+
+        with span("build_summary", "compute", elements=len(city_data["elements"])):
+            return await asyncio.to_thread(
+                self.build_summary, payload, location_data, city_data
+            )
+
+    def build_summary(
+        self, payload: Dict[str, Any], location_data: Dict, city_data: Dict
+    ) -> NeighborhoodSummary:
+        """Build a NeighborhoodSummary from already fetched location and city data"""
+        # Extract basic parameters
+        city = payload["city"]
+        state = payload["state"]
+        config = payload.get("config", {})
+        debug = payload.get("debug", False) or config.get("debug", False)
+
         elements = city_data["elements"]
 
         # Initialize summary
@@ -1111,24 +2296,28 @@ class CitySummaryProcessor:
                 config.get("categories", "all")
             )
 
-            # Process each configured category
+            # Classify all configured categories in a single pass
+            classified = ElementClassifier(self._enabled_categories(config)).classify(
+                elements, location_data
+            )
+
             for category, category_config in categories_config.items():
                 if debug:
                     print(f"Debug: Processing {category}")
 
-                if not category_config:
+                if category not in classified:
                     continue
 
-                # Process category and set result
-                result = self._process_category(
-                    category=category,
-                    category_config=category_config,
-                    elements=elements,
-                    location_data=location_data if category == "area_metrics" else None,
+                selected_fields = self._get_selected_fields(
+                    category_config, self.category_fields[category]
+                )
+                setattr(
+                    summary,
+                    category,
+                    self._filter_dataclass_fields(
+                        classified[category], selected_fields
+                    ),
                 )
-
-                if result is not None:
-                    setattr(summary, category, result)
 
             # Update data quality information
             summary.data_quality.total_elements = len(elements)
@@ -1172,4 +2361,4 @@ class CitySummaryProcessor:
                 import traceback
 
                 print(traceback.format_exc())
-            raise
\ No newline at end of file
+            raise
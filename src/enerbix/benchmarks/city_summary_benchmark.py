@@ -0,0 +1,118 @@
+"""Benchmark: per-category OSM scans vs the single-pass ElementClassifier.
+
+Run from the ``src`` directory:
+
+    python -m enerbix.benchmarks.city_summary_benchmark --elements 500000
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from enerbix.api_handler.neighborhood_sumary import (
+    CATEGORY_RULES,
+    ElementClassifier,
+    RawDataProcessor,
+)
+
+# Austin-sized bounding box (south, north, west, east)
+LOCATION_DATA = {"bbox": ["30.0986", "30.5168", "-97.9383", "-97.5614"]}
+
+PROCESSORS = {
+    "healthcare": RawDataProcessor.process_healthcare,
+    "education": RawDataProcessor.process_education,
+    "transport": RawDataProcessor.process_transport,
+    "roads": RawDataProcessor.process_roads,
+    "retail": RawDataProcessor.process_retail,
+    "food": RawDataProcessor.process_food_drink,
+    "leisure": RawDataProcessor.process_leisure,
+    "buildings": RawDataProcessor.process_buildings,
+    "parking": RawDataProcessor.process_parking,
+    "emergency": RawDataProcessor.process_emergency,
+    "entertainment": RawDataProcessor.process_entertainment,
+    "automotive": RawDataProcessor.process_automotive,
+    "amenities": RawDataProcessor.process_amenities,
+}
+
+NOISE_TAGS = [
+    ("name", "Somewhere"),
+    ("addr:street", "Congress Avenue"),
+    ("surface", "asphalt"),
+    ("oneway", "yes"),
+    ("source", "survey"),
+]
+
+
+def generate_elements(count: int, seed: int = 42) -> List[Dict]:
+    """Generate synthetic Overpass elements using the tags the rules match on"""
+    rng = random.Random(seed)
+    tag_pool = sorted(
+        {
+            condition
+            for chains in CATEGORY_RULES.values()
+            for chain in chains
+            for conditions, _ in chain
+            for condition in conditions
+        }
+    )
+    tag_pool.append(("parking", "underground"))
+
+    elements = []
+    for i in range(count):
+        element_type = rng.choices(["node", "way", "relation"], [6, 3, 1])[0]
+        tags = dict(rng.sample(NOISE_TAGS, rng.randint(0, 3)))
+        # Skeleton nodes from `>; out skel qt;` carry no tags at all
+        if rng.random() < 0.6:
+            tags.update(rng.sample(tag_pool, rng.randint(1, 3)))
+        element = {"type": element_type, "id": i}
+        if tags:
+            element["tags"] = tags
+        elements.append(element)
+    return elements
+
+
+def per_category(elements: List[Dict]) -> Dict:
+    """Baseline: one full scan per category, as before"""
+    results = {name: processor(elements) for name, processor in PROCESSORS.items()}
+    results["area_metrics"] = RawDataProcessor.process_area_metrics(
+        LOCATION_DATA, elements
+    )
+    return results
+
+
+def single_pass(elements: List[Dict]) -> Dict:
+    return ElementClassifier().classify(elements, LOCATION_DATA)
+
+
+def best_of(fn, elements: List[Dict], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(elements)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--elements", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    elements = generate_elements(args.elements)
+
+    if per_category(elements) != single_pass(elements):
+        raise SystemExit("Mismatch between per-category and single-pass results")
+
+    baseline = best_of(per_category, elements, args.repeat)
+    optimized = best_of(single_pass, elements, args.repeat)
+
+    print(f"Elements:            {len(elements):,}")
+    print(f"Per-category scans:  {baseline:.3f}s")
+    print(f"Single pass:         {optimized:.3f}s")
+    print(f"Speedup:             {baseline / optimized:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
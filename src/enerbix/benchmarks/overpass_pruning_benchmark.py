@@ -0,0 +1,83 @@
+"""Benchmark: data transferred by full vs category-pruned Overpass queries.
+
+Compares the full raw-data query with the EV-only summary query in each
+output mode. Without --live only the generated queries are compared; with
+--live every query is sent to Overpass (bypassing the cache) and the response
+bytes, element counts and query times are reported.
+
+Run from the ``src`` directory:
+
+    python -m enerbix.benchmarks.overpass_pruning_benchmark --city Austin --state TX --live
+"""
+
+import argparse
+import re
+
+from enerbix.api_handler.neighborhood_sumary import (
+    CitySummaryProcessor,
+    LocationAPI,
+    OverpassAPI,
+)
+
+# Summary payload config for the EV-only use case
+EV_ONLY_CONFIG = {
+    "categories": {
+        "parking": ["ev_charging"],
+        "automotive": ["ev_charging_stations"],
+    }
+}
+
+SELECTOR_PATTERN = re.compile(r"^\s+(?:node|way)\(area\.searchArea\)", re.MULTILINE)
+
+
+def scenarios():
+    ev_selection = CitySummaryProcessor()._field_selection(EV_ONLY_CONFIG)
+    return [
+        ("full / body", None, "body"),
+        ("ev-only / body", ev_selection, "body"),
+        ("ev-only / tags", ev_selection, "tags"),
+        ("ev-only / count", ev_selection, "count"),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--city", default="Austin")
+    parser.add_argument("--state", default="TX")
+    parser.add_argument(
+        "--live", action="store_true", help="send the queries to Overpass"
+    )
+    args = parser.parse_args()
+
+    bbox = ["30.0986", "30.5168", "-97.9383", "-97.5614"]
+    if args.live:
+        location_data = LocationAPI.get_city_coordinates(args.city, args.state)
+        if not location_data:
+            raise SystemExit(f"Could not geocode {args.city}, {args.state}")
+        bbox = location_data["bbox"]
+
+    print(
+        f"{'Scenario':<18}{'Selectors':>10}{'Query chars':>13}"
+        + (f"{'Bytes':>14}{'Elements':>10}{'Seconds':>9}" if args.live else "")
+    )
+    for name, categories, output in scenarios():
+        query = OverpassAPI.build_query(args.city, bbox, categories, output)
+        row = f"{name:<18}{len(SELECTOR_PATTERN.findall(query)):>10}{len(query):>13}"
+
+        if args.live:
+            city_data = OverpassAPI.get_city_data(
+                args.city, bbox, categories=categories, output=output, use_cache=False
+            )
+            if city_data is None:
+                row += f"{'failed':>14}"
+            else:
+                row += (
+                    f"{city_data['response_bytes']:>14,}"
+                    f"{len(city_data['elements']):>10,}"
+                    f"{city_data['query_time_seconds']:>9.2f}"
+                )
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Benchmark: sequential, concurrent and merged planning and query analysis.
+
+The sequential path is create_plan() followed by analyze(): four blocking
+model calls, one after another. The concurrent path runs create_plan_async()
+alongside analyze_async(). The merged path is what ExecutionAgent does now:
+one structured QueryExtractionAgent call feeding both. A last check confirms
+that a merged plan for a report without search keywords keeps its report step.
+
+By default the Gemini client is replaced by a stand-in with a fixed latency
+per call, so the numbers show call scheduling only. With --live the real API
+is used (needs GEMINI_API_KEY).
+
+Run from the ``src`` directory:
+
+    python -m enerbix.benchmarks.planning_latency_benchmark --latency 0.8
+    python -m enerbix.benchmarks.planning_latency_benchmark --live
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+from enerbix.agents.planning_agent import PlanningAgent
+from enerbix.agents.query_analysis_agent import (
+    QueryAnalysisAgent,
+    QueryExtraction,
+    QueryExtractionAgent,
+)
+
+QUERY = "I want to understand the EV charging situation in Austin."
+
+
+def simulated_response(kwargs) -> SimpleNamespace:
+    """Canned answer for each of the planning and analysis prompts"""
+    if getattr(kwargs.get("config"), "response_schema", None) is QueryExtraction:
+        parsed = QueryExtraction(
+            cities=["Austin"],
+            pattern_type="DISCOVERY",
+            output_type="Report",
+            needs_visualization=True,
+            needs_search=True,
+        )
+        return SimpleNamespace(text=parsed.model_dump_json(), parsed=parsed)
+
+    contents = str(kwargs.get("contents"))
+    if "Extract only city names" in contents:
+        text = "Austin"
+    else:
+        text = "True"
+    function_call = SimpleNamespace(
+        args={
+            "pattern_type": "DISCOVERY",
+            "cities": ["Austin"],
+            "states": ["TX"],
+            "output_type": "Report",
+        }
+    )
+    part = SimpleNamespace(text=text, function_call=function_call)
+    return SimpleNamespace(
+        text=text,
+        candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))],
+    )
+
+
+class SimulatedModels:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def generate_content(self, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        return simulated_response(kwargs)
+
+
+class SimulatedAsyncModels(SimulatedModels):
+    async def generate_content(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return simulated_response(kwargs)
+
+
+def simulated_client(latency: float) -> SimpleNamespace:
+    return SimpleNamespace(
+        models=SimulatedModels(latency),
+        aio=SimpleNamespace(models=SimulatedAsyncModels(latency)),
+    )
+
+
+def agents(client, model_name: str):
+    planning_agent = PlanningAgent(query=QUERY, client=client, model_name=model_name)
+    return planning_agent, QueryAnalysisAgent(client, model_name)
+
+
+def sequential(client, model_name: str) -> float:
+    planning_agent, query_agent = agents(client, model_name)
+    start = time.perf_counter()
+    planning_agent.create_plan()
+    query_agent.analyze(QUERY)
+    return time.perf_counter() - start
+
+
+async def concurrent(client, model_name: str) -> float:
+    planning_agent, query_agent = agents(client, model_name)
+    start = time.perf_counter()
+    await asyncio.gather(
+        planning_agent.create_plan_async(), query_agent.analyze_async(QUERY)
+    )
+    return time.perf_counter() - start
+
+
+async def merged(client, model_name: str) -> float:
+    planning_agent, query_agent = agents(client, model_name)
+    extraction_agent = QueryExtractionAgent(client, model_name)
+    start = time.perf_counter()
+    extraction = await extraction_agent.extract_async(QUERY)
+    planning_agent.create_plan_from_extraction(extraction)
+    query_agent.analyze_extraction(QUERY, extraction)
+    return time.perf_counter() - start
+
+
+def report_step_check(client, model_name: str) -> bool:
+    """A Report query that needs no search must still get a ReportAgent step"""
+    planning_agent, _ = agents(client, model_name)
+    extraction = QueryExtraction(
+        cities=["Austin"],
+        pattern_type="DISCOVERY",
+        output_type="Report",
+        needs_visualization=False,
+        needs_search=False,
+    )
+    plan = planning_agent.create_plan_from_extraction(extraction)
+    report_steps = [step for step in plan.steps if step.agent_name == "ReportAgent"]
+    assert report_steps, "Report query without search lost its ReportAgent step"
+    assert not plan.enable_search
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.8)
+    parser.add_argument("--model", default="gemini-1.5-flash")
+    parser.add_argument("--live", action="store_true", help="call the Gemini API")
+    args = parser.parse_args()
+
+    if args.live:
+        from google import genai
+
+        client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    else:
+        client = simulated_client(args.latency)
+
+    before = sequential(client, args.model)
+    gathered = asyncio.run(concurrent(client, args.model))
+    single_call = asyncio.run(merged(client, args.model))
+
+    print(f"Sequential planning + analysis:  {before:.2f}s")
+    print(f"Concurrent planning + analysis:  {gathered:.2f}s")
+    print(f"Merged structured extraction:    {single_call:.2f}s")
+    print(f"Report step without search:      {report_step_check(client, args.model)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Benchmark: input tokens of a report with and without a cached prompt prefix.
+
+Runs the eight report sections for one city through a local stand-in for the
+Gemini client that counts the input tokens of each request, split into
+tokens read from cached content and uncached tokens, plus the tokens written
+to create the cache. Three setups are compared:
+
+    full map  every section prompt carries the whole data map
+    sliced    every section prompt carries its SECTION_DATA_PATHS slice
+    cached    ReportAgent(prompt_cache=True): one cached prefix per city
+
+"Billed" counts cache writes and uncached tokens in full and cached reads at
+--cached-rate (Gemini bills cached input at a quarter of the input price;
+storage is not included). Token counts use the chars/4 estimate.
+
+Run from the ``src`` directory:
+
+    python -m enerbix.benchmarks.report_cache_benchmark
+    python -m enerbix.benchmarks.report_cache_benchmark --min-cache-tokens 4096
+"""
+
+import argparse
+import asyncio
+import json
+from types import SimpleNamespace
+
+from enerbix.agents.report_agent import SECTION_NAMES, ReportAgent
+from enerbix.benchmarks.report_prompt_benchmark import austin_city_data
+from utils.token_utils import estimate_tokens
+
+
+def content_tokens(contents) -> int:
+    if isinstance(contents, str):
+        return estimate_tokens(contents)
+    return sum(content_tokens(content) for content in contents)
+
+
+class CacheCountingClient:
+    """Gemini client stand-in for aio.caches and aio.models.generate_content.
+
+    Cache creation fails below min_cache_tokens, as the API does for content
+    under the model's minimum cacheable size.
+    """
+
+    def __init__(self, min_cache_tokens: int = 0):
+        self.min_cache_tokens = min_cache_tokens
+        self.caches = {}
+        self.cache_write_tokens = 0
+        self.cached_tokens = 0
+        self.uncached_tokens = 0
+        self.requests = 0
+        self.aio = SimpleNamespace(
+            caches=SimpleNamespace(create=self.create_cache, delete=self.delete_cache),
+            models=SimpleNamespace(generate_content=self.generate_content),
+        )
+
+    async def create_cache(self, model: str, config):
+        tokens = content_tokens(config.contents)
+        if tokens < self.min_cache_tokens:
+            raise ValueError(
+                f"Cached content has {tokens} tokens, minimum is {self.min_cache_tokens}"
+            )
+        name = f"cachedContents/{len(self.caches)}"
+        self.caches[name] = tokens
+        self.cache_write_tokens += tokens
+        return SimpleNamespace(name=name)
+
+    async def delete_cache(self, name: str):
+        del self.caches[name]
+
+    async def generate_content(self, model: str, contents, config=None):
+        self.requests += 1
+        cached_content = getattr(config, "cached_content", None)
+        if cached_content:
+            self.cached_tokens += self.caches[cached_content]
+        self.uncached_tokens += content_tokens(contents)
+        text = json.dumps({"content": "", "citations": [], "key_findings": []})
+        return SimpleNamespace(text=text)
+
+    def billed_tokens(self, cached_rate: float) -> float:
+        return (
+            self.cache_write_tokens
+            + self.uncached_tokens
+            + cached_rate * self.cached_tokens
+        )
+
+
+async def run(setup: str, city_data, min_cache_tokens: int) -> CacheCountingClient:
+    client = CacheCountingClient(min_cache_tokens)
+    agent = ReportAgent(
+        client=client,
+        model_name="gemini-2.0-flash-001",
+        debug=True,
+        prompt_cache=setup == "cached",
+    )
+    if setup == "full map":
+        data_map = agent._prepare_data_map(city_data)
+        for name in SECTION_NAMES:
+            await agent._generate_section(name, city_data, None, data_map)
+    else:
+        await agent._generate_sections(city_data, None)
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cached-rate", type=float, default=0.25)
+    parser.add_argument("--min-cache-tokens", type=int, default=0)
+    args = parser.parse_args()
+
+    city_data = austin_city_data()
+    results = [
+        (setup, asyncio.run(run(setup, city_data, args.min_cache_tokens)))
+        for setup in ("full map", "sliced", "cached")
+    ]
+
+    baseline = results[0][1].billed_tokens(args.cached_rate)
+    print(
+        f"{'Setup':<10}{'Requests':>10}{'Cache writes':>14}{'Cached':>9}"
+        f"{'Uncached':>10}{'Billed':>9}{'Saved':>8}"
+    )
+    for setup, client in results:
+        billed = client.billed_tokens(args.cached_rate)
+        print(
+            f"{setup:<10}{client.requests:>10}{client.cache_write_tokens:>14,}"
+            f"{client.cached_tokens:>9,}{client.uncached_tokens:>10,}"
+            f"{billed:>9,.0f}{1 - billed / baseline:>8.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""Benchmark: prompt size of the report sections per data map encoding.
+
+Every report section prompt carries city data. This compares the indented
+JSON the prompts used to carry, the same JSON without whitespace and the flat
+path | value | unit table ReportAgent now sends, each with the full data map
+in every section and with the per-section slices of SECTION_DATA_PATHS.
+Token counts use the chars/4 estimate from utils.token_utils.
+
+The default data set is Austin, TX as reported in
+generated_reports/report.pdf; figures that report does not quote are 0.
+With --live the data is gathered fresh (needs network and NREL_API_KEY).
+
+Run from the ``src`` directory:
+
+    python -m enerbix.benchmarks.report_prompt_benchmark
+    python -m enerbix.benchmarks.report_prompt_benchmark --live --city Austin --state TX
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+
+from enerbix.agents.report_agent import SECTION_NAMES, ReportAgent, format_data_map
+from enerbix.api_handler.ev_infra_station_analysis import (
+    AccessibilityMetrics,
+    ChargingCapabilities,
+    ChargingSpeed,
+    FacilityTypeCount,
+    GeographicAnalysis,
+    NetworkAnalysis,
+    NetworkInfo,
+    StationAge,
+    StationAnalysis,
+)
+from enerbix.api_handler.neighborhood_sumary import (
+    AreaMetrics,
+    Buildings,
+    NeighborhoodSummary,
+    Parking,
+    RoadNetwork,
+    TransportFacilities,
+)
+from utils.token_utils import estimate_tokens
+
+
+def share(count: int, total: int) -> dict:
+    return {"count": count, "percentage": 100.0 * count / total}
+
+
+def austin_city_data() -> SimpleNamespace:
+    summary = NeighborhoodSummary(
+        city="Austin",
+        state="TX",
+        transport=TransportFacilities(bus_stops=2241, train_stations=10),
+        roads=RoadNetwork(
+            motorways=1124,
+            trunks=225,
+            primary_roads=2002,
+            secondary_roads=5295,
+            tertiary_roads=3482,
+            residential_roads=13200,
+            service_roads=42682,
+        ),
+        buildings=Buildings(apartments=3749, commercial=480, retail=634),
+        parking=Parking(surface_parking=2958, parking_structures=272, ev_charging=475),
+        area_metrics=AreaMetrics(total_area_sqkm=1679.20, built_area_sqkm=649.51),
+    )
+
+    stations = 74
+    ev_data = StationAnalysis(
+        metadata={"total_stations": stations, "city_area_square_miles": 586.14},
+        geographic_analysis=GeographicAnalysis(
+            total_stations_per_square_mile=stations / 586.14,
+            stations_by_facility_type=FacilityTypeCount(),
+        ),
+        charging_capabilities=ChargingCapabilities(
+            by_type={
+                "dc_fast": ChargingSpeed(count=12, total_ports=63),
+                "level2": ChargingSpeed(count=67, total_ports=120),
+                "level1": ChargingSpeed(),
+            },
+            connector_distribution=[],
+        ),
+        accessibility=AccessibilityMetrics(
+            access_type={
+                "24_7_access": share(56, stations),
+                "public": share(74, stations),
+            },
+            payment_methods={
+                "credit_card": share(43, stations),
+                "mobile_pay": share(48, stations),
+            },
+        ),
+        network_analysis=NetworkAnalysis(
+            networks=[
+                NetworkInfo(name="ChargePoint", station_count=43, percentage=58.1),
+                NetworkInfo(name="Non-Networked", station_count=26, percentage=35.1),
+                NetworkInfo(name="Tesla", station_count=5, percentage=6.8),
+            ],
+            pricing_types={
+                "free": {"count": 73, "percentage": 98.7},
+                "paid": share(0, stations),
+            },
+        ),
+        station_age=StationAge(
+            age_distribution={"more_than_3_years": share(74, stations)},
+            last_verified={
+                "last_30_days": share(43, stations),
+                "last_90_days": share(0, stations),
+            },
+        ),
+    )
+    return SimpleNamespace(summary=summary, ev_data=ev_data)
+
+
+async def live_city_data(city: str, state: str):
+    from enerbix.agents.data_gather_agent import DataGatherAgent
+
+    agent = DataGatherAgent(api_key=os.getenv("NREL_API_KEY"))
+    city_data = await agent._gather_city_data(city, state)
+    if city_data.error:
+        raise SystemExit(
+            f"Could not gather data for {city}, {state}: {city_data.error}"
+        )
+    return city_data
+
+
+class PromptRecorder:
+    """Models API that records each prompt and returns an empty section"""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def generate_content(self, **kwargs):
+        self.prompts.append(kwargs["contents"])
+        text = json.dumps({"content": "", "citations": [], "key_findings": []})
+        return SimpleNamespace(text=text)
+
+
+def recording_agent():
+    recorder = PromptRecorder()
+    agent = ReportAgent(
+        client=SimpleNamespace(aio=SimpleNamespace(models=recorder)),
+        model_name="gemini-1.5-flash",
+        debug=True,
+    )
+    return agent, recorder
+
+
+async def report_prompts(
+    agent, recorder, city_data, data_map, data_format: str, sliced: bool
+):
+    """Prompts and data payloads of one report's sections"""
+    agent.data_format = data_format
+    recorder.prompts = []
+    payloads = []
+    for name in SECTION_NAMES:
+        section_data = agent._section_data(data_map, name) if sliced else data_map
+        payloads.append(format_data_map(section_data, data_format))
+        await agent._generate_section(name, city_data, None, section_data)
+    return recorder.prompts, payloads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--city", default="Austin")
+    parser.add_argument("--state", default="TX")
+    parser.add_argument("--live", action="store_true", help="gather the data live")
+    args = parser.parse_args()
+
+    if args.live:
+        city_data = asyncio.run(live_city_data(args.city, args.state))
+    else:
+        city_data = austin_city_data()
+
+    agent, recorder = recording_agent()
+    data_map = agent._prepare_data_map(city_data)
+
+    baseline = None
+    print(
+        f"{'Encoding':<12}{'Data map':<10}{'Data tokens/section':>21}"
+        f"{'Report tokens':>15}{'Saved':>8}"
+    )
+    for data_format in ("json", "compact", "flat"):
+        for sliced in (False, True):
+            prompts, payloads = asyncio.run(
+                report_prompts(
+                    agent, recorder, city_data, data_map, data_format, sliced
+                )
+            )
+            data_tokens = sum(map(estimate_tokens, payloads)) / len(payloads)
+            report_tokens = sum(map(estimate_tokens, prompts))
+            baseline = baseline or report_tokens
+            print(
+                f"{data_format:<12}{'sliced' if sliced else 'full':<10}"
+                f"{data_tokens:>21,.0f}{report_tokens:>15,}"
+                f"{1 - report_tokens / baseline:>8.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
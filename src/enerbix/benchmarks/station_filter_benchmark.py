@@ -0,0 +1,82 @@
+"""Benchmark: per-station haversine checks vs the vectorized radius filter.
+
+Run from the ``src`` directory:
+
+    python -m enerbix.benchmarks.station_filter_benchmark --stations 50000
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from enerbix.api_handler.ev_infra_station_analysis import (
+    _validate_stations,
+    validate_station_location,
+)
+
+# Austin city center and a typical search radius
+CENTER_LAT = 30.2672
+CENTER_LON = -97.7431
+RADIUS_MILES = 25.0
+
+
+def generate_stations(count: int, seed: int = 42) -> List[Dict]:
+    """Generate synthetic NREL stations scattered around the center"""
+    rng = random.Random(seed)
+    stations = []
+    for i in range(count):
+        station = {"id": i}
+        # A few NREL records come back without usable coordinates
+        if rng.random() > 0.01:
+            station["latitude"] = CENTER_LAT + rng.uniform(-0.75, 0.75)
+            station["longitude"] = CENTER_LON + rng.uniform(-0.75, 0.75)
+        stations.append(station)
+    return stations
+
+
+def per_station(stations: List[Dict]) -> List[Dict]:
+    """Baseline: scalar haversine per station, as before"""
+    return [
+        station
+        for station in stations
+        if validate_station_location(station, CENTER_LAT, CENTER_LON, RADIUS_MILES)
+    ]
+
+
+def vectorized(stations: List[Dict]) -> List[Dict]:
+    return _validate_stations(stations, CENTER_LAT, CENTER_LON, RADIUS_MILES)
+
+
+def best_of(fn, stations: List[Dict], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(stations)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    stations = generate_stations(args.stations)
+
+    if per_station(stations) != vectorized(stations):
+        raise SystemExit("Mismatch between per-station and vectorized results")
+
+    baseline = best_of(per_station, stations, args.repeat)
+    optimized = best_of(vectorized, stations, args.repeat)
+
+    print(f"Stations:            {len(stations):,}")
+    print(f"Within radius:       {len(vectorized(stations)):,}")
+    print(f"Per-station checks:  {baseline:.4f}s")
+    print(f"Vectorized filter:   {optimized:.4f}s")
+    print(f"Speedup:             {baseline / optimized:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,7 +20,9 @@ agent = ExecutionAgent.create(
     model_name="gemini-1.5-flash",
     api_key=NREL_API_KEY,
     debug=True,
-    stage_output=True
+    stage_output=True,
+    # Chrome trace of the run; open in chrome://tracing or ui.perfetto.dev
+    trace_path=os.path.join(os.getcwd(), "generated_reports", "trace.json"),
 )
 async def main():
     query = "I want to understand the EV charging situation in Austin."
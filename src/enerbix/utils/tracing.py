@@ -0,0 +1,280 @@
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+import itertools
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from enerbix.utils.usage import add_usage, empty_usage, gemini_usage
+
+
+@dataclass
+class Span:
+    """One timed operation in a trace; times are seconds since the trace start"""
+
+    name: str
+    category: str
+    span_id: int
+    parent_id: Optional[int]
+    start: float
+    end: Optional[float] = None
+    lane: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    tokens: Dict[str, int] = field(default_factory=dict)
+    retries: int = 0
+    error: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else self.start) - self.start
+
+    def record(
+        self,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+        retries: int = 0,
+        tokens: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self.bytes_sent += bytes_sent
+        self.bytes_received += bytes_received
+        self.retries += retries
+        for key, count in (tokens or {}).items():
+            self.tokens[key] = self.tokens.get(key, 0) + count
+
+    def to_dict(self) -> Dict[str, Any]:
+        span = asdict(self)
+        span["duration"] = self.duration
+        return span
+
+
+_active_tracer: ContextVar[Optional["Tracer"]] = ContextVar("tracer", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("span", default=None)
+
+
+class Tracer:
+    """
+    Collects nested spans for one pipeline run.
+
+    The active tracer and span live in context variables, so spans opened
+    in tasks and worker threads started inside a span nest under it. Export
+    with to_json() or to_chrome_trace() (load the latter in
+    chrome://tracing or https://ui.perfetto.dev for a flame chart).
+    """
+
+    def __init__(self, name: str = "trace"):
+        self.name = name
+        self.spans: List[Span] = []
+        self._origin = time.perf_counter()
+        self._ids = itertools.count(1)
+        self._lanes: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def _now(self) -> float:
+        return time.perf_counter() - self._origin
+
+    def _lane(self) -> int:
+        """Small id of the running task (or thread), so concurrent spans are
+        drawn on separate rows of the flame chart"""
+        try:
+            key = id(asyncio.current_task())
+        except RuntimeError:
+            key = threading.get_ident()
+        with self._lock:
+            return self._lanes.setdefault(key, len(self._lanes))
+
+    @contextmanager
+    def activate(self) -> Iterator["Tracer"]:
+        """Make this the tracer that span() records into"""
+        token = _active_tracer.set(self)
+        try:
+            yield self
+        finally:
+            _active_tracer.reset(token)
+
+    @contextmanager
+    def span(self, name: str, category: str = "stage", **attributes) -> Iterator[Span]:
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            category=category,
+            span_id=next(self._ids),
+            parent_id=parent.span_id if parent else None,
+            start=self._now(),
+            lane=self._lane(),
+            attributes=attributes,
+        )
+        with self._lock:
+            self.spans.append(span)
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end = self._now()
+            _current_span.reset(token)
+
+    def totals(self, key: str = "name") -> Dict[str, Dict[str, Any]]:
+        """Wall time, bytes, tokens and retries summed per span name (or category)"""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for span in self.spans:
+            total = totals.setdefault(
+                getattr(span, key),
+                {"count": 0, "seconds": 0.0, "bytes": 0, "tokens": 0, "retries": 0},
+            )
+            total["count"] += 1
+            total["seconds"] += span.duration
+            total["bytes"] += span.bytes_sent + span.bytes_received
+            total["tokens"] += span.tokens.get("total_tokens", 0)
+            total["retries"] += span.retries
+        return totals
+
+    def usage(self, category: str = "stage") -> Dict[str, Any]:
+        """
+        Token usage of the run in total and per stage, where a span's stage
+        is its outermost enclosing span of the given category. Usage outside
+        any such span is reported under "other".
+        """
+        by_id = {span.span_id: span for span in self.spans}
+        total = empty_usage()
+        stages: Dict[str, Dict[str, int]] = {}
+        for span in self.spans:
+            if not span.tokens:
+                continue
+            stage, node = None, span
+            while node is not None:
+                if node.category == category:
+                    stage = node
+                node = by_id.get(node.parent_id)
+            add_usage(total, span.tokens)
+            add_usage(
+                stages.setdefault(stage.name if stage else "other", empty_usage()),
+                span.tokens,
+            )
+        return {"total": total, "stages": stages}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "spans": [span.to_dict() for span in self.spans]}
+
+    def to_json(self, path: Optional[str] = None, indent: Optional[int] = 2) -> str:
+        text = json.dumps(self.to_dict(), indent=indent, default=str)
+        if path:
+            _write(path, text)
+        return text
+
+    def to_chrome_trace(self, path: Optional[str] = None) -> Dict[str, Any]:
+        """Spans as Chrome trace "complete" events (microsecond timestamps)"""
+        events = [
+            {
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": span.start * 1e6,
+                "dur": span.duration * 1e6,
+                "pid": 1,
+                "tid": span.lane,
+                "args": {
+                    "bytes_sent": span.bytes_sent,
+                    "bytes_received": span.bytes_received,
+                    "tokens": span.tokens,
+                    "retries": span.retries,
+                    "error": span.error,
+                    **span.attributes,
+                },
+            }
+            for span in self.spans
+        ]
+        trace = {"traceEvents": events, "displayTimeUnit": "ms"}
+        if path:
+            _write(path, json.dumps(trace, default=str))
+        return trace
+
+
+def _write(path: str, text: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+@contextmanager
+def span(name: str, category: str = "stage", **attributes) -> Iterator[Optional[Span]]:
+    """Open a span in the active tracer; a no-op yielding None without one"""
+    tracer = _active_tracer.get()
+    if tracer is None:
+        yield None
+        return
+    with tracer.span(name, category, **attributes) as current:
+        yield current
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def record(
+    bytes_sent: int = 0,
+    bytes_received: int = 0,
+    retries: int = 0,
+    tokens: Optional[Dict[str, int]] = None,
+) -> None:
+    """Add bytes, retries or tokens to the current span, if any"""
+    current = _current_span.get()
+    if current is not None:
+        current.record(bytes_sent, bytes_received, retries, tokens)
+
+
+class _TracedModels:
+    """Wraps a google.genai models API so each generate_content call is a span"""
+
+    def __init__(self, models, is_async: bool):
+        self._models = models
+        self._is_async = is_async
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._models, name)
+
+    def generate_content(self, **kwargs):
+        if self._is_async:
+            return self._generate_content_async(**kwargs)
+        with span("gemini.generate_content", "llm", model=kwargs.get("model")):
+            response = self._models.generate_content(**kwargs)
+            record(tokens=gemini_usage(response))
+            return response
+
+    async def _generate_content_async(self, **kwargs):
+        with span("gemini.generate_content", "llm", model=kwargs.get("model")):
+            response = await self._models.generate_content(**kwargs)
+            record(tokens=gemini_usage(response))
+            return response
+
+
+class TracedGenAIClient:
+    """
+    google.genai client proxy that traces every generate_content call,
+    sync or async, with its token usage. Everything else is passed through.
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self.models = _TracedModels(client.models, is_async=False)
+        self.aio = _TracedAio(client.aio)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+class _TracedAio:
+    def __init__(self, aio):
+        self._aio = aio
+        self.models = _TracedModels(aio.models, is_async=True)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._aio, name)
@@ -0,0 +1,48 @@
+from typing import Dict, Optional
+
+# Same keys as models.base.Usage, so usage reads alike for every provider.
+# prompt_tokens includes cached and cache-written tokens.
+USAGE_KEYS = (
+    "prompt_tokens",
+    "completion_tokens",
+    "total_tokens",
+    "cached_tokens",
+    "cache_write_tokens",
+)
+
+
+def empty_usage() -> Dict[str, int]:
+    return dict.fromkeys(USAGE_KEYS, 0)
+
+
+def add_usage(total: Dict[str, int], usage: Optional[Dict[str, int]]) -> Dict[str, int]:
+    """Add usage into total in place and return total"""
+    for key in USAGE_KEYS:
+        total[key] = total.get(key, 0) + (usage or {}).get(key, 0)
+    return total
+
+
+def gemini_usage(response) -> Dict[str, int]:
+    """Usage of a google.genai generate_content response"""
+    metadata = getattr(response, "usage_metadata", None)
+    if metadata is None:
+        return {}
+    usage = empty_usage()
+    usage.update(
+        prompt_tokens=getattr(metadata, "prompt_token_count", None) or 0,
+        completion_tokens=getattr(metadata, "candidates_token_count", None) or 0,
+        total_tokens=getattr(metadata, "total_token_count", None) or 0,
+        cached_tokens=getattr(metadata, "cached_content_token_count", None) or 0,
+    )
+    return usage
+
+
+def gemini_cache_usage(cache) -> Dict[str, int]:
+    """Usage of creating a google.genai cached content; billed as input tokens"""
+    metadata = getattr(cache, "usage_metadata", None)
+    tokens = getattr(metadata, "total_token_count", None) or 0
+    if not tokens:
+        return {}
+    usage = empty_usage()
+    usage.update(prompt_tokens=tokens, total_tokens=tokens, cache_write_tokens=tokens)
+    return usage
@@ -0,0 +1,107 @@
+"""Benchmark: N identical concurrent CachedProvider calls.
+
+Identical requests that arrive while one is in flight share that call, so N
+concurrent callers should cost one API call and about one call's latency.
+The last rows check that cancelling the caller that owns the in-flight call
+(or abandoning its stream) does not cancel the other callers: they make the
+call themselves instead.
+
+The provider is a stand-in with a fixed latency per call.
+
+    python src/examples/cache_dedup_benchmark.py --calls 8
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+sys.path.append(PROJECT_ROOT)
+
+import src as maf
+from models.base import ModelProvider
+
+
+class SimulatedProvider(ModelProvider):
+    """Provider with a fixed latency per call that counts its API calls"""
+
+    model = "simulated"
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def generate(self, messages, tools=None, max_tokens=None, temperature=0.7, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return maf.ModelResponse(text="ok", usage=maf.Usage(prompt_tokens=5, total_tokens=5))
+
+    async def stream(self, messages, tools=None, max_tokens=None, temperature=0.7, **kwargs):
+        self.calls += 1
+        for text in ("o", "k"):
+            await asyncio.sleep(self.latency / 2)
+            yield maf.StreamChunk(text=text)
+        yield maf.StreamChunk(usage=maf.Usage(prompt_tokens=5, total_tokens=5), done=True)
+
+    def supports_vision(self) -> bool:
+        return False
+
+    def supports_tools(self) -> bool:
+        return False
+
+
+MESSAGES = [maf.Message(role="user", content="Reply with the word ok.")]
+
+
+async def timed_calls(provider: maf.CachedProvider, calls: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(provider.generate(MESSAGES, temperature=0) for _ in range(calls)))
+    return time.perf_counter() - start
+
+
+async def cancelled_owner(latency: float) -> str:
+    """The first caller is cancelled mid-call; the second must still get a response"""
+    provider = maf.CachedProvider(SimulatedProvider(latency))
+    owner = asyncio.create_task(provider.generate(MESSAGES, temperature=0))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(provider.generate(MESSAGES, temperature=0))
+    await asyncio.sleep(latency / 2)
+    owner.cancel()
+    response = await waiter
+    assert owner.cancelled() and response.text == "ok", "waiter failed with its owner"
+    return response.text
+
+
+async def abandoned_stream(latency: float) -> str:
+    """The first caller stops reading its stream; the second must still get a response"""
+    provider = maf.CachedProvider(SimulatedProvider(latency))
+    stream = provider.stream(MESSAGES, temperature=0)
+    await stream.__anext__()
+    waiter = asyncio.create_task(provider.generate(MESSAGES, temperature=0))
+    await asyncio.sleep(0)
+    await stream.aclose()
+    response = await waiter
+    assert response.text == "ok", "waiter failed with the abandoned stream"
+    return response.text
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.5, help="simulated API latency")
+    args = parser.parse_args()
+
+    provider = maf.CachedProvider(SimulatedProvider(args.latency))
+    concurrent = await timed_calls(provider, args.calls)
+    api_calls = provider.provider.calls
+
+    print(f"{f'{args.calls} identical concurrent calls:':<36}{concurrent:.2f}s")
+    print(f"{'API calls made:':<36}{api_calls}")
+    print(f"{'Waiter after cancelled owner:':<36}{await cancelled_owner(args.latency)}")
+    print(f"{'Waiter after abandoned stream:':<36}{await abandoned_stream(args.latency)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+"""Benchmark: N concurrent GeminiProvider.generate calls on one event loop.
+
+With the async client, N concurrent calls should finish in about the time of
+one. The "blocking" row reproduces the previous behaviour (the sync client
+called inside the coroutine), where the calls run one after another.
+
+By default the API is replaced by a stand-in client with fixed latency, so
+the numbers show scheduling behaviour only. With --live the real API is
+called (needs GEMINI_API_KEY).
+
+    python src/examples/gemini_concurrency_benchmark.py --calls 8
+    python src/examples/gemini_concurrency_benchmark.py --calls 8 --live
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+from dotenv import load_dotenv
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+sys.path.append(PROJECT_ROOT)
+
+import src as maf
+
+load_dotenv()
+
+
+def simulated_response() -> SimpleNamespace:
+    part = SimpleNamespace(text="ok", function_call=None)
+    return SimpleNamespace(
+        text="ok",
+        candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))],
+    )
+
+
+class SimulatedModels:
+    """Sync models API with a fixed latency"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def generate_content(self, **kwargs):
+        time.sleep(self.latency)
+        return simulated_response()
+
+
+class SimulatedAsyncModels:
+    """Async models API with a fixed latency"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def generate_content(self, **kwargs):
+        await asyncio.sleep(self.latency)
+        return simulated_response()
+
+
+def simulated_provider(latency: float) -> "maf.GeminiProvider":
+    provider = maf.GeminiProvider.__new__(maf.GeminiProvider)
+    provider.model = provider.model_name = "gemini-1.5-flash"
+    provider.debug = False
+    provider.client = SimpleNamespace(
+        models=SimulatedModels(latency),
+        aio=SimpleNamespace(models=SimulatedAsyncModels(latency)),
+    )
+    return provider
+
+
+def blocking_provider(provider: "maf.GeminiProvider") -> "maf.GeminiProvider":
+    """Route the async client to the sync one, as generate() used to"""
+    sync_models = provider.client.models
+
+    class BlockingModels:
+        async def generate_content(self, **kwargs):
+            return sync_models.generate_content(**kwargs)
+
+    blocking = maf.GeminiProvider.__new__(maf.GeminiProvider)
+    blocking.__dict__.update(provider.__dict__)
+    blocking.client = SimpleNamespace(
+        models=sync_models, aio=SimpleNamespace(models=BlockingModels())
+    )
+    return blocking
+
+
+async def timed_calls(provider: "maf.GeminiProvider", calls: int) -> float:
+    messages = [maf.Message(role="user", content="Reply with the word ok.")]
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(provider.generate(messages=messages, max_tokens=5) for _ in range(calls))
+    )
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.5, help="simulated API latency")
+    parser.add_argument("--live", action="store_true", help="call the Gemini API")
+    args = parser.parse_args()
+
+    if args.live:
+        provider = maf.GeminiProvider(
+            api_key=os.environ.get("GEMINI_API_KEY"), model="gemini-1.5-flash"
+        )
+    else:
+        provider = simulated_provider(args.latency)
+
+    single = await timed_calls(provider, 1)
+    concurrent = await timed_calls(provider, args.calls)
+    blocking = await timed_calls(blocking_provider(provider), args.calls)
+
+    print(f"{'Single call:':<30}{single:.2f}s")
+    print(f"{f'{args.calls} concurrent (async):':<30}{concurrent:.2f}s")
+    print(f"{f'{args.calls} concurrent (blocking):':<30}{blocking:.2f}s")
+    print(f"{'Concurrent / single:':<30}{concurrent / single:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -18,6 +18,15 @@ load_dotenv()
 class WeatherTool(maf.BaseTool):
     """Get the current weather for a location"""
     
+    # Share one provider client across calls instead of building one per call
+    instance_mode = "singleton"
+    
+    async def setup(self) -> None:
+        self.provider = maf.GeminiProvider(
+            api_key=os.environ.get("GEMINI_API_KEY"),
+            model="gemini-1.5-flash",
+        )
+    
     async def execute(
         self, 
         location: str, 
@@ -54,10 +63,7 @@ class WeatherTool(maf.BaseTool):
         
         try:
             print(f"firing  weather data for {location}...")
-            llm_response = await maf.GeminiProvider(
-                api_key=os.environ.get("GEMINI_API_KEY"),
-                model="gemini-1.5-flash",
-            ).generate(
+            llm_response = await self.provider.generate(
                 messages=[maf.Message(role="user", content=prompt)],
                 max_tokens=100
             )
@@ -151,13 +157,15 @@ async def basic_example():
         tools=registry
     )
     
-    # Run the agent
-    response = await agent.run("What's the weather like in Tokyo right now?")
-    print(f"Agent response: {response}")
-    
-    # Run with a follow-up question
-    response = await agent.run("How does that compare to New York?")
-    print(f"Agent response: {response}")
+    # Set up shared tool instances for the session and close them afterwards
+    async with registry:
+        # Run the agent
+        response = await agent.run("What's the weather like in Tokyo right now?")
+        print(f"Agent response: {response}")
+        
+        # Run with a follow-up question
+        response = await agent.run("How does that compare to New York?")
+        print(f"Agent response: {response}")
 
 async def vision_example():
     # Set up tool registry with image analysis
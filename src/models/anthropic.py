@@ -1,32 +1,41 @@
 # maf/models/anthropic.py
 import json
-from typing import Dict, List, Optional, Union, Any
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union, Any
 import anthropic
-from .base import ModelProvider, Message, ModelResponse
+from .base import ModelProvider, Message, ModelResponse, StreamChunk, Usage
+
+# Marks the end of a cached prompt prefix (Anthropic prompt caching)
+CACHE_CONTROL = {"type": "ephemeral"}
 
 class AnthropicProvider(ModelProvider):
     """Anthropic Claude model provider implementation"""
     
+    tool_format = "anthropic"
+    
     def __init__(self, api_key: str, model: str = "claude-3-opus-20240229"):
         self.client = anthropic.AsyncAnthropic(api_key=api_key)
         self.model = model
     
-    async def generate_content(
-        self, 
-        messages: List[Message], 
-        tools: Optional[List[Dict]] = None,
-        max_tokens: Optional[int] = None,
-        temperature: float = 0.7,
-        **kwargs
-    ) -> ModelResponse:
-        """Generate a response from the Anthropic model"""
+    def _convert_messages(self, messages: List[Message]) -> Tuple[Optional[Union[str, List[Dict[str, Any]]]], List[Dict[str, Any]]]:
+        """
+        Split out the system prompt and convert the rest to Anthropic messages.
+        
+        Several system messages (e.g. the instructions and a memory summary)
+        are joined as consecutive system blocks, in order.
+        
+        A message with cache=True gets a cache_control breakpoint on its last
+        block, so the prompt up to there is cached and read back at a discount.
+        """
         # Extract system message if present
-        system_message = None
+        system_blocks = []
         anthropic_messages = []
         
         for msg in messages:
             if msg.role == "system":
-                system_message = msg.content if isinstance(msg.content, str) else json.dumps(msg.content)
+                text = msg.content if isinstance(msg.content, str) else json.dumps(msg.content)
+                system_blocks.append({"type": "text", "text": text})
+                if msg.cache:
+                    system_blocks[-1]["cache_control"] = CACHE_CONTROL
                 continue
                 
             # Handle tool responses
@@ -41,6 +50,8 @@ class AnthropicProvider(ModelProvider):
                         }
                     ]
                 })
+                if msg.cache:
+                    anthropic_messages[-1]["content"][-1]["cache_control"] = CACHE_CONTROL
                 continue
                 
             # Normal user/assistant messages
@@ -69,30 +80,57 @@ class AnthropicProvider(ModelProvider):
                             }
                         })
                 anthropic_messages.append({"role": role, "content": parts})
+            
+            if msg.cache and anthropic_messages[-1]["content"]:
+                anthropic_messages[-1]["content"][-1]["cache_control"] = CACHE_CONTROL
         
-        # Format tools for Anthropic
-        tool_config = None
-        if tools:
-            tool_config = {
-                "tools": [
-                    {
-                        "name": tool["function"]["name"],
-                        "description": tool["function"].get("description", ""),
-                        "input_schema": tool["function"]["parameters"]
-                    }
-                    for tool in tools
-                ]
+        system_message = None
+        if len(system_blocks) == 1 and "cache_control" not in system_blocks[0]:
+            system_message = system_blocks[0]["text"]
+        elif system_blocks:
+            system_message = system_blocks
+        return system_message, anthropic_messages
+    
+    def format_tools(self, tools: List[Dict]) -> List[Dict[str, Any]]:
+        """Format tools for Anthropic, passing through ones already converted"""
+        return [
+            {
+                "name": tool["function"]["name"],
+                "description": tool["function"].get("description", ""),
+                "input_schema": tool["function"]["parameters"]
             }
-        
+            if "function" in tool else tool
+            for tool in tools
+        ]
+    
+    def _request_args(self, messages: List[Message], tools: Optional[List[Dict]], max_tokens: Optional[int], temperature: float, **kwargs) -> Dict[str, Any]:
+        system_message, anthropic_messages = self._convert_messages(messages)
+        request = {
+            "model": self.model,
+            "messages": anthropic_messages,
+            "max_tokens": max_tokens or 1024,
+            "temperature": temperature,
+            **kwargs
+        }
+        # The SDK rejects explicit None for optional fields
+        if system_message is not None:
+            request["system"] = system_message
+        if tools:
+            request["tools"] = self.format_tools(tools)
+        return request
+    
+    async def generate_content(
+        self, 
+        messages: List[Message], 
+        tools: Optional[List[Dict]] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> ModelResponse:
+        """Generate a response from the Anthropic model"""
         # Make the API call
         response = await self.client.messages.create(
-            model=self.model,
-            messages=anthropic_messages,
-            system=system_message,
-            tools=tool_config,
-            max_tokens=max_tokens or 1024,
-            temperature=temperature,
-            **kwargs
+            **self._request_args(messages, tools, max_tokens, temperature, **kwargs)
         )
         
         # Process tool calls if present
@@ -102,7 +140,7 @@ class AnthropicProvider(ModelProvider):
                 tool_calls.append({
                     "id": block.id,
                     "name": block.name,
-                    "arguments": json.loads(block.input)
+                    "arguments": block.input
                 })
         
         # Extract text content
@@ -111,13 +149,80 @@ class AnthropicProvider(ModelProvider):
         )
         
         return ModelResponse(
-            content=content,
+            text=content,
             tool_calls=tool_calls if tool_calls else None,
-            usage={
-                "input_tokens": response.usage.input_tokens,
-                "output_tokens": response.usage.output_tokens
-            }
+            usage=self._usage(response.usage)
+        )
+    
+    def _usage(self, usage, output_tokens: Optional[int] = None) -> Usage:
+        """
+        Normalised token usage. Anthropic's input_tokens leaves out cache
+        writes and reads, so they are added back into prompt_tokens.
+        """
+        cache_write_tokens = getattr(usage, "cache_creation_input_tokens", None) or 0
+        cached_tokens = getattr(usage, "cache_read_input_tokens", None) or 0
+        prompt_tokens = usage.input_tokens + cache_write_tokens + cached_tokens
+        completion_tokens = usage.output_tokens if output_tokens is None else output_tokens
+        return Usage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+            cached_tokens=cached_tokens,
+            cache_write_tokens=cache_write_tokens
+        )
+    
+    # ModelProvider entry point
+    generate = generate_content
+    
+    async def stream(
+        self,
+        messages: List[Message],
+        tools: Optional[List[Dict]] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Stream a response from the Anthropic model.
+        
+        Tool inputs arrive as partial JSON per content block; the assembled
+        string is parsed into a dict on the final chunk, as in generate().
+        """
+        response = await self.client.messages.create(
+            stream=True,
+            **self._request_args(messages, tools, max_tokens, temperature, **kwargs)
         )
+        
+        tool_calls: Dict[int, Dict[str, Any]] = {}
+        usage = Usage()
+        
+        async for event in response:
+            if event.type == "message_start":
+                message_usage = event.message.usage
+                usage = self._usage(message_usage)
+            elif event.type == "message_delta":
+                usage = self._usage(message_usage, event.usage.output_tokens)
+            elif event.type == "content_block_start" and event.content_block.type == "tool_use":
+                tool_calls[event.index] = {
+                    "id": event.content_block.id,
+                    "name": event.content_block.name,
+                    "arguments": ""
+                }
+                yield StreamChunk(tool_calls=[dict(tool_calls[i]) for i in sorted(tool_calls)])
+            elif event.type == "content_block_delta":
+                if event.delta.type == "text_delta":
+                    yield StreamChunk(text=event.delta.text)
+                elif event.delta.type == "input_json_delta":
+                    tool_calls[event.index]["arguments"] += event.delta.partial_json
+                    yield StreamChunk(tool_calls=[dict(tool_calls[i]) for i in sorted(tool_calls)])
+        
+        final_calls = []
+        for index in sorted(tool_calls):
+            tool_call = dict(tool_calls[index])
+            tool_call["arguments"] = json.loads(tool_call["arguments"] or "{}")
+            final_calls.append(tool_call)
+        
+        yield StreamChunk(tool_calls=final_calls or None, usage=usage, done=True)
     
     def supports_vision(self) -> bool:
         """Check if the model supports vision inputs"""
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Union, Any
+from typing import Any, AsyncIterator, Dict, List, Optional, Union, Any
 from pydantic import BaseModel, Field
 from enum import Enum
 
@@ -10,6 +10,7 @@ class Message(BaseModel):
     content: Union[str, Dict[str, Any]] # text or structured data
     tool_call_id: Optional[str] = None # ID of the tool call, if applicable
     tool_calls: Optional[List[Dict[str, Any]]] = None # List of tool calls, if applicable
+    cache: Optional[bool] = None # Mark the end of a reusable prompt prefix for provider-side prompt caching
 
 class ModelError(BaseModel):
     """Error model for handling exceptions"""
@@ -17,21 +18,64 @@ class ModelError(BaseModel):
     code: Optional[int] = None # Error code, if applicable
     details: Optional[Dict[str, Any]] = None # Additional error details
     
+class Usage(BaseModel):
+    """Token usage, in the same keys for every provider"""
+    prompt_tokens: int = 0 # Input tokens, including cached and cache-written ones
+    completion_tokens: int = 0 # Output tokens
+    total_tokens: int = 0 # prompt_tokens + completion_tokens
+    cached_tokens: int = 0 # Input tokens read from a prompt cache
+    cache_write_tokens: int = 0 # Input tokens written to a prompt cache
+    
+    def __add__(self, other: Optional["Usage"]) -> "Usage":
+        if other is None:
+            return self
+        return Usage(**{key: value + getattr(other, key) for key, value in self})
+    
 class ModelResponse(BaseModel):
     """Standardised response from LLMs"""
     text: str # Text response from the model
-    usage: Optional[Dict[str, int]] = None # Number of tokens used in the response
+    usage: Optional[Usage] = None # Number of tokens used in the response
     tool_calls: Optional[List[Dict[str, Any]]] = None # List of tool calls, if applicable
 
+class StreamChunk(BaseModel):
+    """Incremental piece of a streamed response"""
+    text: str = "" # Text delta since the previous chunk
+    tool_calls: Optional[List[Dict[str, Any]]] = None # Tool calls assembled so far (arguments may be partial until done)
+    usage: Optional[Usage] = None # Token usage, usually only on the final chunk
+    done: bool = False # True on the final chunk
+
 class ModelProvider(ABC):
     
     """Abstract base class for all model providers"""
     
+    # Key under which ToolRegistry caches this provider's tool definitions
+    tool_format: str = "openai"
+    
     @abstractmethod
     def generate(self, messages: List[Message], tools: Optional[List[Dict]] = None, max_tokens: Optional[int] = None, temperature: float = 0.7, **kwargs ) -> ModelResponse:
         """Generate content using the specified model"""
         pass
     
+    async def stream(self, messages: List[Message], tools: Optional[List[Dict]] = None, max_tokens: Optional[int] = None, temperature: float = 0.7, **kwargs) -> AsyncIterator[StreamChunk]:
+        """
+        Stream content as it is generated.
+
+        Yields text deltas and the tool calls assembled so far; the last chunk
+        has done=True and carries the final tool calls and usage. Providers
+        without native streaming fall back to a single chunk from generate().
+        """
+        response = await self.generate(messages=messages, tools=tools, max_tokens=max_tokens, temperature=temperature, **kwargs)
+        yield StreamChunk(text=response.text, tool_calls=response.tool_calls, usage=response.usage, done=True)
+    
+    def format_tools(self, tools: List[Dict]) -> List[Any]:
+        """
+        Convert OpenAI-style tool definitions to the provider's native form.
+
+        ToolRegistry caches the result per tool_format, and generate()/stream()
+        accept tools in either form.
+        """
+        return tools
+    
     @abstractmethod
     def supports_vision(self) -> bool:
         """Check if the model supports vision capabilities"""
@@ -0,0 +1,344 @@
+# maf/models/cache.py
+import asyncio
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from .base import ModelProvider, Message, ModelResponse, StreamChunk
+
+
+def make_cache_key(
+    provider: str,
+    model: str,
+    messages: List[Message],
+    tools: Optional[List[Dict]] = None,
+    max_tokens: Optional[int] = None,
+    temperature: float = 0.7,
+    **kwargs
+) -> str:
+    """
+    Canonical hash of a generate request.
+
+    Messages, tools and extra arguments are serialised as sorted-key JSON so
+    logically identical requests always map to the same key.
+    """
+    request = {
+        "provider": provider,
+        "model": model,
+        "messages": [
+            message.model_dump(exclude_none=True) if isinstance(message, Message) else message
+            for message in messages
+        ],
+        "tools": tools,
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "kwargs": kwargs,
+    }
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CacheBackend(ABC):
+    """Storage for cached model responses"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored response payload, or None on a miss"""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a response payload"""
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every entry"""
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU cache"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Persistent cache in a SQLite file, shared across runs"""
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    stored_at REAL NOT NULL
+                )"""
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        payload, stored_at = row
+        if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+            return None
+        return json.loads(payload)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, payload, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, default=str), time.time()),
+            )
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+
+class _OwnerCancelled(Exception):
+    """Set on an in-flight future whose owner was cancelled before finishing;
+    waiters then make the call themselves"""
+
+
+def deterministic_only(temperature: float, **kwargs) -> bool:
+    """Default cache policy: only cache requests sampled at temperature 0"""
+    return temperature == 0
+
+
+class CachedProvider(ModelProvider):
+    """
+    Wraps any ModelProvider with a response cache and request deduplication.
+
+    Identical requests (same provider, model, messages, tools and sampling
+    arguments) are answered from the backend, and identical requests that
+    arrive while one is already in flight wait for that call instead of
+    hitting the API again.
+
+    Whether a call is cacheable is decided by `policy` (temperature 0 only by
+    default) and can be overridden per call with `use_cache=True/False`.
+    """
+
+    def __init__(
+        self,
+        provider: ModelProvider,
+        backend: Optional[CacheBackend] = None,
+        policy: Callable[..., bool] = deterministic_only,
+        debug: bool = False,
+    ):
+        self.provider = provider
+        self.backend = backend or MemoryCacheBackend()
+        self.policy = policy
+        self.debug = debug
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose the wrapped provider's attributes (model, client, ...)
+        return getattr(self.provider, name)
+
+    def cache_key(
+        self,
+        messages: List[Message],
+        tools: Optional[List[Dict]] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> str:
+        return make_cache_key(
+            type(self.provider).__name__,
+            getattr(self.provider, "model", None),
+            messages,
+            tools,
+            max_tokens,
+            temperature,
+            **kwargs
+        )
+
+    async def generate(
+        self,
+        messages: List[Message],
+        tools: Optional[List[Dict]] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        use_cache: Optional[bool] = None,
+        **kwargs
+    ) -> ModelResponse:
+        """Generate content, served from the cache when possible"""
+        if use_cache is None:
+            use_cache = self.policy(temperature=temperature, tools=tools, **kwargs)
+        if not use_cache:
+            return await self.provider.generate(
+                messages=messages, tools=tools, max_tokens=max_tokens, temperature=temperature, **kwargs
+            )
+
+        key = self.cache_key(messages, tools, max_tokens, temperature, **kwargs)
+        response = await self._stored_response(key)
+        if response is not None:
+            return response
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+        try:
+            response = await self.provider.generate(
+                messages=messages, tools=tools, max_tokens=max_tokens, temperature=temperature, **kwargs
+            )
+            self.backend.set(key, response.model_dump())
+            future.set_result(response)
+            return response
+        except asyncio.CancelledError:
+            self._abandon(future)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            self.in_flight.pop(key, None)
+    
+    @staticmethod
+    def _abandon(future: asyncio.Future) -> None:
+        """Release waiters of a request whose owner was cancelled, without cancelling them"""
+        future.set_exception(_OwnerCancelled())
+        future.exception()
+    
+    async def _stored_response(self, key: str) -> Optional[ModelResponse]:
+        """
+        The cached response for key, or the result of an identical in-flight
+        request. Neither made an API call of its own, so usage is None and
+        Agent.usage only counts tokens actually spent. Returns None when the
+        caller has to make the call, including when the in-flight request
+        it waited on was cancelled.
+        """
+        cached = self.backend.get(key)
+        if cached is not None:
+            self.hits += 1
+            if self.debug:
+                print(f"🔍 Cache hit: {key[:12]}")
+            return ModelResponse.model_validate(cached).model_copy(update={"usage": None})
+
+        # Collapse identical concurrent requests into one API call
+        pending = self.in_flight.get(key)
+        while pending is not None:
+            if self.debug:
+                print(f"🔍 Waiting on in-flight request: {key[:12]}")
+            try:
+                response = await asyncio.shield(pending)
+            except _OwnerCancelled:
+                # The owner gave up; wait on whoever took over, or make the call
+                pending = self.in_flight.get(key)
+                continue
+            return response.model_copy(update={"usage": None})
+        return None
+    
+    async def stream(
+        self,
+        messages: List[Message],
+        tools: Optional[List[Dict]] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        use_cache: Optional[bool] = None,
+        **kwargs
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Stream content from the wrapped provider, served from the cache when possible.
+        
+        A cached (or deduplicated) response is yielded as one done=True chunk.
+        On a cache miss the provider's chunks are passed through as they arrive
+        and the assembled response is stored once the stream completes.
+        """
+        if use_cache is None:
+            use_cache = self.policy(temperature=temperature, tools=tools, **kwargs)
+        if not use_cache:
+            async for chunk in self.provider.stream(
+                messages=messages, tools=tools, max_tokens=max_tokens, temperature=temperature, **kwargs
+            ):
+                yield chunk
+            return
+
+        key = self.cache_key(messages, tools, max_tokens, temperature, **kwargs)
+        response = await self._stored_response(key)
+        if response is not None:
+            yield StreamChunk(text=response.text, tool_calls=response.tool_calls, usage=response.usage, done=True)
+            return
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+        text = []
+        final = StreamChunk(done=True)
+        try:
+            async for chunk in self.provider.stream(
+                messages=messages, tools=tools, max_tokens=max_tokens, temperature=temperature, **kwargs
+            ):
+                text.append(chunk.text)
+                if chunk.done:
+                    final = chunk
+                yield chunk
+            response = ModelResponse(text="".join(text), tool_calls=final.tool_calls, usage=final.usage)
+            self.backend.set(key, response.model_dump())
+            future.set_result(response)
+        except (asyncio.CancelledError, GeneratorExit):
+            # Cancelled, or the caller stopped reading before the stream ended
+            self._abandon(future)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            self.in_flight.pop(key, None)
+
+    @property
+    def tool_format(self) -> str:
+        return self.provider.tool_format
+
+    def format_tools(self, tools: List[Dict]) -> List[Any]:
+        return self.provider.format_tools(tools)
+
+    def supports_vision(self) -> bool:
+        return self.provider.supports_vision()
+
+    def supports_tools(self) -> bool:
+        return self.provider.supports_tools()
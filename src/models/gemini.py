@@ -1,21 +1,38 @@
 # maf/models/gemini.py
+import asyncio
+import hashlib
 import json
+import time
 import requests
-from typing import Dict, List, Optional, Union, Any
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union, Any
 from google import genai
 from google.genai import types
-from .base import ModelProvider, Message, ModelResponse
+from .base import ModelProvider, Message, ModelResponse, StreamChunk, Usage
 
 class GeminiProvider(ModelProvider):
     """Google Gemini model provider implementation"""
     
-    def __init__(self, api_key: str, model: str = "gemini-1.5-pro"):
-        """Initialize the GeminiProvider with API key and model name"""
+    tool_format = "gemini"
+    
+    def __init__(self, api_key: str, model: str = "gemini-1.5-pro", debug: bool = False, cache_ttl: int = 600):
+        """
+        Initialize the GeminiProvider with API key and model name.
+        
+        Messages up to one marked cache=True are stored as Gemini cached
+        content for cache_ttl seconds and reused by later requests that
+        start with the same messages.
+        """
         self.client = genai.Client(api_key=api_key)
         self.chat = self.client.chats.create(model=model)
         self.history = []
         self.model_name = model
         self.model = model
+        self.debug = debug
+        self.cache_ttl = cache_ttl
+        # Prompt prefix hash -> (cached content name or None, expiry time)
+        self.prompt_caches: Dict[str, Tuple[Optional[str], float]] = {}
+        # Prompt prefix hash -> lock, so concurrent requests create one cache per prefix
+        self.prompt_cache_locks: Dict[str, asyncio.Lock] = {}
     
     
     def create_image_parts(self, image_url: str) -> List[Dict[str, Any]]:
@@ -23,33 +40,103 @@ class GeminiProvider(ModelProvider):
         response = requests.get(image_url)
         return types.Part.from_bytes(mime_type="image/jpeg", data=response.content)
     
-    def _create_config(self, tools: Optional[List[Dict]] = None) -> Optional[types.GenerateContentConfig]:
+    def format_tools(self, tools: List[Dict]) -> List[types.Tool]:
+        """Convert tools to a Gemini Tool, passing through ones already converted"""
+        native_tools = [tool for tool in tools if isinstance(tool, types.Tool)]
+        
+        function_declarations = []
+        for tool in tools:
+            if isinstance(tool, dict) and "function" in tool:
+                function_declarations.append({
+                    "name": tool["function"]["name"],
+                    "description": tool["function"].get("description", ""),
+                    "parameters": tool["function"]["parameters"]
+                })
+        
+        if function_declarations:
+            # Initialize with functions
+            native_tools.append(types.Tool(function_declarations=function_declarations))
+        return native_tools
+    
+    def _create_config(self, tools: Optional[List[Any]] = None, cached_content: Optional[str] = None) -> Optional[types.GenerateContentConfig]:
             """Create Gemini configuration with tools if provided"""
+            if cached_content:
+                # Tools are part of the cached content
+                return types.GenerateContentConfig(cached_content=cached_content)
             if not tools:
                 return None
-                
-            function_declarations = []
-            for tool in tools:
-                if "function" in tool:
-                    function_declarations.append({
-                        "name": tool["function"]["name"],
-                        "description": tool["function"].get("description", ""),
-                        "parameters": tool["function"]["parameters"]
-                    })
+            return types.GenerateContentConfig(tools=self.format_tools(tools))
+    
+    async def _cached_content(self, prefix: List[Message], tools: Optional[List[Any]] = None) -> Optional[str]:
+        """
+        Name of the cached content holding the prompt prefix, created on first
+        use. Returns None when the prefix cannot be cached (for example when
+        it is below the model's minimum cacheable size); that is remembered
+        for cache_ttl so the request isn't retried on every call. Concurrent
+        requests with the same prefix wait for a single creation.
+        """
+        key = hashlib.sha256(json.dumps(
+            [[message.model_dump(exclude_none=True) for message in prefix], tools],
+            sort_keys=True, default=str
+        ).encode("utf-8")).hexdigest()
+        
+        name, expires_at = self.prompt_caches.get(key, (None, 0.0))
+        if time.monotonic() < expires_at:
+            return name
+        
+        async with self.prompt_cache_locks.setdefault(key, asyncio.Lock()):
+            # Another request may have created it while this one waited
+            name, expires_at = self.prompt_caches.get(key, (None, 0.0))
+            if time.monotonic() < expires_at:
+                return name
             
-            # Initialize with functions
-            tools_config = types.Tool(function_declarations=function_declarations)
-            return types.GenerateContentConfig(tools=[tools_config])
+            try:
+                cache = await self.client.aio.caches.create(
+                    model=self.model_name,
+                    config=types.CreateCachedContentConfig(
+                        contents=self._convert_messages(prefix),
+                        tools=self.format_tools(tools) if tools else None,
+                        ttl=f"{self.cache_ttl}s"
+                    )
+                )
+                name = cache.name
+            except Exception as e:
+                if self.debug:
+                    print(f"🔍 Gemini prompt cache unavailable: {e}")
+                name = None
+            
+            # Refresh a little early so a request never references an expired cache
+            self.prompt_caches[key] = (name, time.monotonic() + self.cache_ttl * 0.9)
+            return name
     
-    async def generate(
-        self, 
-        messages: List[Message], 
-        tools: Optional[List[Dict]] = None,
-        max_tokens: Optional[int] = None,
-        temperature: float = 0.7,
-        **kwargs
-    ) -> ModelResponse:
-        """Generate a response from the Gemini model"""
+    async def _prepare_request(self, messages: List[Message], tools: Optional[List[Any]] = None) -> Tuple[List[types.Content], Optional[types.GenerateContentConfig]]:
+        """Contents and config for a request, reading any cached prefix from the cache"""
+        gemini_messages = self._convert_messages(messages)
+        
+        cached_upto = max((i for i, message in enumerate(messages) if message.cache), default=None)
+        if cached_upto is not None:
+            prefix = messages[:cached_upto + 1]
+            cached_content = await self._cached_content(prefix, tools)
+            if cached_content:
+                # Conversion is sequential, so the prefix converts to the leading contents
+                prefix_length = len(self._convert_messages(prefix))
+                return gemini_messages[prefix_length:], self._create_config(tools, cached_content)
+        
+        return gemini_messages, self._create_config(tools)
+    
+    def _usage(self, usage_metadata) -> Optional[Usage]:
+        """Normalised token usage; prompt_token_count already includes cached content"""
+        if not usage_metadata:
+            return None
+        return Usage(
+            prompt_tokens=usage_metadata.prompt_token_count or 0,
+            completion_tokens=usage_metadata.candidates_token_count or 0,
+            total_tokens=usage_metadata.total_token_count or 0,
+            cached_tokens=getattr(usage_metadata, "cached_content_token_count", None) or 0
+        )
+    
+    def _convert_messages(self, messages: List[Message]) -> List[types.Content]:
+        """Convert messages to Gemini contents"""
         # Convert to Gemini format
         gemini_messages = []
         tool_call_mapping = {} # mapping from tool call id to tool name
@@ -152,20 +239,33 @@ class GeminiProvider(ModelProvider):
                     gemini_messages.append(types.ModelContent(parts=parts))
                 # gemini_messages.append({"role": role, "parts": parts})
         
+        return gemini_messages
+    
+    async def generate(
+        self, 
+        messages: List[Message], 
+        tools: Optional[List[Dict]] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> ModelResponse:
+        """Generate a response from the Gemini model"""
+        gemini_messages, config = await self._prepare_request(messages, tools)
+        
         # Configure function calling
         generation_config = {
             "temperature": temperature,
             "max_output_tokens": max_tokens,
             **kwargs
         }
-        # Replace the placeholder with:
-        config = self._create_config(tools)
-        print(f"🔍 Gemini Messages being sent in history: {gemini_messages}")
-        
-        response = self.client.models.generate_content(model=self.model_name,contents=gemini_messages,config=config)
+        if self.debug:
+            print(f"🔍 Gemini Messages being sent in history: {gemini_messages}")
         
+        # Async client so concurrent calls on one event loop don't block each other
+        response = await self.client.aio.models.generate_content(model=self.model_name,contents=gemini_messages,config=config)
         
-        print(f"🔍 Gemini Response: {response}")
+        if self.debug:
+            print(f"🔍 Gemini Response: {response}")
         
         # Extract function calls if present
         tool_calls = []
@@ -195,9 +295,52 @@ class GeminiProvider(ModelProvider):
         return ModelResponse(
             text=response.text if response.text else "N/A",
             tool_calls=tool_calls if tool_calls else None,
-            usage=None  # Gemini doesn't provide token usage in the same way
+            usage=self._usage(getattr(response, "usage_metadata", None))
         )
     
+    async def stream(
+        self,
+        messages: List[Message],
+        tools: Optional[List[Dict]] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> AsyncIterator[StreamChunk]:
+        """Stream a response from the Gemini model"""
+        gemini_messages, config = await self._prepare_request(messages, tools)
+        
+        tool_calls = []
+        usage = None
+        response = await self.client.aio.models.generate_content_stream(model=self.model_name, contents=gemini_messages, config=config)
+        async for chunk in response:
+            if chunk.usage_metadata:
+                usage = self._usage(chunk.usage_metadata)
+            
+            text = ""
+            new_calls = False
+            for candidate in chunk.candidates or []:
+                if not candidate.content or not candidate.content.parts:
+                    continue
+                for part in candidate.content.parts:
+                    if part.function_call:
+                        # Gemini sends each function call whole, never as fragments
+                        arguments = part.function_call.args
+                        if not isinstance(arguments, dict):
+                            arguments = json.loads(arguments) if arguments else {}
+                        tool_calls.append({
+                            "id": f"call_{len(tool_calls)}",  # Gemini doesn't provide IDs
+                            "name": part.function_call.name,
+                            "arguments": arguments
+                        })
+                        new_calls = True
+                    elif part.text:
+                        text += part.text
+            
+            if text or new_calls:
+                yield StreamChunk(text=text, tool_calls=list(tool_calls) or None)
+        
+        yield StreamChunk(tool_calls=tool_calls or None, usage=usage, done=True)
+    
     def supports_vision(self) -> bool:
         """Check if the model supports vision inputs"""
         vision_models = ["gemini-1.5-pro", "gemini-1.5-flash"]
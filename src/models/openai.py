@@ -1,13 +1,18 @@
 import asyncio
-from typing import Optional, List, Dict, Any
+from typing import AsyncIterator, Optional, List, Dict, Any
 from pydantic import BaseModel
 from openai import AsyncOpenAI
-from .base import ModelProvider, Message, ModelResponse
+from .base import ModelProvider, Message, ModelResponse, StreamChunk, Usage
 
 
 class OpenAIProvider(ModelProvider):
     """
     OpenAI model provider for generating content using OpenAI's API.
+    
+    OpenAI caches prompt prefixes of 1024+ tokens automatically, so Message.cache
+    needs no marker here; keep shared content at the start of the prompt and
+    pass prompt_cache_key to route requests sharing a prefix together.
+    Cache reads are reported as cached_tokens in the usage.
     """
     
     def __init__(self, api_key: str, model: str, debug: bool = False):
@@ -20,18 +25,10 @@ class OpenAIProvider(ModelProvider):
         
 
 
-    async def generate(
-        self,
-        messages: List[Message],
-        tools: Optional[List[Dict]] = None,
-        max_tokens: Optional[int] = None,
-        temperature: float = 0.7,
-        **kwargs
-    ) -> ModelResponse:
+    def _convert_messages(self, messages: List[Message]) -> List[Dict[str, Any]]:
         """
-        Generate content using the specified OpenAI model.
+        Convert messages to the OpenAI chat format.
         """
-        
         openai_messages = []
         
         for message in messages:
@@ -46,6 +43,30 @@ class OpenAIProvider(ModelProvider):
         # Debugging output
         if self.debug:
             print(f"🔍 OpenAI Messages: {openai_messages}")
+        return openai_messages
+
+    def _usage(self, usage) -> Usage:
+        details = getattr(usage, "prompt_tokens_details", None)
+        return Usage(
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            total_tokens=usage.total_tokens,
+            cached_tokens=getattr(details, "cached_tokens", None) or 0
+        )
+
+    async def generate(
+        self,
+        messages: List[Message],
+        tools: Optional[List[Dict]] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> ModelResponse:
+        """
+        Generate content using the specified OpenAI model.
+        """
+        
+        openai_messages = self._convert_messages(messages)
         try:
             response = await self.client.chat.completions.create(
                 model=self.model,
@@ -58,14 +79,73 @@ class OpenAIProvider(ModelProvider):
             # Process the response
             first_message = response.choices[0].message
             # Format tool calls if present
-            if message.tool_calls:
+            tool_calls = None
+            if first_message.tool_calls:
                 tool_calls = [
                     {"id": tool_call.id, "name": tool_call.function.name, "arguments": tool_call.function.arguments}
                     for tool_call in first_message.tool_calls
                 ]
-            return ModelResponse(content = first_message.content or "", tool_calls=tool_calls, usage = {"total_tokens": response.usage.total_tokens, "prompt_tokens": response.usage.prompt_tokens, "completion_tokens": response.usage.completion_tokens})
+            return ModelResponse(text = first_message.content or "", tool_calls=tool_calls, usage = self._usage(response.usage))
         except Exception as e:
             raise Exception(f"Error generating content: {str(e)}")
+
+    async def stream(
+        self,
+        messages: List[Message],
+        tools: Optional[List[Dict]] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Stream content from the specified OpenAI model.
+        
+        Tool call arguments arrive as JSON fragments and are concatenated per
+        tool call index as they come in.
+        """
+        openai_messages = self._convert_messages(messages)
+        tool_calls: Dict[int, Dict[str, Any]] = {}
+        usage = None
+        try:
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=openai_messages,
+                tools=tools,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True,
+                stream_options={"include_usage": True},
+                **kwargs
+            )
+            async for chunk in response:
+                if chunk.usage:
+                    usage = self._usage(chunk.usage)
+                if not chunk.choices:
+                    continue
+                
+                delta = chunk.choices[0].delta
+                for fragment in delta.tool_calls or []:
+                    tool_call = tool_calls.setdefault(fragment.index, {"id": None, "name": "", "arguments": ""})
+                    if fragment.id:
+                        tool_call["id"] = fragment.id
+                    if fragment.function and fragment.function.name:
+                        tool_call["name"] += fragment.function.name
+                    if fragment.function and fragment.function.arguments:
+                        tool_call["arguments"] += fragment.function.arguments
+                
+                if delta.content or delta.tool_calls:
+                    yield StreamChunk(
+                        text=delta.content or "",
+                        tool_calls=[dict(tool_calls[index]) for index in sorted(tool_calls)] or None,
+                    )
+        except Exception as e:
+            raise Exception(f"Error streaming content: {str(e)}")
+        
+        yield StreamChunk(
+            tool_calls=[tool_calls[index] for index in sorted(tool_calls)] or None,
+            usage=usage,
+            done=True,
+        )
         
     def supports_vision(self) -> bool:
         """
@@ -6,6 +6,26 @@ import json
 
 class BaseTool(ABC):
     """Base class for all tools that can be used by the model"""
+    
+    # Set to True for tools that must not run alongside other tool calls
+    # (shared state, ordering side effects); they run alone, in requested order
+    serial_only: bool = False
+    # Per-tool timeout in seconds, overriding the agent's default
+    timeout: Optional[float] = None
+    # How ToolRegistry manages instances: "per_call" creates one per call,
+    # "singleton" shares one instance, "pooled" reuses up to pool_size
+    # instances so concurrent calls don't share one
+    instance_mode: str = "per_call"
+    pool_size: int = 4
+    
+    async def setup(self) -> None:
+        """Acquire long-lived resources (clients, connection pools) before first use"""
+        pass
+    
+    async def teardown(self) -> None:
+        """Release resources acquired in setup()"""
+        pass
+    
     @abstractmethod
     def execute(self, *args: Any, **kwargs: Any) -> Any:
         pass
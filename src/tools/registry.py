@@ -1,15 +1,51 @@
+import asyncio
 from typing import Dict, Type, List, Any
 from .base import BaseTool
 
+INSTANCE_MODES = ("per_call", "singleton", "pooled")
+
 class ToolRegistry:
-    """Registry for tools that can be used with LLMs"""
+    """
+    Registry for tools that can be used with LLMs.
+    
+    Tool instances are managed according to each tool's instance_mode. Use
+    the registry as an async context manager to run setup() on shared
+    instances before the first call and teardown() on every instance when
+    done:
+    
+        async with registry:
+            await agent.run(...)
+    """
     
     def __init__(self):
         self._tools: Dict[str, Type[BaseTool]] = {}
+        # Schemas are generated once per registration, not on every turn
+        self._definitions: Dict[str, Dict[str, Any]] = {}
+        self._all_definitions: List[Dict[str, Any]] = []
+        self._provider_definitions: Dict[str, List[Any]] = {}
+        # Instance lifecycle state
+        self._instances: Dict[str, List[BaseTool]] = {}
+        self._idle: Dict[str, asyncio.Queue] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._retired: List[BaseTool] = []
     
     def register(self, tool_class: Type[BaseTool]) -> None:
-        """Register a tool class"""
-        self._tools[tool_class.__name__] = tool_class
+        """Register a tool class, replacing any tool with the same name"""
+        if tool_class.instance_mode not in INSTANCE_MODES:
+            raise ValueError(f"Unknown instance_mode {tool_class.instance_mode!r} for tool {tool_class.__name__}")
+        
+        name = tool_class.__name__
+        # Instances of a replaced class are torn down on close()
+        self._retired.extend(self._instances.pop(name, []))
+        self._idle.pop(name, None)
+        
+        self._tools[name] = tool_class
+        self._definitions[name] = tool_class.get_definition()
+        self._invalidate()
+    
+    def _invalidate(self) -> None:
+        self._all_definitions = list(self._definitions.values())
+        self._provider_definitions = {}
     
     def get_tool(self, name: str) -> Type[BaseTool]:
         """Get a tool class by name"""
@@ -17,12 +53,104 @@ class ToolRegistry:
             raise ValueError(f"Tool {name} not found in registry")
         return self._tools[name]
     
+    def get_definition(self, name: str) -> Dict[str, Any]:
+        """Get the cached definition of a registered tool"""
+        self.get_tool(name)
+        return self._definitions[name]
+    
     def get_all_definitions(self) -> List[Dict[str, Any]]:
         """Get definitions for all registered tools"""
-        return [tool_class.get_definition() for tool_class in self._tools.values()]
+        return self._all_definitions
+    
+    def get_provider_definitions(self, provider: Any) -> List[Any]:
+        """
+        Get definitions for all registered tools in a provider's native form.
+        
+        The conversion runs once per provider tool_format and is cached until
+        the next registration.
+        """
+        tool_format = getattr(provider, "tool_format", "openai")
+        if tool_format not in self._provider_definitions:
+            self._provider_definitions[tool_format] = provider.format_tools(self._all_definitions)
+        return self._provider_definitions[tool_format]
+    
+    async def _create_instance(self, name: str) -> BaseTool:
+        tool_instance = self.get_tool(name)()
+        await tool_instance.setup()
+        self._instances.setdefault(name, []).append(tool_instance)
+        return tool_instance
+    
+    async def _acquire(self, name: str) -> BaseTool:
+        """Get a ready instance of a shared (singleton or pooled) tool"""
+        tool_class = self.get_tool(name)
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        
+        if tool_class.instance_mode == "singleton":
+            async with lock:
+                if not self._instances.get(name):
+                    await self._create_instance(name)
+            return self._instances[name][0]
+        
+        idle = self._idle.setdefault(name, asyncio.Queue())
+        async with lock:
+            if idle.empty() and len(self._instances.get(name, [])) < max(1, tool_class.pool_size):
+                return await self._create_instance(name)
+        # Pool exhausted: wait for a call to hand one back
+        return await idle.get()
+    
+    def _release(self, name: str, tool_instance: BaseTool) -> None:
+        if tool_instance in self._instances.get(name, []):
+            self._idle[name].put_nowait(tool_instance)
     
     async def execute_tool(self, name: str, **kwargs) -> Any:
         """Execute a tool by name with the given parameters"""
         tool_class = self.get_tool(name)
-        tool_instance = tool_class()
-        return await tool_instance.execute(**kwargs)
\ No newline at end of file
+        
+        if tool_class.instance_mode == "per_call":
+            tool_instance = tool_class()
+            await tool_instance.setup()
+            try:
+                return await tool_instance.execute(**kwargs)
+            finally:
+                await tool_instance.teardown()
+        
+        tool_instance = await self._acquire(name)
+        try:
+            return await tool_instance.execute(**kwargs)
+        finally:
+            if tool_class.instance_mode == "pooled":
+                self._release(name, tool_instance)
+    
+    async def start(self) -> None:
+        """Create and set up singleton tools and fill tool pools"""
+        for name, tool_class in self._tools.items():
+            if tool_class.instance_mode == "singleton":
+                await self._acquire(name)
+            elif tool_class.instance_mode == "pooled":
+                idle = self._idle.setdefault(name, asyncio.Queue())
+                while len(self._instances.get(name, [])) < max(1, tool_class.pool_size):
+                    idle.put_nowait(await self._create_instance(name))
+    
+    async def close(self) -> None:
+        """Tear down every tool instance the registry created"""
+        tool_instances = self._retired
+        for instances in self._instances.values():
+            tool_instances.extend(instances)
+        self._instances = {}
+        self._idle = {}
+        self._retired = []
+        
+        results = await asyncio.gather(
+            *(tool_instance.teardown() for tool_instance in tool_instances),
+            return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            raise errors[0]
+    
+    async def __aenter__(self) -> "ToolRegistry":
+        await self.start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
@@ -0,0 +1,43 @@
+import json
+import math
+from typing import Any, Dict, List, Union
+
+# Rough average for English text and JSON with BPE tokenizers
+CHARS_PER_TOKEN = 4
+# Role markers and separators each message adds in chat formats
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(content: Union[str, Dict[str, Any], List[Any], None]) -> int:
+    """
+    Estimates the token count of text or structured content without calling
+    a tokenizer or the provider.
+    
+    Args:
+        content: Text, or structured content that is serialized to JSON
+        
+    Returns:
+        Estimated number of tokens
+    """
+    if content is None:
+        return 0
+    if not isinstance(content, str):
+        content = json.dumps(content, separators=(",", ":"), default=str)
+    return math.ceil(len(content) / CHARS_PER_TOKEN)
+
+
+def estimate_message_tokens(message: Any) -> int:
+    """
+    Estimates the tokens a chat message costs, including its tool calls and
+    per-message overhead.
+    
+    Args:
+        message: A Message (or any object with content and tool_calls)
+        
+    Returns:
+        Estimated number of tokens
+    """
+    tokens = MESSAGE_OVERHEAD_TOKENS + estimate_tokens(message.content)
+    if getattr(message, "tool_calls", None):
+        tokens += estimate_tokens(message.tool_calls)
+    return tokens